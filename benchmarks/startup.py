@@ -0,0 +1,84 @@
+"""Measure the fixed cost of the pre-commit hook.
+
+Compares the old hook (a Python script spawning `me check`) with the
+in-process hook installed by `me install-hook`, in a throwaway repository
+with only the default checks enabled. Run from the repository root:
+
+    python benchmarks/startup.py [--runs 10]
+"""
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PACKAGE_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PACKAGE_ROOT))
+
+from monitor_everything.hooks import HOOK_SCRIPT
+
+LEGACY_HOOK = """#!{python}
+import sys
+import subprocess
+
+result = subprocess.run({me_command!r}, capture_output=False)
+sys.exit(result.returncode)
+"""
+
+def me_command():
+    me = shutil.which("me")
+    if me:
+        return [me, "check"]
+    # Same work as the `me` console script when the package is not installed
+    return [sys.executable, "-c",
+            "import sys; from monitor_everything.main import cli; sys.argv = ['me', 'check']; cli()"]
+
+def write_script(path, content):
+    path.write_text(content)
+    path.chmod(0o755)
+    return path
+
+def time_command(command, cwd, env, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run(command, cwd=cwd, env=env, capture_output=True)
+        timings.append((time.perf_counter() - start) * 1000)
+        if result.returncode != 0:
+            raise SystemExit(f"{command[0]} failed:\n{result.stdout.decode()}{result.stderr.decode()}")
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = Path(tmp) / "repo"
+        repo.mkdir()
+        subprocess.run(["git", "init", "-q"], cwd=repo, check=True)
+        (repo / "app.py").write_text("print('hello')\n")
+        subprocess.run(["git", "add", "app.py"], cwd=repo, check=True)
+
+        # Keep the user's ~/.merc out of the measurement
+        env = dict(os.environ, HOME=tmp, PYTHONPATH=str(PACKAGE_ROOT))
+        scripts = Path(tmp)
+        cases = [
+            ("python -c pass", [sys.executable, "-c", "pass"]),
+            ("legacy hook (me check)", [str(write_script(
+                scripts / "legacy-hook", LEGACY_HOOK.format(python=sys.executable, me_command=me_command())))]),
+            ("in-process hook", [str(write_script(
+                scripts / "hook", HOOK_SCRIPT.format(python=sys.executable)))]),
+        ]
+
+        print(f"{'case':<26}{'min':>10}{'median':>10}")
+        for name, command in cases:
+            timings = time_command(command, repo, env, args.runs)
+            print(f"{name:<26}{min(timings):>8.1f}ms{statistics.median(timings):>8.1f}ms")
+
+if __name__ == "__main__":
+    main()
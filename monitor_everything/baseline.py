@@ -0,0 +1,83 @@
+# The secret scan baseline: .me-baseline at the repository root lists known
+# findings (accepted false positives, test fixtures) that the security check
+# no longer reports. Each is kept as a fingerprint of the file, the rule and
+# the matched text with quotes and whitespace normalized, so a finding stays
+# suppressed when it moves to another line but not when the secret changes.
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+BASELINE_NAME = ".me-baseline"
+BASELINE_VERSION = 1
+
+# Files per task when `me baseline update` scans in several processes
+SCAN_CHUNK = 64
+
+_QUOTES_AND_SPACE = re.compile(r'[\s"\'`]+')
+
+def fingerprint(path: str, rule: str, match: str) -> str:
+    normalized = _QUOTES_AND_SPACE.sub("", match)
+    return hashlib.sha1(f"{path}\0{rule}\0{normalized}".encode("utf-8")).hexdigest()
+
+def load_baseline(path: Path) -> Set[str]:
+    # A missing or unreadable baseline suppresses nothing
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return set()
+    if not isinstance(data, dict) or data.get("version") != BASELINE_VERSION:
+        return set()
+    return {entry["fingerprint"] for entry in data.get("findings", [])
+            if isinstance(entry, dict) and "fingerprint" in entry}
+
+def write_baseline(path: Path, findings: List[Dict]):
+    # Sorted and one finding per line, so changes review well in a diff
+    findings = sorted(findings, key=lambda f: (f["path"], f["line"], f["rule"]))
+    tmp_path = Path(path).with_name(f"{Path(path).name}.{os.getpid()}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(f'{{"version": {BASELINE_VERSION}, "findings": [')
+        for i, finding in enumerate(findings):
+            f.write(("," if i else "") + "\n  " + json.dumps(finding, sort_keys=True))
+        f.write("\n]}\n")
+    os.replace(tmp_path, path)
+
+def scan_files(root: Path, files: List[str], patterns: Optional[List[Tuple[str, str]]] = None,
+               entropy_threshold: Optional[float] = None, workers: Optional[int] = None) -> List[Dict]:
+    # Every secret finding in `files` (read from `root`), as baseline entries.
+    # Large trees are split across processes, since the scan is CPU bound.
+    chunks = [files[i:i + SCAN_CHUNK] for i in range(0, len(files), SCAN_CHUNK)]
+    workers = min(workers or os.cpu_count() or 1, len(chunks))
+    if workers <= 1:
+        return [entry for chunk in chunks for entry in _scan_chunk(str(root), chunk, patterns, entropy_threshold)]
+    
+    # Imported here: only `me baseline update` scans in parallel
+    from concurrent.futures import ProcessPoolExecutor
+    
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(_scan_chunk, [str(root)] * len(chunks), chunks,
+                           [patterns] * len(chunks), [entropy_threshold] * len(chunks))
+        return [entry for result in results for entry in result]
+
+def _scan_chunk(root: str, files: List[str], patterns, entropy_threshold) -> List[Dict]:
+    from monitor_everything.scanner import get_scanner
+    
+    scanner = get_scanner(patterns, entropy_threshold)
+    entries = []
+    for path in files:
+        try:
+            with open(os.path.join(root, path), 'r', encoding='utf-8') as f:
+                content = f.read()
+        except (OSError, UnicodeDecodeError):
+            continue
+        for finding in scanner.scan(content):
+            entries.append({
+                "fingerprint": fingerprint(path, finding.rule, finding.match),
+                "path": path,
+                "line": finding.line,
+                "rule": finding.rule
+            })
+    return entries
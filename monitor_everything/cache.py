@@ -0,0 +1,244 @@
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+from monitor_everything.checks import Check, CheckOutput, CheckResult
+from monitor_everything.diagnostics import Diagnostic
+
+# Bump whenever check output or key layout changes so stale entries are dropped
+CACHE_VERSION = 4
+NULL_SHA = "0" * 40
+
+class ResultCache:
+    def __init__(self, path: Path, max_entries: int = 5000):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self._entries = None
+        self._dirty = False
+        self._lock = threading.Lock()
+    
+    def _load(self) -> Dict:
+        if self._entries is None:
+            self._entries = {}
+            try:
+                with open(self.path, 'r') as f:
+                    data = json.load(f)
+                if data.get("version") == CACHE_VERSION:
+                    self._entries = data.get("entries", {})
+            except (OSError, ValueError, AttributeError):
+                pass
+        return self._entries
+    
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._load().get(key)
+            if entry is not None:
+                entry["t"] = time.time()
+                self._dirty = True
+            return entry
+    
+    def put(self, key: str, entry: Dict):
+        with self._lock:
+            self._load()[key] = dict(entry, t=time.time())
+            self._dirty = True
+    
+    def __len__(self):
+        with self._lock:
+            return len(self._load())
+    
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            
+            entries = self._load()
+            if len(entries) > self.max_entries:
+                newest = sorted(entries.items(), key=lambda item: item[1].get("t", 0), reverse=True)
+                self._entries = entries = dict(newest[:self.max_entries])
+            
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, 'w') as f:
+                json.dump({"version": CACHE_VERSION, "entries": entries}, f, separators=(",", ":"))
+            os.replace(tmp_path, self.path)
+            self._dirty = False
+
+def _digest(*parts) -> str:
+    h = hashlib.sha1()
+    for part in parts:
+        h.update(str(part).encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+def tool_version(cache: ResultCache, command: List[str]) -> Optional[str]:
+    executable = shutil.which(command[0])
+    if not executable:
+        return None
+    
+    # Remember the version per binary so `tool --version` only runs after upgrades
+    try:
+        stat = os.stat(executable)
+    except OSError:
+        return None
+    key = f"tool:{executable}:{stat.st_mtime_ns}:{stat.st_size}"
+    
+    entry = cache.get(key)
+    if entry is not None:
+        return entry["v"]
+    
+    try:
+        result = subprocess.run(command, capture_output=True, text=True)
+    except OSError:
+        return None
+    
+    version = (result.stdout or result.stderr).strip()
+    cache.put(key, {"v": version})
+    return version
+
+def config_digest(root: Optional[Path], names: List[str]) -> str:
+    h = hashlib.sha1()
+    for name in names:
+        h.update(name.encode("utf-8"))
+        try:
+            h.update(((root or Path(".")) / name).read_bytes())
+        except OSError:
+            h.update(b"\0missing")
+    return h.hexdigest()
+
+def run_cached(cache: Optional[ResultCache], check_type: str, check: Check,
+               files: List[str], blobs: Dict[str, str], root: Optional[Path] = None,
+               head: Optional[str] = None) -> CheckOutput:
+    # check.cache_result ends up "hit", "miss", "partial" (file scope, some
+    # files cached) or None when the cache was not consulted.
+    check.cache_result = None
+    if cache is None or not check.cacheable:
+        return check.run(files)
+    
+    candidates = [f for f in files if check.applies_to(f)]
+    if not candidates:
+        return check.run(files)
+    
+    if check.version_command:
+        version = tool_version(cache, check.version_command)
+        if version is None:
+            # Tool is missing, let the check report it
+            return check.run(files)
+    else:
+        version = "builtin"
+    
+    settings = json.dumps(check.settings, sort_keys=True, default=str)
+    namespace = _digest(CACHE_VERSION, check_type, version, settings,
+                        config_digest(root, check.config_files))
+    
+    if check.cache_scope == "commit":
+        return _run_commit_scope(cache, namespace, check, candidates, blobs, head)
+    return _run_file_scope(cache, namespace, check, candidates, blobs)
+
+def _run_commit_scope(cache, namespace, check, files, blobs, head):
+    # Results depend on the whole tree being committed (e.g. cross-module type
+    # checking sees unchanged modules too), so besides the files checked the
+    # key has HEAD and every staged blob: together they identify the index.
+    if any(not blobs.get(f) or blobs[f] == NULL_SHA for f in files):
+        return check.run(files)
+    
+    key = _digest(namespace, head or "", *sorted(files), "\0", *sorted(blobs.items()))
+    entry = cache.get(key)
+    if entry is not None:
+        check.cache_result = "hit"
+        return CheckOutput(CheckResult(entry["r"]), entry["m"], list(entry["d"]), _diagnostics(entry))
+    
+    check.cache_result = "miss"
+    output = check.run(files)
+    if output.result in (CheckResult.PASS, CheckResult.FAIL):
+        cache.put(key, {
+            "r": output.result.value,
+            "m": output.message,
+            "d": output.details,
+            "g": [d.to_tuple() for d in output.diagnostics]
+        })
+    return output
+
+def _run_file_scope(cache, namespace, check, files, blobs):
+    keys = {}
+    hits = {}
+    misses = []
+    for path in files:
+        sha = blobs.get(path)
+        if sha and sha != NULL_SHA:
+            keys[path] = _digest(namespace, path, sha)
+            entry = cache.get(keys[path])
+            if entry is not None:
+                hits[path] = entry
+                continue
+        misses.append(path)
+    
+    if not misses:
+        check.cache_result = "hit"
+    else:
+        check.cache_result = "partial" if hits else "miss"
+    
+    output = None
+    if misses:
+        output = check.run(misses)
+        if output.result not in (CheckResult.PASS, CheckResult.FAIL):
+            return output
+        _store_file_results(cache, keys, check, misses, output)
+    
+    cached_failures = [hits[path] for path in files if path in hits and hits[path]["r"] == "fail"]
+    fresh_failed = output is not None and output.result == CheckResult.FAIL
+    
+    if fresh_failed or cached_failures:
+        message = output.message if fresh_failed else cached_failures[0]["m"]
+        details = list(output.details) if fresh_failed else []
+        diagnostics = list(output.diagnostics) if fresh_failed else []
+        for entry in cached_failures:
+            cached = _diagnostics(entry)
+            details.extend(entry["d"] if "d" in entry else [str(d) for d in cached])
+            diagnostics.extend(cached)
+        return CheckOutput(CheckResult.FAIL, message, details, diagnostics)
+    
+    if output is not None:
+        return output
+    
+    return CheckOutput(
+        result=CheckResult.PASS,
+        message=f"No issues found ({len(hits)} cached)",
+        details=[]
+    )
+
+def _diagnostics(entry) -> List[Diagnostic]:
+    return [Diagnostic.from_tuple(values) for values in entry.get("g", [])]
+
+def _store_file_results(cache, keys, check, files, output):
+    # Diagnostics carry their file; plain detail lines go through
+    # check.detail_file(). Entries of diagnostics only store those, and their
+    # detail lines are rendered again when replayed.
+    by_file = {path: [] for path in files}
+    if output.diagnostics:
+        for diagnostic in output.diagnostics:
+            if diagnostic.path in by_file:
+                by_file[diagnostic.path].append(diagnostic)
+    else:
+        for detail in output.details:
+            path = check.detail_file(detail)
+            if path in by_file:
+                by_file[path].append(detail)
+    
+    # A failure we cannot pin on any file (crash, config error) is never cached
+    if output.result == CheckResult.FAIL and not any(by_file.values()):
+        return
+    
+    for path, found in by_file.items():
+        if path not in keys:
+            continue
+        if not found:
+            cache.put(keys[path], {"r": "pass", "m": "", "d": []})
+        elif output.diagnostics:
+            cache.put(keys[path], {"r": "fail", "m": output.message, "g": [d.to_tuple() for d in found]})
+        else:
+            cache.put(keys[path], {"r": "fail", "m": output.message, "d": found})
@@ -1,43 +1,260 @@
+import functools
+import os
+import re
+import shutil
+import tempfile
+import threading
 from enum import Enum
 from dataclasses import dataclass
-from typing import List
+from typing import Callable, Dict, List, Optional, Tuple
+from monitor_everything.diagnostics import (
+    Diagnostic,
+    parse_black,
+    parse_mypy,
+    parse_pytest_report,
+    parse_ruff,
+    pytest_not_run
+)
+from monitor_everything.executor import (
+    CheckCancelled,
+    argv_budget,
+    chunk_arguments,
+    fits_in_argv,
+    merge_results,
+    rss_kb,
+    run_streaming
+)
 
 class CheckResult(Enum):
     PASS = "pass"
     WARN = "warn"
     FAIL = "fail"
+    SKIP = "skip"
+    # Stopped by its time or CPU limit; handled like FAIL by the behaviors
+    TIMEOUT = "timeout"
+    
+    @property
+    def failed(self) -> bool:
+        return self in (CheckResult.FAIL, CheckResult.TIMEOUT)
 
 @dataclass
 class CheckOutput:
     result: CheckResult
     message: str
+    # Human-readable lines; when left out they are rendered from `diagnostics`
     details: List[str] = None
+    diagnostics: List[Diagnostic] = None
     
     def __post_init__(self):
+        if self.diagnostics is None:
+            self.diagnostics = []
         if self.details is None:
-            self.details = []
+            self.details = [str(d) for d in self.diagnostics]
+
+def _text_lines(text: str) -> List[str]:
+    return [line for line in (text or "").splitlines() if line.strip()]
+
+def failure_output(message: str, diagnostics: List[Diagnostic], other: List[str]) -> CheckOutput:
+    # Tool output that is not a diagnostic (crash, usage error) is kept as text
+    return CheckOutput(
+        result=CheckResult.FAIL,
+        message=message,
+        details=[str(d) for d in diagnostics] + other,
+        diagnostics=diagnostics
+    )
 
 class Check:
+    # Result caching (see monitor_everything.cache). "file" scoped checks are
+    # cached per staged blob, "commit" scoped ones per set of staged blobs.
+    cacheable = False
+    cache_scope = "file"
+    version_command: List[str] = []
+    config_files: List[str] = []
+    # Whether run_batched() may run argv chunks of the tool at the same time
+    batch_parallel = False
+    # Tool command that rewrites files in place, for the "fix" behavior
+    fix_command: List[str] = []
+    
     def __init__(self, name: str):
         self.name = name
+        # Filled in by CheckRunner: `settings` is the check's section of the
+        # "settings" config, `context` describes the repository being checked.
+        # Tools run in context["root"], the staged snapshot unless it is
+        # disabled; git commands need context["worktree"].
+        self.settings = {}
+        self.context = {}
+        # Also set by CheckRunner: `cancel` is set to stop the check's tool,
+        # `on_failure` is called as soon as the tool's output shows a failure.
+        self.cancel = None
+        self.on_failure = None
+        # The configured behavior ("block", "warn", ...), also set by CheckRunner
+        self.behavior = None
+        # Resource limits of the check's tools ("timeout", "cpu_seconds",
+        # "memory_mb"), also set by CheckRunner
+        self.limits = {}
+        # Bookkeeping read back by the runner for timing stats
+        self.cache_result = None
+        self.tool_usage = {"cpu": 0.0, "max_rss": 0}
+        self._usage_lock = threading.Lock()
     
     def run(self, files: List[str]) -> CheckOutput:
         raise NotImplementedError
+    
+    def applies_to(self, path: str) -> bool:
+        return True
+    
+    def detail_file(self, detail: str):
+        if ":" in detail:
+            return detail.split(":", 1)[0]
+        return None
+    
+    def stream(self, command: List[str], failure_line: Optional[Callable[[str], bool]] = None, env=None, cwd=None):
+        # subprocess.run() replacement for tools: output is watched line by
+        # line and the tool is stopped (CheckCancelled) if the run is cancelled
+        reported = []
+        
+        def on_line(line):
+            if failure_line is None or reported or not failure_line(line):
+                return
+            reported.append(line)
+            if self.on_failure is not None:
+                self.on_failure()
+        
+        result = run_streaming(command, cwd=cwd or self.context.get("root"), cancel=self.cancel,
+                               on_line=on_line, env=env, limits=self.limits)
+        if result.usage is not None:
+            with self._usage_lock:
+                self.tool_usage["cpu"] += result.usage.ru_utime + result.usage.ru_stime
+                self.tool_usage["max_rss"] = max(self.tool_usage["max_rss"], rss_kb(result.usage.ru_maxrss))
+        return result
+    
+    def run_batched(self, command: List[str], files: List[str],
+                    failure_line: Optional[Callable[[str], bool]] = None, cwd=None):
+        # stream() for `command + files`, split into several runs when the
+        # file list would not fit in one command line (ARG_MAX)
+        chunks = chunk_arguments(command, files, argv_budget())
+        if len(chunks) <= 1:
+            return self.stream(command + files, failure_line=failure_line, cwd=cwd)
+        
+        def run(chunk):
+            return self.stream(command + chunk, failure_line=failure_line, cwd=cwd)
+        
+        if self.batch_parallel:
+            from concurrent.futures import ThreadPoolExecutor
+            
+            with ThreadPoolExecutor(max_workers=min(len(chunks), os.cpu_count() or 1)) as pool:
+                results = list(pool.map(run, chunks))
+        else:
+            results = [run(chunk) for chunk in chunks]
+        return merge_results(command + files, results)
+    
+    def fix(self, files: List[str]) -> List[str]:
+        # Runs fix_command on `files` in the worktree, all in one batched
+        # invocation, and returns the files it changed
+        if not self.fix_command or not shutil.which(self.fix_command[0]):
+            return []
+        root = self.context.get("worktree") or self.context.get("root") or "."
+        targets = [f for f in files if self.applies_to(f)]
+        if not targets:
+            return []
+        
+        before = {f: _read_bytes(os.path.join(root, f)) for f in targets}
+        self.run_batched(self.fix_command, targets, cwd=root)
+        return [f for f in targets if _read_bytes(os.path.join(root, f)) != before[f]]
+
+def _read_bytes(path: str) -> Optional[bytes]:
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except OSError:
+        return None
+
+# Entry point group third-party checks are declared in, e.g. in a plugin's
+# pyproject.toml:
+#   [project.entry-points."monitor_everything.checks"]
+#   shellcheck = "me_shellcheck:ShellcheckCheck"
+ENTRY_POINT_GROUP = "monitor_everything.checks"
+
+class CheckLoadError(Exception):
+    pass
 
 class CheckRegistry:
-    def __init__(self):
+    # check type -> a Check subclass, or a "module:attribute" string that is
+    # imported the first time the check is asked for. Checks declared as
+    # entry points are only looked up when a type is not registered here,
+    # so configurations using built-in checks never scan installed packages.
+    def __init__(self, entry_point_group: Optional[str] = None):
         self._checks = {}
+        self._entry_point_group = entry_point_group
+        self._discovered = False
+        # Reentrant: a plugin module may register more checks as it is imported
+        self._lock = threading.RLock()
     
     def register(self, check_type: str, check_class):
-        self._checks[check_type] = check_class
+        with self._lock:
+            self._checks[check_type] = check_class
     
     def get(self, check_type: str):
-        return self._checks.get(check_type)
+        # Raises CheckLoadError when a lazily declared check fails to import
+        with self._lock:
+            if check_type not in self._checks:
+                self._discover()
+            target = self._checks.get(check_type)
+            if not isinstance(target, str):
+                return target
+            self._checks[check_type] = _load(check_type, target)
+            return self._checks[check_type]
     
     def list_available(self):
-        return list(self._checks.keys())
+        with self._lock:
+            self._discover()
+            return list(self._checks.keys())
+    
+    def _discover(self):
+        if self._discovered or not self._entry_point_group:
+            return
+        self._discovered = True
+        # Imported here: only needed once a type is not built in
+        from importlib.metadata import entry_points
+        
+        for entry_point in entry_points(group=self._entry_point_group):
+            # Built-in and explicitly registered checks win over plugins
+            self._checks.setdefault(entry_point.name, entry_point.value)
+
+def _load(check_type: str, target: str):
+    import importlib
+    
+    module_name, _, attribute = target.partition(":")
+    try:
+        value = importlib.import_module(module_name.strip())
+        for part in filter(None, attribute.strip().split(".")):
+            value = getattr(value, part)
+    except Exception as e:
+        raise CheckLoadError(f"Could not load check {check_type!r} from {target}: {e}") from e
+    return value
+
+class UnavailableCheck(Check):
+    # Stands in for a check that could not be loaded, so the failure is
+    # reported (and blocks or warns) like any other check result
+    def __init__(self, check_type: str, error: str):
+        super().__init__(check_type)
+        self.error = error
+    
+    def run(self, files: List[str]) -> CheckOutput:
+        return CheckOutput(result=CheckResult.FAIL, message=self.error)
+
+registry = CheckRegistry(ENTRY_POINT_GROUP)
+
+# Module name the pytest report plugin is installed under (see pytest_plugin)
+REPORT_PLUGIN = "me_pytest_report"
+
+# A reasonable settings.security.entropy_threshold (bits per character from
+# which a token counts as a secret by itself). Off unless configured: hashes
+# and fixtures in existing code would otherwise start blocking commits.
+ENTROPY_THRESHOLD = 4.5
 
-registry = CheckRegistry()
+# Output lines that mean a tool is going to fail
+PYTEST_FAILURE = re.compile(r"^(FAILED|ERROR) ")
 
 class BranchAwarenessCheck(Check):
     def __init__(self):
@@ -46,7 +263,8 @@ class BranchAwarenessCheck(Check):
     def run(self, files: List[str]) -> CheckOutput:
         from monitor_everything.git_utils import get_current_branch
         
-        branch = get_current_branch()
+        repo = self.context.get("repo")
+        branch = repo.branch if repo else get_current_branch()
         if branch:
             return CheckOutput(
                 result=CheckResult.PASS,
@@ -61,11 +279,19 @@ class BranchAwarenessCheck(Check):
             )
 
 class RuffCheck(Check):
+    cacheable = True
+    batch_parallel = True
+    version_command = ["ruff", "--version"]
+    config_files = ["pyproject.toml", "ruff.toml", ".ruff.toml"]
+    fix_command = ["ruff", "check", "--fix", "--exit-zero", "--quiet"]
+    
     def __init__(self):
         super().__init__("Ruff Linting")
     
+    def applies_to(self, path: str) -> bool:
+        return path.endswith(".py")
+    
     def run(self, files: List[str]) -> CheckOutput:
-        import subprocess
         import shutil
         
         if not shutil.which("ruff"):
@@ -75,7 +301,7 @@ class RuffCheck(Check):
                 details=["Install with: uv pip install ruff"]
             )
         
-        python_files = [f for f in files if f.endswith(".py")]
+        python_files = [f for f in files if self.applies_to(f)]
         if not python_files:
             return CheckOutput(
                 result=CheckResult.PASS,
@@ -84,10 +310,10 @@ class RuffCheck(Check):
             )
         
         try:
-            result = subprocess.run(
-                ["ruff", "check"] + python_files,
-                capture_output=True,
-                text=True
+            result = self.run_batched(
+                ["ruff", "check", "--output-format", "json-lines"],
+                python_files,
+                failure_line=lambda line: line.startswith("{")
             )
             
             if result.returncode == 0:
@@ -97,11 +323,10 @@ class RuffCheck(Check):
                     details=[]
                 )
             else:
-                return CheckOutput(
-                    result=CheckResult.FAIL,
-                    message="Linting issues found",
-                    details=result.stdout.strip().split("\n")
-                )
+                diagnostics, other = parse_ruff(result.stdout, self.context.get("root"))
+                return failure_output("Linting issues found", diagnostics, other + _text_lines(result.stderr))
+        except CheckCancelled:
+            raise
         except Exception as e:
             return CheckOutput(
                 result=CheckResult.FAIL,
@@ -110,11 +335,19 @@ class RuffCheck(Check):
             )
 
 class BlackCheck(Check):
+    cacheable = True
+    batch_parallel = True
+    version_command = ["black", "--version"]
+    config_files = ["pyproject.toml"]
+    fix_command = ["black", "--quiet"]
+    
     def __init__(self):
         super().__init__("Black Formatting")
     
+    def applies_to(self, path: str) -> bool:
+        return path.endswith(".py")
+    
     def run(self, files: List[str]) -> CheckOutput:
-        import subprocess
         import shutil
         
         if not shutil.which("black"):
@@ -124,7 +357,7 @@ class BlackCheck(Check):
                 details=["Install with: uv pip install black"]
             )
         
-        python_files = [f for f in files if f.endswith(".py")]
+        python_files = [f for f in files if self.applies_to(f)]
         if not python_files:
             return CheckOutput(
                 result=CheckResult.PASS,
@@ -133,10 +366,10 @@ class BlackCheck(Check):
             )
         
         try:
-            result = subprocess.run(
-                ["black", "--check"] + python_files,
-                capture_output=True,
-                text=True
+            result = self.run_batched(
+                ["black", "--check"],
+                python_files,
+                failure_line=lambda line: line.startswith("would reformat ")
             )
             
             if result.returncode == 0:
@@ -146,11 +379,11 @@ class BlackCheck(Check):
                     details=[]
                 )
             else:
-                return CheckOutput(
-                    result=CheckResult.FAIL,
-                    message="Formatting issues found",
-                    details=result.stderr.strip().split("\n")
-                )
+                diagnostics, other = parse_black(result.stderr, self.context.get("root"))
+                # Without diagnostics the summary and banner lines are all there is
+                return failure_output("Formatting issues found", diagnostics, [] if diagnostics else other)
+        except CheckCancelled:
+            raise
         except Exception as e:
             return CheckOutput(
                 result=CheckResult.FAIL,
@@ -159,11 +392,18 @@ class BlackCheck(Check):
             )
 
 class MypyCheck(Check):
+    cacheable = True
+    cache_scope = "commit"
+    version_command = ["mypy", "--version"]
+    config_files = ["mypy.ini", ".mypy.ini", "pyproject.toml", "setup.cfg"]
+    
     def __init__(self):
         super().__init__("Mypy Type Checking")
     
+    def applies_to(self, path: str) -> bool:
+        return path.endswith(".py")
+    
     def run(self, files: List[str]) -> CheckOutput:
-        import subprocess
         import shutil
         
         if not shutil.which("mypy"):
@@ -173,7 +413,7 @@ class MypyCheck(Check):
                 details=["Install with: uv pip install mypy"]
             )
         
-        python_files = [f for f in files if f.endswith(".py")]
+        python_files = [f for f in files if self.applies_to(f)]
         if not python_files:
             return CheckOutput(
                 result=CheckResult.PASS,
@@ -182,11 +422,14 @@ class MypyCheck(Check):
             )
         
         try:
-            result = subprocess.run(
-                ["mypy"] + python_files,
-                capture_output=True,
-                text=True
-            )
+            options = self._options()
+            failure_line = lambda line: line.startswith("{") and '"severity": "error"' in line
+            tools = self.context.get("tools")
+            if tools is not None and tools.has_dmypy() and fits_in_argv(["dmypy", "run", "--"] + options + python_files):
+                stream = functools.partial(self.stream, failure_line=failure_line)
+                result = tools.mypy(options + python_files, cwd=self.context.get("root"), stream=stream)
+            else:
+                result = self.run_batched(["mypy"] + options, python_files, failure_line=failure_line)
             
             if result.returncode == 0:
                 return CheckOutput(
@@ -195,17 +438,29 @@ class MypyCheck(Check):
                     details=[]
                 )
             else:
-                return CheckOutput(
-                    result=CheckResult.FAIL,
-                    message="Type errors found",
-                    details=result.stdout.strip().split("\n")
-                )
+                diagnostics, other = parse_mypy(result.stdout, self.context.get("root"))
+                return failure_output("Type errors found", diagnostics, other + _text_lines(result.stderr))
+        except CheckCancelled:
+            raise
         except Exception as e:
             return CheckOutput(
                 result=CheckResult.FAIL,
                 message=f"Error running mypy: {str(e)}",
                 details=[]
             )
+    
+    def _options(self) -> List[str]:
+        options = ["-O", "json"]
+        # One incremental cache per repository, in the git common dir: it
+        # outlives the staged snapshot, and worktrees and subdirectories share
+        # it (mypy revalidates moved sources by hash)
+        git_dir = self.context.get("git_dir")
+        if git_dir and self.settings.get("shared_cache", True):
+            options += ["--cache-dir", os.path.join(git_dir, "me", "mypy_cache")]
+        follow_imports = self.settings.get("follow_imports")
+        if follow_imports:
+            options.append(f"--follow-imports={follow_imports}")
+        return options
 
 registry.register("branch_awareness", BranchAwarenessCheck)
 registry.register("linting", RuffCheck)
@@ -217,7 +472,6 @@ class PytestCheck(Check):
         super().__init__("Pytest Tests")
     
     def run(self, files: List[str]) -> CheckOutput:
-        import subprocess
         import shutil
         
         if not shutil.which("pytest"):
@@ -227,89 +481,339 @@ class PytestCheck(Check):
                 details=["Install with: uv pip install pytest"]
             )
         
+        selected = None
+        if self.settings.get("selection") == "impact" and not self.context.get("is_protected"):
+            selected = self._select_tests(files)
+            if selected == []:
+                return CheckOutput(
+                    result=CheckResult.PASS,
+                    message="No tests affected by staged changes",
+                    details=[]
+                )
+        
         try:
-            result = subprocess.run(
-                ["pytest", "-v"],
-                capture_output=True,
-                text=True
-            )
+            with tempfile.TemporaryDirectory(prefix="me-pytest-") as tmp:
+                report_path = os.path.join(tmp, "report.jsonl")
+                # Tracebacks and per-test lines are left out: failures come
+                # from the report, only pytest's summary line is shown
+                command = ["pytest", "-q", "--tb=no", "-rN", "-p", REPORT_PLUGIN, f"--me-report={report_path}"]
+                command += self._run_options(selected, files, tmp)
+                command += selected or []
+                env = self._report_plugin_env(tmp)
+                
+                tools = self.context.get("tools")
+                if tools is not None and tools.has_pytest():
+                    result = tools.pytest(command[1:], cwd=self.context.get("root"), cancel=self.cancel, env=env,
+                                          limits=self.limits)
+                else:
+                    result = self.stream(command, failure_line=PYTEST_FAILURE.search, env=env)
+                
+                try:
+                    with open(report_path, 'r', encoding='utf-8') as f:
+                        report = f.read()
+                except OSError:
+                    report = ""
             
+            lines = result.stdout.strip().split("\n")
+            not_run = pytest_not_run(report)
+            diagnostics = parse_pytest_report(report, self.context.get("root"))
+            if not_run and not diagnostics:
+                budget = self.settings.get("time_budget")
+                return CheckOutput(
+                    result=CheckResult.WARN,
+                    message=f"Time budget of {budget:g}s reached, {len(not_run)} tests not run",
+                    details=[f"Not run: {nodeid}" for nodeid in not_run]
+                )
             if result.returncode == 0:
-                lines = result.stdout.strip().split("\n")
                 summary = [l for l in lines if "passed" in l]
                 return CheckOutput(
                     result=CheckResult.PASS,
                     message="All tests passed",
                     details=summary
                 )
-            else:
-                lines = result.stdout.strip().split("\n")
+            
+            if not diagnostics:
+                # Usage errors, crashes: only pytest's own output explains them
                 return CheckOutput(
                     result=CheckResult.FAIL,
                     message="Tests failed",
                     details=lines[-10:]
                 )
+            if not_run:
+                return failure_output("Tests failed", diagnostics, [f"{len(not_run)} tests not run (time budget)"])
+            return failure_output("Tests failed", diagnostics, lines[-1:])
+        except CheckCancelled:
+            raise
         except Exception as e:
             return CheckOutput(
                 result=CheckResult.FAIL,
                 message=f"Error running pytest: {str(e)}",
                 details=[]
             )
+    
+    def _run_options(self, selected: Optional[List[str]], files: List[str], directory: str) -> List[str]:
+        options = []
+        git_dir = self.context.get("git_dir")
+        durations = {}
+        if git_dir:
+            from monitor_everything.pytest_plugin import load_durations
+            
+            path = os.path.join(git_dir, "me", "test_durations.json")
+            options.append(f"--me-durations={path}")
+            durations = load_durations(path)
+            
+            # Tests of the staged modules run right after last run's failures
+            related = selected if selected is not None else self._select_tests(files)
+            if related:
+                related_path = os.path.join(directory, "related.txt")
+                with open(related_path, 'w', encoding='utf-8') as f:
+                    f.write("".join(f"{path}\n" for path in related))
+                options.append(f"--me-related={related_path}")
+        
+        budget = self.settings.get("time_budget")
+        if budget:
+            # Workers would each run past the budget; the point of a budget
+            # is the first few tests in priority order
+            options.append(f"--me-budget={budget}")
+        else:
+            workers = self._workers(selected, durations)
+            if workers > 1:
+                options += ["-n", str(workers)]
+        # A failing "block" check refuses the commit; one failure is enough
+        if self.behavior == "block":
+            options.append("-x")
+        return options
+    
+    def _workers(self, selected: Optional[List[str]], durations: Dict[str, float]) -> int:
+        # pytest-xdist processes, when it is installed and the tests to run
+        # took long enough last time to be worth the workers' start-up
+        setting = self.settings.get("workers", "auto")
+        if setting == "auto":
+            workers = os.cpu_count() or 1
+        else:
+            try:
+                workers = int(setting or 0)
+            except (TypeError, ValueError):
+                workers = 1
+        if workers <= 1 or not pytest_has_plugin("xdist"):
+            return 1
+        
+        if selected is not None:
+            modules = set(selected)
+            durations = {k: v for k, v in durations.items() if k.split("::")[0] in modules}
+        if durations:
+            if sum(durations.values()) < self.settings.get("min_parallel_seconds", 2.0):
+                return 1
+            workers = min(workers, len(durations))
+        return workers
+    
+    def _report_plugin_env(self, directory: str):
+        # The plugin goes on the tool's PYTHONPATH as a standalone module, so
+        # nothing else from this package leaks into the project's test run
+        from monitor_everything import pytest_plugin
+        
+        shutil.copyfile(pytest_plugin.__file__, os.path.join(directory, f"{REPORT_PLUGIN}.py"))
+        paths = [directory]
+        snapshot = self.context.get("snapshot")
+        if snapshot:
+            # Import the project from the snapshot rather than from an
+            # editable install pointing at the worktree
+            paths += [str(p) for p in (snapshot / "src", snapshot) if p.is_dir()]
+        paths.append(os.environ.get("PYTHONPATH"))
+        return dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, paths)))
+    
+    def _select_tests(self, files: List[str]):
+        from monitor_everything.impact import select_tests
+        
+        root = self.context.get("worktree") or self.context.get("root")
+        git_dir = self.context.get("git_dir")
+        if not root or not git_dir:
+            return None
+        return select_tests(root, git_dir, files)
 
 registry.register("tests", PytestCheck)
 
+def pytest_has_plugin(module: str) -> bool:
+    # Whether the interpreter behind the `pytest` on PATH can import `module`.
+    # Cached until that interpreter's site-packages change, so a long-lived
+    # daemon notices plugins being installed or removed.
+    import sys
+    
+    interpreter = _script_interpreter(shutil.which("pytest"))
+    # Compared by bin directory: a venv's python links to the base interpreter
+    own_bin = os.path.realpath(os.path.dirname(sys.executable))
+    if interpreter is not None and os.path.realpath(os.path.dirname(interpreter[-1])) == own_bin:
+        interpreter = None
+    interpreter = tuple(interpreter) if interpreter else None
+    return _has_plugin(module, interpreter, _site_packages_state(interpreter))
+
+@functools.lru_cache(maxsize=64)
+def _has_plugin(module: str, interpreter: Optional[Tuple[str, ...]], site_state) -> bool:
+    import importlib
+    import importlib.util
+    import subprocess
+    
+    if interpreter is None:
+        # Wrapper scripts (pyenv shims) or our own interpreter
+        importlib.invalidate_caches()
+        try:
+            return importlib.util.find_spec(module) is not None
+        except (ImportError, ValueError):
+            return False
+    try:
+        return subprocess.run(list(interpreter) + ["-c", f"import {module}"], capture_output=True).returncode == 0
+    except OSError:
+        return False
+
+def _site_packages_state(interpreter: Optional[Tuple[str, ...]]) -> Tuple:
+    # (directory, mtime) of the interpreter's site-packages: installing or
+    # removing a distribution adds or removes entries there
+    if interpreter is None:
+        import site
+        
+        directories = site.getsitepackages() + [site.getusersitepackages()]
+    else:
+        import glob
+        
+        # A venv or prefix install: <prefix>/bin/python
+        prefix = os.path.dirname(os.path.dirname(interpreter[-1]))
+        directories = glob.glob(os.path.join(prefix, "lib*", "python*", "site-packages"))
+    state = []
+    for directory in sorted(set(directories)):
+        try:
+            state.append((directory, os.stat(directory).st_mtime_ns))
+        except OSError:
+            pass
+    return tuple(state)
+
+def _script_interpreter(path: Optional[str]) -> Optional[List[str]]:
+    # The Python from a console script's shebang line, if it names one
+    if not path:
+        return None
+    try:
+        with open(path, 'rb') as f:
+            first_line = f.readline(512).decode("utf-8", "replace")
+    except OSError:
+        return None
+    if not first_line.startswith("#!"):
+        return None
+    interpreter = first_line[2:].split()
+    if not interpreter or "python" not in os.path.basename(interpreter[-1]):
+        return None
+    return interpreter
+
 class SecurityCheck(Check):
+    # Findings listed in the baseline are not reported, so results depend on it
+    config_files = [".me-baseline"]
+    
     def __init__(self):
         super().__init__("Security Checks")
-        self.secret_patterns = [
-            (r'(?i)(api[_-]?key|apikey)\s*[:=]\s*["\']?([a-zA-Z0-9_\-]{20,})', "API Key"),
-            (r'(?i)(secret[_-]?key|secretkey)\s*[:=]\s*["\']?([a-zA-Z0-9_\-]{20,})', "Secret Key"),
-            (r'(?i)(password)\s*[:=]\s*["\']([^"\']{8,})', "Password"),
-            (r'(?i)(token)\s*[:=]\s*["\']?([a-zA-Z0-9_\-]{20,})', "Token"),
-            (r'(?i)(aws[_-]?access[_-]?key[_-]?id)\s*[:=]\s*["\']?([A-Z0-9]{20})', "AWS Access Key"),
-            (r'(?i)(aws[_-]?secret[_-]?access[_-]?key)\s*[:=]\s*["\']?([a-zA-Z0-9/+=]{40})', "AWS Secret Key"),
-        ]
+        # Known provider token formats are part of SECRET_PATTERNS;
+        # settings.security.entropy_threshold adds random-looking tokens
+        from monitor_everything.scanner import SECRET_PATTERNS
+        self.secret_patterns = list(SECRET_PATTERNS)
         self.max_file_size = 10 * 1024 * 1024  # 10MB
+        # Fingerprints from .me-baseline, loaded by run()
+        self.baseline = set()
+    
+    @property
+    def cacheable(self):
+        # Staged mode depends on the HEAD side of the diff too, and is cheap anyway
+        return self.settings.get("mode", "full") != "staged"
     
     def run(self, files: List[str]) -> CheckOutput:
-        import re
         import os
+        from monitor_everything.baseline import BASELINE_NAME, load_baseline
+        
+        # The staged baseline, like the files it covers
+        self.baseline = load_baseline(os.path.join(self.context.get("root") or ".", BASELINE_NAME))
+        if self.settings.get("mode", "full") == "staged":
+            issues = self._scan_staged(files)
+        else:
+            issues = self._scan_files(files)
+        
+        if issues:
+            return CheckOutput(
+                result=CheckResult.FAIL,
+                message=f"Security issues found ({len(issues)})",
+                diagnostics=issues
+            )
+        else:
+            return CheckOutput(
+                result=CheckResult.PASS,
+                message="No security issues found",
+                details=[]
+            )
+    
+    def _scan_files(self, files: List[str]) -> List[Diagnostic]:
+        import os
+        from monitor_everything.scanner import get_scanner
         
+        scanner = get_scanner(self.secret_patterns, self.settings.get("entropy_threshold"))
+        root = self.context.get("root")
         issues = []
         
         for file_path in files:
-            if not os.path.exists(file_path):
+            full_path = os.path.join(root, file_path) if root else file_path
+            if not os.path.exists(full_path):
                 continue
             
             # Check file size
-            file_size = os.path.getsize(file_path)
+            file_size = os.path.getsize(full_path)
             if file_size > self.max_file_size:
                 size_mb = file_size / (1024 * 1024)
-                issues.append(f"{file_path}: Large file ({size_mb:.1f}MB)")
+                issues.append(_large_file(file_path, size_mb))
             
             # Check for secrets in text files
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
+                with open(full_path, 'r', encoding='utf-8') as f:
                     content = f.read()
-                    for pattern, secret_type in self.secret_patterns:
-                        matches = re.finditer(pattern, content)
-                        for match in matches:
-                            line_num = content[:match.start()].count('\n') + 1
-                            issues.append(f"{file_path}:{line_num}: Possible {secret_type} detected")
+                for finding in scanner.scan(content):
+                    if not self._in_baseline(file_path, finding):
+                        issues.append(_secret(file_path, finding.line, finding.rule))
             except (UnicodeDecodeError, PermissionError):
                 pass
         
-        if issues:
-            return CheckOutput(
-                result=CheckResult.FAIL,
-                message=f"Security issues found ({len(issues)})",
-                details=issues
-            )
-        else:
-            return CheckOutput(
-                result=CheckResult.PASS,
-                message="No security issues found",
-                details=[]
-            )
+        return issues
+    
+    def _scan_staged(self, files: List[str]) -> List[Diagnostic]:
+        # Scan only lines added in the index, so what is checked is exactly
+        # what gets committed and unchanged parts of big files are skipped.
+        from monitor_everything.git_utils import get_staged_sizes, iter_staged_hunks
+        from monitor_everything.scanner import get_scanner
+        
+        scanner = get_scanner(self.secret_patterns, self.settings.get("entropy_threshold"))
+        # git needs the worktree, not the staged snapshot
+        root = self.context.get("worktree") or self.context.get("root")
+        issues = {path: [] for path in files}
+        
+        for path, size in get_staged_sizes(files, cwd=root).items():
+            if size > self.max_file_size:
+                size_mb = size / (1024 * 1024)
+                issues[path].append(_large_file(path, size_mb))
+        
+        for path, first_line, lines in iter_staged_hunks(files, cwd=root):
+            if path not in issues:
+                continue
+            for finding in scanner.scan("\n".join(lines)):
+                if self._in_baseline(path, finding):
+                    continue
+                line_num = first_line + finding.line - 1
+                issues[path].append(_secret(path, line_num, finding.rule))
+        
+        return [issue for path in files for issue in issues[path]]
+    
+    def _in_baseline(self, path: str, finding) -> bool:
+        if not self.baseline:
+            return False
+        from monitor_everything.baseline import fingerprint
+        
+        return fingerprint(path, finding.rule, finding.match) in self.baseline
+
+def _secret(path: str, line: int, rule: str) -> Diagnostic:
+    return Diagnostic(path=path, line=line, message=f"Possible {rule} detected")
+
+def _large_file(path: str, size_mb: float) -> Diagnostic:
+    return Diagnostic(path=path, message=f"Large file ({size_mb:.1f}MB)")
 
 registry.register("security", SecurityCheck)
@@ -1,11 +1,21 @@
+import copy
+import hashlib
 import os
 from pathlib import Path
-import tomllib
 import json
 
 GLOBAL_CONFIG_PATH = Path.home() / ".merc"
+# Relative to the repository root (the current directory outside a repository)
 LOCAL_CONFIG_PATH = Path(".merc")
 
+# Merged, validated configs, keyed by the mtime and size of their sources
+CONFIG_CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "monitor-everything"
+CONFIG_CACHE_VERSION = 1
+# Compiled configs kept, one per pair of global and local .merc paths
+CONFIG_CACHE_MAX_ENTRIES = 64
+
+BEHAVIORS = ("block", "warn", "interactive", "fix")
+
 DEFAULT_CONFIG = {
     "checks": {
         "linting": False,
@@ -16,6 +26,11 @@ DEFAULT_CONFIG = {
         "branch_awareness": True
     },
     "protected_branches": ["main"],
+    "paths": {
+        "exclude": [],
+        "checks": {},
+        "overrides": {}
+    },
     "behavior": {
         "linting": "interactive",
         "formatting": "interactive",
@@ -23,39 +38,253 @@ DEFAULT_CONFIG = {
         "tests": "block",
         "security": "block",
         "branch_awareness": "warn"
+    },
+    "execution": {
+        "parallel": True,
+        "max_workers": 4,
+        "fail_fast": False,
+        "snapshot": True,
+        "snapshot_dir": None,
+        "timeout": 600,
+        "cpu_seconds": None,
+        "memory_mb": None
+    },
+    "cache": {
+        "enabled": True,
+        "max_entries": 5000
+    },
+    "settings": {
+        "type_checking": {
+            "shared_cache": True,
+            "follow_imports": None
+        },
+        "tests": {
+            "selection": "full",
+            "workers": "auto",
+            "min_parallel_seconds": 2.0,
+            "time_budget": None
+        },
+        "security": {
+            "mode": "full",
+            "entropy_threshold": None
+        }
+    },
+    "daemon": {
+        "enabled": True,
+        "idle_timeout": 3600,
+        "timeout": 900
+    },
+    "history": {
+        "enabled": True,
+        "max_entries": 1000
     }
 }
 
+class ConfigError(ValueError):
+    pass
+
+def _is_bool(value):
+    return isinstance(value, bool)
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def _is_number(value):
+    return (isinstance(value, (int, float)) and not isinstance(value, bool)) or value is None
+
+def _is_limit(value):
+    return value is None or (_is_number(value) and value > 0)
+
+def _one_of(*choices):
+    return lambda value: value in choices
+
+def _is_patterns(value):
+    return isinstance(value, list) and all(isinstance(p, str) for p in value)
+
+def _is_path_scope(value):
+    return (isinstance(value, dict) and set(value) <= {"include", "exclude"}
+            and all(_is_patterns(v) for v in value.values()))
+
+# Dotted key -> (check, description). Keys not listed here (custom checks,
+# their settings) are not validated.
+SCHEMA = {
+    "protected_branches": (lambda v: isinstance(v, list) and all(isinstance(b, str) for b in v), "a list of branch names"),
+    "checks.*": (_is_bool, "true or false"),
+    "paths.exclude": (_is_patterns, "a list of glob patterns"),
+    "paths.checks.*": (_is_path_scope, 'an object with "include" and/or "exclude" pattern lists'),
+    "paths.overrides.*": (lambda v: isinstance(v, dict) and all(_is_bool(e) for e in v.values()),
+                          "an object of check names to true or false"),
+    "behavior.*": (_one_of(*BEHAVIORS), "one of " + ", ".join(BEHAVIORS)),
+    "execution.parallel": (_is_bool, "true or false"),
+    "execution.max_workers": (lambda v: _is_int(v) and v >= 1, "a positive integer"),
+    "execution.fail_fast": (_is_bool, "true or false"),
+    "execution.snapshot": (_is_bool, "true or false"),
+    "execution.snapshot_dir": (lambda v: v is None or isinstance(v, str), "a directory or null"),
+    "execution.timeout": (_is_limit, "a number of seconds or null"),
+    "execution.cpu_seconds": (_is_limit, "a number of seconds or null"),
+    "execution.memory_mb": (_is_limit, "a number of megabytes or null"),
+    "settings.*.timeout": (_is_limit, "a number of seconds or null"),
+    "settings.*.cpu_seconds": (_is_limit, "a number of seconds or null"),
+    "settings.*.memory_mb": (_is_limit, "a number of megabytes or null"),
+    "cache.enabled": (_is_bool, "true or false"),
+    "cache.max_entries": (lambda v: _is_int(v) and v >= 1, "a positive integer"),
+    "settings.type_checking.shared_cache": (_is_bool, "true or false"),
+    "settings.type_checking.follow_imports": (_one_of(None, "normal", "silent", "skip", "error"),
+                                              "normal, silent, skip, error or null"),
+    "settings.tests.selection": (_one_of("full", "impact"), "full or impact"),
+    "settings.tests.workers": (lambda v: v == "auto" or (_is_int(v) and v >= 0), "auto or a number of processes"),
+    "settings.tests.min_parallel_seconds": (_is_number, "a number of seconds"),
+    "settings.tests.time_budget": (lambda v: v is None or (_is_number(v) and v > 0), "a number of seconds or null"),
+    "settings.security.mode": (_one_of("full", "staged"), "full or staged"),
+    "settings.security.entropy_threshold": (_is_limit, "a number of bits per character or null"),
+    "daemon.enabled": (_is_bool, "true or false"),
+    "daemon.idle_timeout": (_is_number, "a number of seconds"),
+    "daemon.timeout": (_is_number, "a number of seconds"),
+    "history.enabled": (_is_bool, "true or false"),
+    "history.max_entries": (lambda v: _is_int(v) and v >= 1, "a positive integer")
+}
+
+def validate(data):
+    problems = []
+    if not isinstance(data, dict):
+        raise ConfigError("Invalid configuration: expected a JSON object")
+    for key, (check, description) in SCHEMA.items():
+        pattern, _, name = key.rpartition(".")
+        for section, parent in _sections(data, pattern):
+            if not isinstance(parent, dict):
+                if parent is not None:
+                    problems.append(f"{section} must be an object")
+                continue
+            names = parent.keys() if name == "*" else [name] if name in parent else []
+            for name in names:
+                if not check(parent[name]):
+                    problems.append(f"{section + '.' if section else ''}{name} must be {description}, "
+                                    f"got {json.dumps(parent[name])}")
+    if problems:
+        # A section that is not an object shows up once per key checked in it
+        raise ConfigError("Invalid configuration: " + "; ".join(dict.fromkeys(problems)))
+
+def _sections(data, pattern):
+    # (dotted key, value) of each section a schema key applies to; a "*"
+    # component stands for every key of an object ("settings.*")
+    if not pattern:
+        return [("", data)]
+    head, wildcard, rest = pattern.partition(".*")
+    parent = _lookup(data, head)
+    if not wildcard or not isinstance(parent, dict):
+        return [(head, parent)]
+    found = []
+    for name in parent:
+        found += _sections(data, f"{head}.{name}{rest}")
+    return found
+
+def _lookup(data, key):
+    for k in key.split('.'):
+        if not isinstance(data, dict):
+            return None
+        data = data.get(k)
+    return data
+
+def find_repo_root(start=None):
+    # The nearest directory with a .git entry (a directory, or a file in
+    # worktrees and submodules); no git subprocess on the hook's hot path
+    path = Path(start or os.getcwd()).resolve()
+    for candidate in (path, *path.parents):
+        if os.path.exists(candidate / ".git"):
+            return candidate
+    return None
+
+def local_config_path(root=None):
+    # Tests and callers may point LOCAL_CONFIG_PATH at an absolute file
+    if LOCAL_CONFIG_PATH.is_absolute():
+        return LOCAL_CONFIG_PATH
+    root = root or find_repo_root()
+    return Path(root) / LOCAL_CONFIG_PATH if root else LOCAL_CONFIG_PATH
+
+# In-process copy of the compiled configs (the daemon, tests), as JSON text so
+# every Config gets its own copy
+_compiled = {}
+
 class Config:
-    def __init__(self):
-        self.data = self._load()
+    def __init__(self, root=None, validate_config=True):
+        # `root` is the repository whose .merc applies (found from the
+        # current directory when not given)
+        self.local_path = local_config_path(root)
+        self.data = self._load(validate_config)
     
-    def _load(self):
-        config = DEFAULT_CONFIG.copy()
-        
-        if GLOBAL_CONFIG_PATH.exists():
-            with open(GLOBAL_CONFIG_PATH, 'r') as f:
-                global_config = json.load(f)
-                config = self._merge(config, global_config)
+    @classmethod
+    def from_data(cls, data):
+        # A config merged elsewhere, e.g. sent by a client to the daemon
+        config = cls.__new__(cls)
+        config.local_path = local_config_path()
+        config.data = data
+        return config
+    
+    def _load(self, validate_config=True):
+        sources = [GLOBAL_CONFIG_PATH, self.local_path]
+        stamp = [CONFIG_CACHE_VERSION, _defaults_digest()] + [_stat(path) for path in sources]
+        if validate_config:
+            cached = self._load_compiled(sources, stamp)
+            if cached is not None:
+                return cached
         
-        if LOCAL_CONFIG_PATH.exists():
-            with open(LOCAL_CONFIG_PATH, 'r') as f:
-                local_config = json.load(f)
-                config = self._merge(config, local_config)
+        config = copy.deepcopy(DEFAULT_CONFIG)
+        for path, source_stamp in zip(sources, stamp[2:]):
+            if source_stamp is None:
+                continue
+            try:
+                with open(path, 'r') as f:
+                    config = self._merge(config, json.load(f))
+            except ValueError as e:
+                raise ConfigError(f"Invalid configuration in {path}: {e}")
         
+        if validate_config:
+            validate(config)
+            self._save_compiled(sources, stamp, config)
         return config
     
+    def _load_compiled(self, sources, stamp):
+        key = _cache_key(sources)
+        memo = _compiled.get(key)
+        if memo is not None and memo[0] == stamp:
+            return json.loads(memo[1])
+        try:
+            with open(CONFIG_CACHE_DIR / f"config-{key}.json", 'r') as f:
+                text = f.read()
+            compiled = json.loads(text)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(compiled, dict) or compiled.get("stamp") != stamp:
+            return None
+        _compiled[key] = (stamp, json.dumps(compiled["data"]))
+        return compiled["data"]
+    
+    def _save_compiled(self, sources, stamp, config):
+        key = _cache_key(sources)
+        _compiled[key] = (stamp, json.dumps(config))
+        path = CONFIG_CACHE_DIR / f"config-{key}.json"
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'w') as f:
+                json.dump({"stamp": stamp, "data": config}, f)
+            os.replace(tmp_path, path)
+        except OSError:
+            return
+        _prune_compiled(CONFIG_CACHE_DIR)
+    
     def _merge(self, base, override):
-        result = base.copy()
+        result = copy.deepcopy(base)
         for key, value in override.items():
-            if isinstance(value, dict) and key in result:
+            if isinstance(value, dict) and isinstance(result.get(key), dict):
                 result[key] = self._merge(result[key], value)
             else:
-                result[key] = value
+                result[key] = copy.deepcopy(value)
         return result
     
     def save(self, global_config=False):
-        path = GLOBAL_CONFIG_PATH if global_config else LOCAL_CONFIG_PATH
+        validate(self.data)
+        path = GLOBAL_CONFIG_PATH if global_config else self.local_path
         path.parent.mkdir(parents=True, exist_ok=True)
         with open(path, 'w') as f:
             json.dump(self.data, f, indent=2)
@@ -78,3 +307,39 @@ class Config:
                 data[k] = {}
             data = data[k]
         data[keys[-1]] = value
+
+def _prune_compiled(cache_dir):
+    # Only runs after a miss. Keeps the most recently written entries; those
+    # of removed repositories age out with the rest.
+    try:
+        entries = [(entry.stat().st_mtime_ns, entry) for entry in os.scandir(cache_dir)
+                   if entry.name.startswith("config-") and entry.name.endswith(".json")]
+    except OSError:
+        return
+    if len(entries) <= CONFIG_CACHE_MAX_ENTRIES:
+        return
+    entries.sort(key=lambda item: item[0], reverse=True)
+    for _, entry in entries[CONFIG_CACHE_MAX_ENTRIES:]:
+        try:
+            os.unlink(entry.path)
+        except OSError:
+            pass
+
+def _stat(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [str(path), st.st_mtime_ns, st.st_size]
+
+def _cache_key(sources):
+    return hashlib.sha1("\0".join(str(Path(p).absolute()) for p in sources).encode("utf-8")).hexdigest()[:16]
+
+_DEFAULTS_DIGEST = None
+
+def _defaults_digest():
+    # DEFAULT_CONFIG changes between versions of me
+    global _DEFAULTS_DIGEST
+    if _DEFAULTS_DIGEST is None:
+        _DEFAULTS_DIGEST = hashlib.sha1(json.dumps(DEFAULT_CONFIG, sort_keys=True).encode("utf-8")).hexdigest()
+    return _DEFAULTS_DIGEST
@@ -0,0 +1,397 @@
+# Optional per-repository check server. `me daemon start` leaves a process
+# listening on a Unix socket in the git common dir; `me check`, `me commit` and
+# the hook hand their run to it when it answers and run in-process otherwise.
+# The daemon keeps tool state warm between commits: a dmypy server per
+# worktree and a fork server with pytest already imported.
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+import socket
+import stat
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+from monitor_everything.executor import POLL_INTERVAL, CheckCancelled, limit_exceeded, set_limits
+
+PROTOCOL_VERSION = 2
+
+# AF_UNIX paths are limited to ~108 bytes; longer ones go to the temp dir
+MAX_SOCKET_PATH = 100
+
+# Set by git for hooks (e.g. `git commit -a` checks a temporary index) and
+# forwarded with each run, so the daemon checks what the client would
+GIT_ENV = ("GIT_INDEX_FILE", "GIT_DIR", "GIT_WORK_TREE")
+
+# dmypy reports its own lifecycle on stdout next to the type errors
+DMYPY_NOISE = ("Daemon started", "Daemon stopped", "Restarting: ")
+
+def socket_path(common_dir: Path) -> Path:
+    # Always in a directory private to the user (made so by the daemon)
+    path = Path(common_dir) / "me" / "daemon.sock"
+    if len(str(path)) < MAX_SOCKET_PATH:
+        return path
+    digest = hashlib.sha1(str(common_dir).encode("utf-8")).hexdigest()[:12]
+    return Path(tempfile.gettempdir()) / f"me-daemon-{os.getuid()}" / f"{digest}.sock"
+
+def _is_ours(path: Path) -> bool:
+    # Only a socket this user created is trusted with a run's results;
+    # anything else at the path may be another user's impostor
+    try:
+        info = os.lstat(path)
+    except OSError:
+        return False
+    return stat.S_ISSOCK(info.st_mode) and info.st_uid == os.getuid()
+
+def _version() -> str:
+    from monitor_everything.main import __version__
+    return f"{__version__}/{PROTOCOL_VERSION}"
+
+def request(common_dir: Path, payload: Dict, timeout: Optional[float] = None) -> Optional[Dict]:
+    # One JSON line each way. None means no daemon (or a broken one); callers
+    # then do the work themselves.
+    path = socket_path(common_dir)
+    if not _is_ours(path):
+        return None
+    
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(str(path))
+            sock.sendall(json.dumps(dict(payload, version=_version())).encode("utf-8") + b"\n")
+            with sock.makefile("rb") as reader:
+                line = reader.readline()
+        response = json.loads(line)
+    except (OSError, ValueError):
+        return None
+    
+    if not isinstance(response, dict) or not response.get("ok"):
+        return None
+    return response
+
+def ping(common_dir: Path) -> Optional[Dict]:
+    return request(common_dir, {"op": "ping"}, timeout=2)
+
+def run_checks(state, config_data: Dict, timeout: Optional[float] = None) -> Optional[Dict]:
+    # The client sends its own merged config and git environment, so results
+    # match an in-process run from the same directory. A daemon that does not
+    # answer within `timeout` is given up on and the client runs the checks.
+    from monitor_everything.checks import CheckResult
+    from monitor_everything.diagnostics import Diagnostic
+    
+    response = request(state.common_dir, {
+        "op": "check",
+        "root": str(state.root),
+        "config": config_data,
+        "env": {name: os.path.abspath(os.environ[name]) for name in GIT_ENV if os.environ.get(name)}
+    }, timeout=timeout)
+    if response is None:
+        return None
+    
+    results = response["results"]
+    for check in results["checks"]:
+        check["result"] = CheckResult(check["result"])
+        check["diagnostics"] = [Diagnostic.from_dict(d) for d in check["diagnostics"]]
+    return results
+
+class WarmTools:
+    # Tool runners handed to checks through `context["tools"]`. Each returns a
+    # CompletedProcess so checks parse the output exactly as for subprocess.run.
+    def __init__(self, common_dir: Path):
+        self.common_dir = Path(common_dir)
+        self._status_files = set()
+        self._lock = threading.Lock()
+        self._forkserver = None
+    
+    def has_dmypy(self) -> bool:
+        return shutil.which("dmypy") is not None
+    
+    def mypy(self, args: List[str], cwd, stream) -> subprocess.CompletedProcess:
+        # One dmypy server per worktree, since it type checks relative to cwd.
+        # `stream` is the check's Check.stream, so its cancel event (timeout,
+        # fail_fast) and limits stop the dmypy client like any other tool.
+        digest = hashlib.sha1(str(cwd).encode("utf-8")).hexdigest()[:12]
+        status_file = self.common_dir / "me" / f"dmypy-{digest}.json"
+        status_file.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            self._status_files.add(status_file)
+        
+        command = ["dmypy", "--status-file", str(status_file), "run", "--"] + args
+        result = stream(command, cwd=cwd)
+        lines = [l for l in result.stdout.splitlines(True) if not l.startswith(DMYPY_NOISE)]
+        result.stdout = "".join(lines)
+        return result
+    
+    def has_pytest(self) -> bool:
+        # Only stand in for `pytest` when it is the one on PATH, i.e. the
+        # daemon's interpreter has the same plugins as the command would.
+        executable = shutil.which("pytest")
+        if not executable:
+            return False
+        if Path(executable).resolve().parent != Path(sys.executable).resolve().parent:
+            return False
+        try:
+            import importlib.util
+            return importlib.util.find_spec("pytest") is not None
+        except (ImportError, ValueError):
+            return False
+    
+    def pytest(self, args: List[str], cwd, cancel: Optional[threading.Event] = None,
+               env: Optional[Dict[str, str]] = None, limits: Optional[Dict] = None) -> subprocess.CompletedProcess:
+        # Each run gets a fresh child of a fork server that imported pytest
+        # once, so project code is never reused between runs.
+        ctx = self._context()
+        with tempfile.TemporaryDirectory(prefix="me-pytest-") as tmp:
+            stdout_path = os.path.join(tmp, "stdout")
+            stderr_path = os.path.join(tmp, "stderr")
+            process = ctx.Process(target=_run_pytest, args=(list(args), str(cwd), stdout_path, stderr_path, env, limits))
+            process.start()
+            while process.exitcode is None:
+                process.join(POLL_INTERVAL)
+                if cancel is not None and cancel.is_set():
+                    process.terminate()
+                    process.join()
+                    raise CheckCancelled("pytest was cancelled")
+            exceeded = limit_exceeded("pytest", process.exitcode, limits)
+            if exceeded is not None:
+                raise exceeded
+            
+            return subprocess.CompletedProcess(
+                ["pytest"] + list(args),
+                process.exitcode,
+                stdout=_read_text(stdout_path),
+                stderr=_read_text(stderr_path)
+            )
+    
+    def _context(self):
+        with self._lock:
+            if self._forkserver is None:
+                import multiprocessing
+                ctx = multiprocessing.get_context("forkserver")
+                ctx.set_forkserver_preload(["pytest"])
+                self._forkserver = ctx
+            return self._forkserver
+    
+    def close(self):
+        for status_file in self._status_files:
+            if status_file.exists():
+                subprocess.run(["dmypy", "--status-file", str(status_file), "stop"],
+                               capture_output=True)
+
+def _read_text(path: str) -> str:
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            return f.read()
+    except OSError:
+        return ""
+
+def _run_pytest(args, cwd, stdout_path, stderr_path, env=None, limits=None):
+    # Runs in the fork server's child; redirect at the fd level so pytest's
+    # own capturing and any subprocesses it starts write to the files too.
+    set_limits(limits)
+    os.chdir(cwd)
+    if env:
+        os.environ.update(env)
+        # PYTHONPATH is only read at start-up; apply it to this interpreter too
+        sys.path[:0] = [p for p in env.get("PYTHONPATH", "").split(os.pathsep) if p]
+    for fd, path in ((1, stdout_path), (2, stderr_path)):
+        target = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        os.dup2(target, fd)
+        os.close(target)
+    
+    import pytest
+    code = pytest.main(args)
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os._exit(int(code))
+
+class CheckDaemon:
+    def __init__(self, common_dir: Path, idle_timeout: float = 3600):
+        self.common_dir = Path(common_dir)
+        self.path = socket_path(self.common_dir)
+        self.idle_timeout = idle_timeout
+        self.tools = WarmTools(self.common_dir)
+        self._run_lock = threading.Lock()
+        self._active_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._active = 0
+        self._last_activity = time.monotonic()
+    
+    def serve(self):
+        import socketserver
+        
+        daemon = self
+        
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                daemon._handle(self.rfile, self.wfile)
+        
+        class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+            daemon_threads = True
+        
+        from monitor_everything.snapshot import private_dir
+        
+        self.path.parent.parent.mkdir(parents=True, exist_ok=True)
+        private_dir(self.path.parent)
+        self._remove_stale_socket()
+        # Created 0600 rather than chmod'ed after bind, which leaves a window
+        umask = os.umask(0o177)
+        try:
+            server = Server(str(self.path), Handler)
+        finally:
+            os.umask(umask)
+        try:
+            server.timeout = 0.5
+            while not self._stopping.is_set():
+                server.handle_request()
+                idle = time.monotonic() - self._last_activity
+                if self.idle_timeout and self._active == 0 and idle > self.idle_timeout:
+                    break
+        finally:
+            server.server_close()
+            try:
+                self.path.unlink()
+            except OSError:
+                pass
+            self.tools.close()
+    
+    def stop(self):
+        self._stopping.set()
+    
+    def _remove_stale_socket(self):
+        if not os.path.lexists(self.path):
+            return
+        if ping(self.common_dir) is not None:
+            raise RuntimeError(f"A daemon is already listening on {self.path}")
+        self.path.unlink()
+    
+    def _handle(self, rfile, wfile):
+        with self._active_lock:
+            self._active += 1
+        try:
+            try:
+                message = json.loads(rfile.readline())
+                response = self._dispatch(message)
+            except Exception as e:
+                response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+            try:
+                wfile.write(json.dumps(response, default=str).encode("utf-8") + b"\n")
+            except OSError:
+                # The client gave up waiting
+                pass
+        finally:
+            with self._active_lock:
+                self._active -= 1
+                self._last_activity = time.monotonic()
+    
+    def _dispatch(self, message: Dict) -> Dict:
+        op = message.get("op")
+        if op == "ping":
+            return {"ok": True, "pid": os.getpid(), "version": _version()}
+        if op == "stop":
+            self.stop()
+            return {"ok": True}
+        
+        if message.get("version") != _version():
+            # Client and daemon run different code; the client falls back
+            return {"ok": False, "error": "version mismatch"}
+        if op == "check":
+            return {"ok": True, "results": self._run_checks(Path(message["root"]), message["config"],
+                                                            message.get("env") or {})}
+        return {"ok": False, "error": f"Unknown request: {op}"}
+    
+    def _run_checks(self, root: Path, config_data: Dict, env: Dict[str, str]) -> Dict:
+        from monitor_everything.config import Config
+        from monitor_everything.git_utils import get_repo_state
+        from monitor_everything.runner import CheckRunner
+        
+        # dmypy and the scratch state of tools are shared; one commit at a time
+        with self._run_lock, _git_environment(env):
+            state = get_repo_state(root)
+            if state is None:
+                raise RuntimeError(f"Not a git repository: {root}")
+            runner = CheckRunner(Config.from_data(config_data), tools=self.tools)
+            results = runner.run_all_checks(state)
+        
+        for check in results["checks"]:
+            check["result"] = check["result"].value
+            check["diagnostics"] = [d.to_dict() for d in check["diagnostics"]]
+        return results
+
+@contextlib.contextmanager
+def _git_environment(env: Dict[str, str]):
+    # The client's GIT_* variables for the length of a run. Every git call of
+    # the run (and the tools it starts) inherits them; runs hold the run lock,
+    # so they never see each other's.
+    saved = {name: os.environ.get(name) for name in GIT_ENV}
+    for name in GIT_ENV:
+        if env.get(name):
+            os.environ[name] = env[name]
+        else:
+            os.environ.pop(name, None)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+def start(state, timeout: float = 10) -> Optional[Dict]:
+    # Spawns a detached daemon for the repository and waits until it answers
+    log_path = Path(state.common_dir) / "me" / "daemon.log"
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(log_path, 'ab') as log:
+        subprocess.Popen(
+            [sys.executable, "-m", "monitor_everything.daemon", str(state.root)],
+            cwd=state.root,
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            start_new_session=True
+        )
+    
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        info = ping(state.common_dir)
+        if info is not None:
+            return info
+        time.sleep(0.05)
+    return None
+
+def stop(common_dir: Path) -> bool:
+    return request(common_dir, {"op": "stop"}, timeout=10) is not None
+
+def main(argv=None) -> int:
+    from monitor_everything.config import Config, ConfigError
+    from monitor_everything.git_utils import get_repo_state
+    
+    argv = sys.argv[1:] if argv is None else argv
+    root = Path(argv[0]) if argv else Path.cwd()
+    state = get_repo_state(root)
+    if state is None:
+        print(f"Not a git repository: {root}", file=sys.stderr)
+        return 1
+    
+    os.chdir(state.root)
+    try:
+        idle_timeout = Config(root=state.root).get("daemon.idle_timeout", 3600)
+    except ConfigError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    daemon = CheckDaemon(state.common_dir, idle_timeout=idle_timeout)
+    try:
+        daemon.serve()
+    except RuntimeError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
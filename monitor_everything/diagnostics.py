@@ -0,0 +1,167 @@
+# Structured findings reported by checks, filled from each tool's
+# machine-readable output rather than scraped from its terminal output.
+import json
+import os
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+SEVERITIES = ("error", "warning", "note")
+
+@dataclass(frozen=True, slots=True)
+class Diagnostic:
+    path: str
+    line: Optional[int] = None
+    column: Optional[int] = None
+    code: Optional[str] = None
+    severity: str = "error"
+    message: str = ""
+    
+    def __str__(self):
+        location = self.path
+        if self.line is not None:
+            location += f":{self.line}"
+            if self.column is not None:
+                location += f":{self.column}"
+        text = self.message if self.severity == "error" else f"{self.severity}: {self.message}"
+        if self.code:
+            text += f" [{self.code}]"
+        return f"{location}: {text}"
+    
+    def to_dict(self) -> Dict:
+        return {key: getattr(self, key) for key in self.__slots__ if getattr(self, key) is not None}
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Diagnostic":
+        return cls(**{key: data[key] for key in cls.__slots__ if key in data})
+    
+    def to_tuple(self) -> Tuple:
+        # Compact form for the result cache
+        return (self.path, self.line, self.column, self.code, self.severity, self.message)
+    
+    @classmethod
+    def from_tuple(cls, values) -> "Diagnostic":
+        return cls(*values)
+
+def relative_path(path: str, root) -> str:
+    # Tools report absolute paths (Ruff) or paths relative to their cwd
+    if root and os.path.isabs(path):
+        relative = os.path.relpath(path, root)
+        if not relative.startswith(".."):
+            path = relative
+    return path.replace(os.sep, "/")
+
+def iter_json_lines(text: str) -> Iterable[Tuple[Optional[Dict], str]]:
+    # (record, None) for JSON object lines, (None, line) for anything else
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            continue
+        if stripped.startswith("{"):
+            try:
+                record = json.loads(stripped)
+            except ValueError:
+                record = None
+            if isinstance(record, dict):
+                yield record, None
+                continue
+        yield None, line
+
+def parse_ruff(text: str, root=None) -> Tuple[List[Diagnostic], List[str]]:
+    # `ruff check --output-format json-lines`
+    diagnostics = []
+    other = []
+    for record, line in iter_json_lines(text):
+        if record is None:
+            other.append(line)
+            continue
+        location = record.get("location") or {}
+        diagnostics.append(Diagnostic(
+            path=relative_path(record.get("filename", ""), root),
+            line=location.get("row"),
+            column=location.get("column"),
+            code=record.get("code"),
+            severity="error",
+            message=record.get("message", "")
+        ))
+    return diagnostics, other
+
+def parse_mypy(text: str, root=None) -> Tuple[List[Diagnostic], List[str]]:
+    # `mypy -O json`; columns there are 0-based, unlike mypy's text output
+    diagnostics = []
+    other = []
+    for record, line in iter_json_lines(text):
+        if record is None:
+            other.append(line)
+            continue
+        line_no = record.get("line")
+        column = record.get("column")
+        severity = record.get("severity", "error")
+        diagnostics.append(Diagnostic(
+            path=relative_path(record.get("file", ""), root),
+            line=line_no if isinstance(line_no, int) and line_no > 0 else None,
+            column=column + 1 if isinstance(column, int) and column >= 0 else None,
+            code=record.get("code"),
+            severity=severity if severity in SEVERITIES else "error",
+            message=record.get("message", "")
+        ))
+        if record.get("hint"):
+            diagnostics.append(Diagnostic(
+                path=diagnostics[-1].path,
+                line=diagnostics[-1].line,
+                column=diagnostics[-1].column,
+                severity="note",
+                message=record["hint"]
+            ))
+    return diagnostics, other
+
+def parse_black(text: str, root=None) -> Tuple[List[Diagnostic], List[str]]:
+    # Black has no machine-readable mode; its per-file lines are stable though
+    diagnostics = []
+    other = []
+    for line in text.splitlines():
+        if line.startswith("would reformat "):
+            diagnostics.append(Diagnostic(
+                path=relative_path(line[len("would reformat "):], root),
+                code="format",
+                message="would reformat"
+            ))
+        elif line.startswith("error: cannot format "):
+            path, _, message = line[len("error: cannot format "):].partition(": ")
+            diagnostics.append(Diagnostic(
+                path=relative_path(path, root),
+                code="parse-error",
+                message=message or "cannot format"
+            ))
+        elif line.strip():
+            other.append(line)
+    return diagnostics, other
+
+def pytest_not_run(text: str) -> List[str]:
+    # Tests the plugin left out when the time budget ran out
+    for record, _ in iter_json_lines(text):
+        if record is not None and "not_run" in record:
+            return list(record["not_run"])
+    return []
+
+def parse_pytest_report(text: str, root=None) -> List[Diagnostic]:
+    # Lines written by monitor_everything.pytest_plugin
+    diagnostics = []
+    for record, _ in iter_json_lines(text):
+        if record is None or "not_run" in record:
+            continue
+        path = record.get("path") or ""
+        if record.get("rootdir"):
+            path = os.path.join(record["rootdir"], path)
+        line = record.get("line")
+        message = record.get("message", "")
+        if record.get("test"):
+            message = f"{record['test']}: {message}" if message else record["test"]
+        diagnostics.append(Diagnostic(
+            path=relative_path(path, root),
+            # pytest locations are 0-based
+            line=line + 1 if isinstance(line, int) else None,
+            code=record.get("outcome"),
+            severity="error",
+            message=message
+        ))
+    return diagnostics
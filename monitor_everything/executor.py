@@ -0,0 +1,292 @@
+# Runs check tools as subprocesses while their output is read line by line,
+# so a check can spot a failure before the tool exits and the runner can stop
+# tools whose result no longer matters.
+import errno
+import math
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import threading
+from typing import Callable, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows
+    resource = None
+
+# How often a running tool looks at its cancel event
+POLL_INTERVAL = 0.05
+
+# Grace period between SIGTERM and SIGKILL for a cancelled tool
+TERMINATE_TIMEOUT = 2
+
+# Runs a tool under rlimits, see with_limits()
+LIMIT_SHIM = ("import sys; sys.path.insert(0, sys.argv[1]); "
+              "from monitor_everything.executor import _exec_with_limits; "
+              "_exec_with_limits(sys.argv[2:])")
+
+# Room left in the argv budget for the loader and anything we missed
+ARGV_HEADROOM = 4096
+# Per-argument cost besides the string: its terminating NUL and argv pointer
+ARG_OVERHEAD = 1 + 8
+
+class CheckCancelled(Exception):
+    pass
+
+class LimitExceeded(CheckCancelled):
+    # The tool was killed for going over a resource limit
+    pass
+
+def run_streaming(command: List[str], cwd=None, cancel: Optional[threading.Event] = None,
+                  on_line: Optional[Callable[[str], None]] = None, env=None,
+                  limits: Optional[Dict] = None) -> subprocess.CompletedProcess:
+    # Same result as subprocess.run(capture_output=True, text=True), but
+    # `on_line` sees each stdout/stderr line as it is written, and setting
+    # `cancel` terminates the tool and raises CheckCancelled. `limits`
+    # ("cpu_seconds", "memory_mb") become rlimits of the tool process.
+    process = subprocess.Popen(
+        with_limits(command, limits, env),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        cwd=cwd,
+        env=env
+    )
+    
+    stdout: List[str] = []
+    stderr: List[str] = []
+    readers = [
+        threading.Thread(target=_pump, args=(process.stdout, stdout, on_line), daemon=True),
+        threading.Thread(target=_pump, args=(process.stderr, stderr, on_line), daemon=True)
+    ]
+    for reader in readers:
+        reader.start()
+    
+    cancelled = False
+    usage = None
+    try:
+        while True:
+            reaped, usage = _reap(process, block=cancel is None)
+            if reaped:
+                break
+            if cancel.is_set():
+                cancelled = True
+                _terminate(process)
+                break
+            # Tools close stdout when they exit, so this wakes up right away then
+            if readers[0].is_alive():
+                readers[0].join(POLL_INTERVAL)
+            else:
+                cancel.wait(POLL_INTERVAL)
+    except BaseException:
+        # Ctrl-C while waiting: don't leave the tool running
+        if process.poll() is None:
+            _terminate(process)
+        raise
+    
+    for reader in readers:
+        # A grandchild may still hold the pipe open; don't wait on it forever
+        reader.join(TERMINATE_TIMEOUT if cancelled else None)
+    
+    if cancelled:
+        raise CheckCancelled(f"{command[0]} was cancelled")
+    exceeded = limit_exceeded(command[0], process.returncode, limits, usage)
+    if exceeded is not None:
+        raise exceeded
+    
+    result = subprocess.CompletedProcess(command, process.returncode, "".join(stdout), "".join(stderr))
+    # resource.struct_rusage of the tool (None where wait4 is unavailable)
+    result.usage = usage
+    return result
+
+def _reap(process: subprocess.Popen, block: bool):
+    # Waits like Popen.wait()/poll(), but through wait4 so the tool's CPU time
+    # and peak RSS come back with its exit status.
+    if not hasattr(os, "wait4"):
+        if block:
+            process.wait()
+        return process.poll() is not None, None
+    
+    try:
+        pid, status, usage = os.wait4(process.pid, 0 if block else os.WNOHANG)
+    except ChildProcessError:
+        # Already reaped elsewhere
+        process.wait()
+        return True, None
+    if not pid:
+        return False, None
+    process.returncode = os.waitstatus_to_exitcode(status)
+    return True, usage
+
+def limit_values(limits: Optional[Dict]):
+    # (cpu seconds, address space bytes) to set, None for no limit
+    if not limits or resource is None:
+        return None
+    cpu = limits.get("cpu_seconds")
+    memory = limits.get("memory_mb")
+    if not cpu and not memory:
+        return None
+    return (math.ceil(cpu) if cpu else None, int(memory * 1024 * 1024) if memory else None)
+
+def with_limits(command: List[str], limits: Optional[Dict], env=None) -> List[str]:
+    # The command line that runs `command` under `limits`: a Python shim sets
+    # them in the new process and execs the tool. (preexec_fn would do it in
+    # the forked child of a threaded runner, where only async-signal-safe
+    # code may run.)
+    values = limit_values(limits)
+    if values is None:
+        return command
+    if os.sep not in command[0] and not shutil.which(command[0], path=(env or os.environ).get("PATH")):
+        # What Popen raises for a missing tool, which checks report as such
+        raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), command[0])
+    package_parent = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    cpu, memory = ("" if value is None else str(value) for value in values)
+    return [sys.executable, "-I", "-S", "-c", LIMIT_SHIM, package_parent, cpu, memory] + list(command)
+
+def _exec_with_limits(args: List[str]):
+    # The shim's side: <cpu seconds> <address space bytes> <command...>
+    cpu, memory, command = args[0], args[1], args[2:]
+    _apply_limits(int(cpu) if cpu else None, int(memory) if memory else None)
+    try:
+        os.execvp(command[0], command)
+    except OSError as e:
+        sys.stderr.write(f"{command[0]}: {e.strerror}\n")
+        os._exit(127)
+
+def set_limits(limits: Optional[Dict]):
+    # Lowers this process's limits (e.g. a fork server child about to run a
+    # tool in-process). Only lowers limits: an unprivileged process cannot
+    # raise its hard limit.
+    values = limit_values(limits)
+    if values is not None:
+        _apply_limits(*values)
+
+def _apply_limits(cpu: Optional[int], memory: Optional[int]):
+    if cpu:
+        # SIGXCPU at the soft limit, SIGKILL a second later for tools that
+        # ignore it
+        _lower_limit(resource.RLIMIT_CPU, cpu, cpu + 1)
+    if memory:
+        _lower_limit(resource.RLIMIT_AS, memory, memory)
+
+def _lower_limit(which, soft: int, hard: int):
+    current_soft, current_hard = resource.getrlimit(which)
+    if current_hard != resource.RLIM_INFINITY:
+        hard = min(hard, current_hard)
+        soft = min(soft, hard)
+    resource.setrlimit(which, (soft, hard))
+
+def limit_exceeded(tool: str, returncode: Optional[int], limits: Optional[Dict], usage=None) -> Optional[LimitExceeded]:
+    # Going over RLIMIT_AS shows up as an ordinary crash (MemoryError, failed
+    # allocation) and is left to the tool's own output; the CPU limit has
+    # its own signals. A SIGKILL only counts when the tool used up its CPU
+    # time, if that is known: the OOM killer sends one too.
+    cpu = (limits or {}).get("cpu_seconds")
+    if not cpu or resource is None or returncode is None:
+        return None
+    if returncode == -signal.SIGXCPU:
+        pass
+    elif returncode != -signal.SIGKILL:
+        return None
+    elif usage is not None and usage.ru_utime + usage.ru_stime < math.ceil(cpu):
+        return None
+    return LimitExceeded(f"{tool} exceeded its CPU limit of {cpu:g}s")
+
+def rss_kb(max_rss: int) -> int:
+    # ru_maxrss is in kilobytes on Linux but in bytes on macOS
+    if sys.platform == "darwin":
+        return max_rss // 1024
+    return max_rss
+
+def _pump(stream, lines: List[str], on_line):
+    try:
+        for line in stream:
+            lines.append(line)
+            if on_line is not None:
+                on_line(line.rstrip("\n"))
+    except ValueError:
+        # Stream closed while terminating
+        pass
+    finally:
+        stream.close()
+
+def _terminate(process: subprocess.Popen):
+    process.terminate()
+    try:
+        process.wait(timeout=TERMINATE_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+def argv_budget() -> int:
+    # Bytes available for a tool's command line: ARG_MAX covers argv and the
+    # environment together.
+    try:
+        limit = os.sysconf("SC_ARG_MAX")
+    except (AttributeError, ValueError, OSError):
+        # Windows: CreateProcess command lines are capped at 32767 characters
+        limit = 32767
+    if limit <= 0:
+        limit = 32767
+    
+    environment = sum(_arg_size(f"{key}={value}") for key, value in os.environ.items())
+    return max(limit - environment - ARGV_HEADROOM, 4096)
+
+def _arg_size(arg: str) -> int:
+    return len(os.fsencode(arg)) + ARG_OVERHEAD
+
+def chunk_arguments(command: List[str], args: List[str], budget: int) -> List[List[str]]:
+    # Splits `args` into the fewest runs of `command + chunk` that each fit
+    # in `budget`, keeping their order
+    base = sum(_arg_size(arg) for arg in command)
+    chunks = []
+    current = []
+    size = base
+    for arg in args:
+        cost = _arg_size(arg)
+        if current and size + cost > budget:
+            chunks.append(current)
+            current = []
+            size = base
+        current.append(arg)
+        size += cost
+    if current:
+        chunks.append(current)
+    return chunks
+
+def fits_in_argv(command: List[str]) -> bool:
+    return sum(_arg_size(arg) for arg in command) <= argv_budget()
+
+def merge_results(command: List[str], results: List[subprocess.CompletedProcess]) -> subprocess.CompletedProcess:
+    # One result for a tool run in chunks. Exit codes other than 0 and 1
+    # (usage errors, crashes, signals) win over 1 ("issues found"), and lines
+    # repeated by several chunks (summaries, errors in shared imports) are
+    # kept once. Repeats within one chunk's output are the tool's own and stay.
+    codes = [result.returncode for result in results]
+    returncode = next((code for code in codes if code not in (0, 1)), max(codes))
+    merged = subprocess.CompletedProcess(
+        command,
+        returncode,
+        _merge_lines(result.stdout for result in results),
+        _merge_lines(result.stderr for result in results)
+    )
+    merged.usage = None
+    return merged
+
+def _merge_lines(outputs) -> str:
+    # Each line as many times as the chunk repeating it most
+    kept: Dict[str, int] = {}
+    lines = []
+    for output in outputs:
+        counts: Dict[str, int] = {}
+        for line in (output or "").splitlines(True):
+            if not line.endswith("\n"):
+                line += "\n"
+            counts[line] = counts.get(line, 0) + 1
+            if counts[line] > kept.get(line, 0):
+                kept[line] = counts[line]
+                lines.append(line)
+    return "".join(lines)
@@ -1,5 +1,7 @@
 import subprocess
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Dict, List, Optional
 
 def is_git_repo():
     try:
@@ -36,3 +38,228 @@ def get_git_root():
         return Path(result.stdout.strip())
     except subprocess.CalledProcessError:
         return None
+
+def get_git_common_dir():
+    try:
+        result = subprocess.run(["git", "rev-parse", "--git-common-dir"],
+                              capture_output=True, text=True, check=True)
+        return Path(result.stdout.strip()).resolve()
+    except subprocess.CalledProcessError:
+        return None
+
+def iter_staged_hunks(paths=None, cwd=None):
+    # Yields (path, first_line, added_lines) for every block of added lines in
+    # the staged diff, streaming `git diff --cached -U0` instead of buffering it.
+    # The staged bytes themselves are diffed (no textconv), limited to `paths`
+    # unless they don't fit in a command line.
+    command = ["git", "-c", "core.quotepath=off", "--literal-pathspecs", "diff", "--cached", "-U0",
+               "--no-color", "--no-ext-diff", "--no-textconv", "--no-renames",
+               "--src-prefix=a/", "--dst-prefix=b/"]
+    if paths is not None:
+        from monitor_everything.executor import fits_in_argv
+
+        if not paths:
+            return
+        if fits_in_argv(command + ["--"] + list(paths)):
+            command += ["--"] + list(paths)
+    proc = subprocess.Popen(command, cwd=cwd, stdout=subprocess.PIPE,
+                            stderr=subprocess.DEVNULL)
+    path = None
+    line_no = None
+    lines = []
+    try:
+        for raw in proc.stdout:
+            if raw.startswith(b"+") and line_no is not None:
+                lines.append(raw[1:].rstrip(b"\n").decode("utf-8", "replace"))
+                line_no += 1
+                continue
+
+            if lines:
+                yield path, line_no - len(lines), lines
+                lines = []
+
+            if raw.startswith(b"@@"):
+                # @@ -a,b +c,d @@
+                new_range = raw.split(b" ")[2]
+                line_no = int(new_range[1:].split(b",")[0]) if path else None
+            elif raw.startswith(b"diff --git"):
+                path = None
+                line_no = None
+            elif raw.startswith(b"+++ "):
+                target = _unquote_path(raw[4:].rstrip(b"\n"))
+                path = target[2:] if target.startswith("b/") else None
+
+        if lines:
+            yield path, line_no - len(lines), lines
+    finally:
+        proc.stdout.close()
+        proc.wait()
+
+# Escapes git uses in C-quoted paths, besides \NNN octal bytes
+_C_ESCAPES = {ord("a"): 7, ord("b"): 8, ord("t"): 9, ord("n"): 10, ord("v"): 11,
+              ord("f"): 12, ord("r"): 13}
+
+def _unquote_path(raw):
+    # A diff header path: git C-quotes those with tabs, quotes, backslashes or
+    # control characters ("b/a\tb.py") and ends those with spaces with a tab
+    if not (raw.startswith(b'"') and raw.endswith(b'"') and len(raw) > 1):
+        return raw.rstrip(b"\t").decode("utf-8", "replace")
+
+    out = bytearray()
+    i = 1
+    while i < len(raw) - 1:
+        c = raw[i]
+        if c == ord("\\") and i + 1 < len(raw) - 1:
+            escaped = raw[i + 1]
+            if ord("0") <= escaped <= ord("7"):
+                out.append(int(raw[i + 1:i + 4], 8))
+                i += 4
+                continue
+            out.append(_C_ESCAPES.get(escaped, escaped))
+            i += 2
+            continue
+        out.append(c)
+        i += 1
+    return out.decode("utf-8", "replace")
+
+def get_staged_sizes(paths, cwd=None):
+    if not paths:
+        return {}
+    try:
+        result = subprocess.run(["git", "cat-file", "--batch-check"], cwd=cwd,
+                              input="".join(f":{p}\n" for p in paths),
+                              capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return {}
+
+    # One "<sha> <type> <size>" (or "<name> missing") line per requested path
+    sizes = {}
+    for path, line in zip(paths, result.stdout.splitlines()):
+        parts = line.split()
+        if len(parts) == 3 and parts[1] == "blob":
+            sizes[path] = int(parts[2])
+    return sizes
+
+def stage_files(paths, cwd=None):
+    # `git add` for any number of paths, passed on stdin rather than argv
+    if not paths:
+        return True
+    try:
+        subprocess.run(["git", "--literal-pathspecs", "add", "--pathspec-from-file=-",
+                        "--pathspec-file-nul"],
+                       cwd=cwd, input="".join(f"{p}\0" for p in paths),
+                       capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return False
+    return True
+
+@dataclass
+class StagedFile:
+    path: str
+    status: str
+    mode: str
+    sha: str
+
+@dataclass
+class RepoState:
+    root: Path
+    git_dir: Path
+    common_dir: Path
+    branch: Optional[str]
+    head: Optional[str]
+    staged: List[StagedFile] = field(default_factory=list)
+
+    @property
+    def files(self) -> List[str]:
+        return [entry.path for entry in self.staged]
+
+    @property
+    def blobs(self) -> Dict[str, str]:
+        return {entry.path: entry.sha for entry in self.staged}
+
+def get_repo_state(cwd=None):
+    # Everything the checks need about the repository, in two git calls. Only
+    # the index is compared against HEAD; nothing here stats the work tree.
+    try:
+        result = subprocess.run(["git", "rev-parse", "--show-toplevel", "--absolute-git-dir",
+                                 "--git-common-dir", "HEAD", "--symbolic-full-name", "HEAD", "--"],
+                              cwd=cwd, capture_output=True, text=True, check=True)
+        lines = result.stdout.splitlines()
+    except (OSError, subprocess.CalledProcessError):
+        # No commit yet (or not a repository at all)
+        lines = _unborn_head(cwd)
+    if lines is None or len(lines) < 5:
+        return None
+
+    root = Path(lines[0])
+    git_dir = Path(lines[1])
+    common_dir = Path(lines[2])
+    if not common_dir.is_absolute():
+        common_dir = (Path(cwd or ".") / common_dir).resolve()
+    ref = lines[4]
+    branch = ref[len("refs/heads/"):] if ref.startswith("refs/heads/") else None
+    state = RepoState(root=root, git_dir=git_dir, common_dir=common_dir,
+                      branch=branch, head=lines[3] or None)
+
+    # --no-optional-locks: git commit holds index.lock while the hook runs
+    try:
+        result = subprocess.run(["git", "--no-optional-locks", "diff-index", "--cached", "-z",
+                                 "--raw", "--no-renames", "--ignore-submodules=all",
+                                 state.head or _empty_tree(root)],
+                              cwd=root, capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    _parse_raw_diff(result.stdout, state)
+    return state
+
+def _unborn_head(cwd):
+    # The lines get_repo_state reads, with an empty HEAD
+    try:
+        result = subprocess.run(["git", "rev-parse", "--show-toplevel",
+                                 "--absolute-git-dir", "--git-common-dir"],
+                              cwd=cwd, capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    lines = result.stdout.splitlines()[:3]
+
+    try:
+        result = subprocess.run(["git", "symbolic-ref", "-q", "HEAD"],
+                              cwd=cwd, capture_output=True, text=True)
+    except OSError:
+        return None
+    return lines + ["", result.stdout.strip()]
+
+def _empty_tree(cwd):
+    # 4b825dc..., or its SHA-256 counterpart
+    result = subprocess.run(["git", "hash-object", "-t", "tree", "--stdin"],
+                          cwd=cwd, input="", capture_output=True, text=True, check=True)
+    return result.stdout.strip()
+
+def _parse_raw_diff(output, state):
+    # :srcmode dstmode srcsha dstsha status\0path\0 for every staged path
+    records = output.split("\0")
+    for header, path in zip(records[::2], records[1::2]):
+        parts = header[1:].split(" ")
+        if len(parts) < 5:
+            continue
+        status = parts[4][0]
+        if status == "U":
+            # Unmerged: no single staged blob, check our side (HEAD's)
+            state.staged.append(StagedFile(path, status, parts[0], parts[2]))
+        else:
+            state.staged.append(StagedFile(path, status, parts[1], parts[3]))
+
+def get_unstaged_files(paths, cwd=None):
+    # The subset of `paths` whose work tree copy differs from the index. Only
+    # these paths are stat'ed. None when git fails.
+    if not paths:
+        return set()
+    try:
+        result = subprocess.run(["git", "--no-optional-locks", "--literal-pathspecs", "diff",
+                                 "--name-only", "-z", "--no-renames", "--ignore-submodules=all",
+                                 "--"] + list(paths),
+                              cwd=cwd, capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return {p for p in result.stdout.split("\0") if p}
@@ -0,0 +1,87 @@
+# Per-run timing history, one JSON object per line in
+# <git-common-dir>/me/history.jsonl, summarized by `me stats`.
+import json
+import math
+import os
+import time
+from pathlib import Path
+from typing import Dict, List
+
+# Rough size of one run in the log, used to decide when to trim it
+RUN_BYTES_ESTIMATE = 400
+
+def record_run(results: Dict) -> Dict:
+    # Compact form of a run: short keys, stats only
+    return {
+        "t": round(time.time()),
+        "branch": results["branch"],
+        "files": len(results["files"]),
+        "checks": {
+            check["type"]: dict(check["stats"], result=check["result"].value)
+            for check in results["checks"]
+            if "stats" in check
+        }
+    }
+
+def append_run(path: Path, results: Dict, max_entries: int = 1000):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'a') as f:
+        f.write(json.dumps(record_run(results), separators=(",", ":")) + "\n")
+    
+    # Trim in one go once the log is twice the limit, instead of on every run
+    if path.stat().st_size > max_entries * 2 * RUN_BYTES_ESTIMATE:
+        runs = load_runs(path)
+        if len(runs) > max_entries:
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, 'w') as f:
+                for run in runs[-max_entries:]:
+                    f.write(json.dumps(run, separators=(",", ":")) + "\n")
+            os.replace(tmp_path, path)
+
+def load_runs(path: Path, limit: int = None) -> List[Dict]:
+    runs = []
+    try:
+        with open(path, 'r') as f:
+            for line in f:
+                try:
+                    runs.append(json.loads(line))
+                except ValueError:
+                    # Torn write from an interrupted run
+                    continue
+    except OSError:
+        return []
+    
+    if limit:
+        runs = runs[-limit:]
+    return runs
+
+def percentile(values: List[float], pct: float) -> float:
+    # Nearest-rank percentile
+    ordered = sorted(values)
+    rank = math.ceil(pct / 100 * len(ordered))
+    return ordered[min(len(ordered), max(rank, 1)) - 1]
+
+def summarize(runs: List[Dict]) -> Dict[str, Dict]:
+    samples: Dict[str, List[Dict]] = {}
+    for run in runs:
+        for check_type, stats in run.get("checks", {}).items():
+            samples.setdefault(check_type, []).append(stats)
+    
+    summary = {}
+    for check_type, records in samples.items():
+        wall = [r["wall"] for r in records]
+        cpu = [r["cpu"] for r in records]
+        cached = [r["cache"] for r in records if r.get("cache")]
+        summary[check_type] = {
+            "runs": len(records),
+            "p50": percentile(wall, 50),
+            "p90": percentile(wall, 90),
+            "p99": percentile(wall, 99),
+            "max": max(wall),
+            "cpu_p50": percentile(cpu, 50),
+            "hit_rate": (sum(1 for c in cached if c == "hit") / len(cached)) if cached else None,
+            "max_rss": max(r.get("max_rss") or 0 for r in records),
+            "failures": sum(1 for r in records if r.get("result") in ("fail", "timeout"))
+        }
+    return summary
@@ -1,13 +1,21 @@
 import os
+import sys
 from pathlib import Path
 from monitor_everything.git_utils import get_git_root
 
-HOOK_SCRIPT = """#!/usr/bin/env python3
+# Runs the checks inside the hook's own interpreter (the one `me` was
+# installed with) rather than spawning `me check` as a second process.
+HOOK_SCRIPT = """#!{python}
+# Installed by monitor_everything (me install-hook)
 import sys
-import subprocess
 
-result = subprocess.run(["me", "check"], capture_output=False)
-sys.exit(result.returncode)
+try:
+    from monitor_everything.precommit import main
+except ImportError:
+    import subprocess
+    sys.exit(subprocess.run(["me", "check"]).returncode)
+
+sys.exit(main())
 """
 
 def install_hook():
@@ -22,7 +30,11 @@ def install_hook():
         backup_path = hooks_dir / "pre-commit.backup"
         hook_path.rename(backup_path)
     
-    hook_path.write_text(HOOK_SCRIPT)
+    python = sys.executable
+    if not python or " " in python:
+        # A shebang cannot hold paths with spaces
+        python = "/usr/bin/env python3"
+    hook_path.write_text(HOOK_SCRIPT.format(python=python))
     hook_path.chmod(0o755)
     
     return True, f"Pre-commit hook installed at {hook_path}"
@@ -0,0 +1,206 @@
+import ast
+import json
+import os
+import posixpath
+import subprocess
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+# Bump whenever the stored layout or import resolution changes
+MAP_VERSION = 2
+
+# Python files whose effect on tests cannot be traced through imports. Any
+# staged file that is not Python (fixtures, data, pytest.ini, pyproject.toml)
+# cannot be traced either.
+FULL_SUITE_TRIGGERS = {
+    "conftest.py",
+    "setup.py",
+}
+
+def is_test_file(path: str) -> bool:
+    name = posixpath.basename(path)
+    return name.endswith(".py") and (name.startswith("test_") or name.endswith("_test.py"))
+
+def module_name(path: str, packages: Set[str]) -> str:
+    # Walk up while the parent directory is a package, the same way pytest's
+    # rootdir insertion makes modules importable.
+    parts = path[:-3].split("/")
+    if parts[-1] == "__init__":
+        parts = parts[:-1]
+    
+    start = len(parts) - 1
+    while start > 0 and "/".join(parts[:start]) in packages:
+        start -= 1
+    return ".".join(parts[start:])
+
+def parse_imports(source: bytes, module: str, is_package: bool) -> List[str]:
+    tree = ast.parse(source)
+    package = module if is_package else module.rpartition(".")[0]
+    
+    imports = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                imports.add(alias.name)
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                base = package.split(".") if package else []
+                if node.level > 1:
+                    base = base[:len(base) - (node.level - 1)]
+                target = ".".join(base + ([node.module] if node.module else []))
+            else:
+                target = node.module or ""
+            if not target:
+                continue
+            imports.add(target)
+            for alias in node.names:
+                if alias.name != "*":
+                    imports.add(f"{target}.{alias.name}")
+    
+    # Importing a.b.c runs a/__init__.py and a/b/__init__.py first
+    for name in list(imports):
+        parts = name.split(".")
+        imports.update(".".join(parts[:i]) for i in range(1, len(parts)))
+    return sorted(imports)
+
+class ImportMap:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.files: Dict[str, Dict] = {}
+        self.packages: List[str] = []
+        self.rebuilt = False
+    
+    def load(self) -> bool:
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        
+        if not isinstance(data, dict) or data.get("version") != MAP_VERSION:
+            return False
+        
+        self.files = data.get("files", {})
+        self.packages = data.get("packages", [])
+        return True
+    
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump({"version": MAP_VERSION, "packages": self.packages, "files": self.files},
+                      f, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+    
+    def update(self, root: Path) -> bool:
+        index = _index_python_files(root)
+        if index is None:
+            return False
+        
+        packages = sorted({posixpath.dirname(p) for p in index if p.endswith("/__init__.py")})
+        if packages != self.packages:
+            # Module names depend on package layout; re-resolve everything
+            self.files = {}
+            self.packages = packages
+            self.rebuilt = True
+        package_set = set(packages)
+        
+        changed = [p for p, sha in index.items() if self.files.get(p, {}).get("sha") != sha]
+        for path in list(self.files):
+            if path not in index:
+                del self.files[path]
+        
+        for path, source in _read_blobs(root, [(p, index[p]) for p in changed]):
+            module = module_name(path, package_set)
+            entry = {"sha": index[path], "module": module, "imports": []}
+            try:
+                entry["imports"] = parse_imports(source, module, path.endswith("/__init__.py"))
+            except (SyntaxError, ValueError):
+                entry["error"] = True
+            self.files[path] = entry
+        return True
+    
+    def affected_tests(self, changed_files: List[str]) -> Optional[List[str]]:
+        # Returns None when the changes cannot be traced and the full suite must run
+        importers: Dict[str, List[str]] = {}
+        for path, entry in self.files.items():
+            for name in entry["imports"]:
+                importers.setdefault(name, []).append(path)
+        
+        queue = deque()
+        seen = set()
+        for path in changed_files:
+            if posixpath.basename(path) in FULL_SUITE_TRIGGERS or not path.endswith(".py"):
+                return None
+            entry = self.files.get(path)
+            if entry is None or entry.get("error"):
+                return None
+            if path not in seen:
+                seen.add(path)
+                queue.append(path)
+        
+        while queue:
+            path = queue.popleft()
+            for importer in importers.get(self.files[path]["module"], []):
+                if importer not in seen:
+                    seen.add(importer)
+                    queue.append(importer)
+        
+        return sorted(p for p in seen if is_test_file(p))
+
+def _index_python_files(root: Path) -> Optional[Dict[str, str]]:
+    try:
+        result = subprocess.run(["git", "ls-files", "-s", "-z", "--", "*.py"],
+                                cwd=root, capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    
+    index = {}
+    for record in result.stdout.split("\0"):
+        if not record:
+            continue
+        meta, path = record.split("\t", 1)
+        mode, sha, stage = meta.split()
+        if stage in ("0", "2"):
+            index[path] = sha
+    return index
+
+def _read_blobs(root: Path, entries):
+    if not entries:
+        return
+    
+    proc = subprocess.Popen(["git", "cat-file", "--batch"], cwd=root,
+                            stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+    try:
+        for path, sha in entries:
+            proc.stdin.write(f"{sha}\n".encode())
+            proc.stdin.flush()
+            header = proc.stdout.readline().split()
+            if len(header) < 3:
+                continue
+            size = int(header[2])
+            content = proc.stdout.read(size)
+            proc.stdout.read(1)
+            yield path, content
+    finally:
+        proc.stdin.close()
+        proc.stdout.close()
+        proc.wait()
+
+def select_tests(root: Path, git_dir: Path, changed_files: List[str]) -> Optional[List[str]]:
+    import_map = ImportMap(git_dir / "me" / "import_map.json")
+    fresh = import_map.load()
+    
+    if not import_map.update(root):
+        return None
+    try:
+        import_map.save()
+    except OSError:
+        pass
+    
+    if not fresh or import_map.rebuilt:
+        # Missing, outdated or re-laid-out map: not trusted until the next run
+        return None
+    
+    return import_map.affected_tests(changed_files)
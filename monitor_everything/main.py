@@ -2,6 +2,15 @@ import click
 
 __version__ = "0.1.0"
 
+def load_config(**kwargs):
+    # Config() for commands: a broken .merc is an error message, not a traceback
+    from monitor_everything.config import Config, ConfigError
+    
+    try:
+        return Config(**kwargs)
+    except ConfigError as e:
+        raise click.ClickException(str(e))
+
 @click.group()
 @click.version_option(version=__version__)
 def cli():
@@ -11,11 +20,9 @@ def cli():
 @cli.command()
 def setup():
     """Interactive setup wizard for configuring checks and hooks"""
-    from monitor_everything.config import Config
-    
     click.echo("Welcome to Monitor Everything setup!\n")
     
-    config = Config()
+    config = load_config()
     
     # Check selection
     click.echo("Select checks to enable:")
@@ -31,11 +38,14 @@ def setup():
     config.data["protected_branches"] = [b.strip() for b in branches_input.split(",")]
     
     # Behavior configuration
-    click.echo("\nDefault behavior for checks (block/warn/interactive):")
+    click.echo("\nDefault behavior for checks (block/warn/interactive, fix for linting/formatting):")
     for check in ["linting", "formatting", "type_checking", "tests", "security"]:
         if config.data["checks"][check]:
+            choices = ["block", "warn", "interactive"]
+            if check in ("linting", "formatting"):
+                choices.append("fix")
             behavior = click.prompt(f"  {check}", 
-                                   type=click.Choice(["block", "warn", "interactive"]),
+                                   type=click.Choice(choices),
                                    default="interactive")
             config.data["behavior"][check] = behavior
     
@@ -76,57 +86,41 @@ def setup():
     click.echo("\n✓ Setup complete!")
 
 @cli.command()
-def check():
+@click.option("--format", "output_format", type=click.Choice(["text", "json", "sarif"]), default="text",
+              show_default=True, help="Output format; json and sarif never prompt")
+@click.option("--output", "output", type=click.Path(dir_okay=False, allow_dash=True),
+              help="Write the json or sarif report to this file instead of stdout")
+def check(output_format, output):
     """Run all enabled checks on staged files"""
-    from monitor_everything.config import Config
-    from monitor_everything.runner import CheckRunner
-    from monitor_everything.prompt import display_results, prompt_user_action
-    from monitor_everything.git_utils import is_git_repo
+    from monitor_everything.precommit import run_check
     import sys
     
-    if not is_git_repo():
-        click.echo("Error: Not a git repository")
-        sys.exit(1)
+    if output and output_format == "text":
+        raise click.UsageError("--output needs --format json or --format sarif")
     
-    config = Config()
-    runner = CheckRunner(config)
-    
-    click.echo("Running checks...")
-    results = runner.run_all_checks()
-    
-    display_results(results)
-    
-    if runner.should_block(results):
-        sys.exit(1)
-    
-    has_issues = any(c['result'].value == 'fail' for c in results['checks'])
-    if has_issues:
-        if not prompt_user_action(results):
-            sys.exit(1)
-    
-    click.echo("\n✓ All checks passed!")
-    sys.exit(0)
+    sys.exit(run_check(output_format=output_format, output=output))
 
 @cli.command()
 @click.option('-m', '--message', required=True, help='Commit message')
 def commit(message):
     """Run checks and commit if they pass"""
-    from monitor_everything.config import Config
     from monitor_everything.runner import CheckRunner
     from monitor_everything.prompt import display_results, prompt_user_action
-    from monitor_everything.git_utils import is_git_repo
+    from monitor_everything.git_utils import get_repo_state
+    from monitor_everything.precommit import collect_results
     import subprocess
     import sys
     
-    if not is_git_repo():
+    state = get_repo_state()
+    if state is None:
         click.echo("Error: Not a git repository")
         sys.exit(1)
     
-    config = Config()
+    config = load_config(root=state.root)
     runner = CheckRunner(config)
     
     click.echo("Running checks...")
-    results = runner.run_all_checks()
+    results = collect_results(runner, state)
     
     display_results(results)
     
@@ -134,7 +128,7 @@ def commit(message):
         click.echo("\nCommit blocked")
         sys.exit(1)
     
-    has_issues = any(c['result'].value == 'fail' for c in results['checks'])
+    has_issues = any(c['result'].failed for c in results['checks'])
     if has_issues:
         if not prompt_user_action(results):
             click.echo("\nCommit aborted")
@@ -146,6 +140,36 @@ def commit(message):
     result = subprocess.run(["git", "commit", "-m", message])
     sys.exit(result.returncode)
 
+@cli.command()
+@click.option("--last", "last", default=50, show_default=True, help="Number of recent runs to include")
+def stats(last):
+    """Show how long each check took over recent runs"""
+    from monitor_everything.git_utils import get_git_common_dir
+    from monitor_everything.history import load_runs, summarize
+    import sys
+    
+    git_dir = get_git_common_dir()
+    if git_dir is None:
+        click.echo("Error: Not a git repository")
+        sys.exit(1)
+    
+    runs = load_runs(git_dir / "me" / "history.jsonl", limit=last)
+    if not runs:
+        click.echo("No runs recorded yet")
+        return
+    
+    click.echo(f"Last {len(runs)} runs\n")
+    click.echo(f"{'Check':<18}{'Runs':>5}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}{'CPU p50':>9}{'Cached':>8}{'Peak RSS':>10}")
+    summary = summarize(runs)
+    for check_type, row in sorted(summary.items(), key=lambda item: item[1]["p90"], reverse=True):
+        hit_rate = "-" if row["hit_rate"] is None else f"{row['hit_rate']:.0%}"
+        max_rss = f"{row['max_rss'] / 1024:.0f}MB" if row["max_rss"] else "-"
+        click.echo(
+            f"{check_type:<18}{row['runs']:>5}"
+            f"{row['p50']:>8.2f}s{row['p90']:>8.2f}s{row['p99']:>8.2f}s{row['max']:>8.2f}s"
+            f"{row['cpu_p50']:>8.2f}s{hit_rate:>8}{max_rss:>10}"
+        )
+
 @cli.group()
 def config():
     """Manage configuration settings"""
@@ -154,10 +178,9 @@ def config():
 @config.command(name="list")
 def config_list():
     """Show current configuration"""
-    from monitor_everything.config import Config
     import json
     
-    config = Config()
+    config = load_config()
     click.echo(json.dumps(config.data, indent=2))
 
 @config.command(name="set")
@@ -165,19 +188,24 @@ def config_list():
 @click.argument("value")
 def config_set(key, value):
     """Set configuration value"""
-    from monitor_everything.config import Config
-    import sys
+    from monitor_everything.config import ConfigError
+    import json
     
-    config = Config()
+    # Loaded without validation, so this can repair an invalid .merc
+    config = load_config(validate_config=False)
     
-    # Convert string value to appropriate type
-    if value.lower() == "true":
-        value = True
-    elif value.lower() == "false":
-        value = False
+    # JSON literals (true, 8, 2.5, null, ["main"]) keep their type
+    try:
+        value = json.loads(value)
+    except ValueError:
+        if value.lower() in ("true", "false"):
+            value = value.lower() == "true"
     
     config.set(key, value)
-    config.save()
+    try:
+        config.save()
+    except ConfigError as e:
+        raise click.ClickException(str(e))
     
     click.echo(f"✓ Set {key} = {value}")
 
@@ -185,9 +213,7 @@ def config_set(key, value):
 @click.argument("branch")
 def config_add_protected(branch):
     """Add protected branch"""
-    from monitor_everything.config import Config
-    
-    config = Config()
+    config = load_config()
     protected = config.get("protected_branches", [])
     
     if branch in protected:
@@ -204,10 +230,9 @@ def config_add_protected(branch):
 @click.argument("branch")
 def config_remove_protected(branch):
     """Remove protected branch"""
-    from monitor_everything.config import Config
     import sys
     
-    config = Config()
+    config = load_config()
     protected = config.get("protected_branches", [])
     
     if branch not in protected:
@@ -220,6 +245,109 @@ def config_remove_protected(branch):
     
     click.echo(f"✓ Removed '{branch}' from protected branches")
 
+@cli.group()
+def daemon():
+    """Manage the background check daemon"""
+    pass
+
+@daemon.command(name="start")
+@click.option("--foreground", is_flag=True, help="Run in this process until stopped")
+def daemon_start(foreground):
+    """Start a daemon that keeps checks warm for this repository"""
+    from monitor_everything import daemon as check_daemon
+    from monitor_everything.git_utils import get_repo_state
+    import sys
+    
+    state = get_repo_state()
+    if state is None:
+        click.echo("Error: Not a git repository")
+        sys.exit(1)
+    
+    info = check_daemon.ping(state.common_dir)
+    if info:
+        click.echo(f"Daemon already running (pid {info['pid']})")
+        return
+    
+    if foreground:
+        sys.exit(check_daemon.main([str(state.root)]))
+    
+    info = check_daemon.start(state)
+    if info:
+        click.echo(f"✓ Daemon started (pid {info['pid']})")
+    else:
+        click.echo(f"✗ Daemon did not start, see {state.common_dir / 'me' / 'daemon.log'}")
+        sys.exit(1)
+
+@daemon.command(name="stop")
+def daemon_stop():
+    """Stop the daemon for this repository"""
+    from monitor_everything import daemon as check_daemon
+    from monitor_everything.git_utils import get_repo_state
+    import sys
+    
+    state = get_repo_state()
+    if state is None:
+        click.echo("Error: Not a git repository")
+        sys.exit(1)
+    
+    if check_daemon.stop(state.common_dir):
+        click.echo("✓ Daemon stopped")
+    else:
+        click.echo("Daemon is not running")
+
+@daemon.command(name="status")
+def daemon_status():
+    """Show whether a daemon serves this repository"""
+    from monitor_everything import daemon as check_daemon
+    from monitor_everything.git_utils import get_repo_state
+    import sys
+    
+    state = get_repo_state()
+    if state is None:
+        click.echo("Error: Not a git repository")
+        sys.exit(1)
+    
+    info = check_daemon.ping(state.common_dir)
+    if info:
+        click.echo(f"Daemon running (pid {info['pid']}, version {info['version']})")
+        click.echo(f"  Socket: {check_daemon.socket_path(state.common_dir)}")
+    else:
+        click.echo("Daemon is not running")
+        sys.exit(1)
+
+@cli.group()
+def baseline():
+    """Manage the secret scan baseline (.me-baseline)"""
+    pass
+
+@baseline.command(name="update")
+@click.option("--workers", type=int, default=None, help="Processes to scan with (default: one per CPU)")
+def baseline_update(workers):
+    """Record every current secret finding so it is no longer reported"""
+    from monitor_everything.baseline import BASELINE_NAME, scan_files, write_baseline
+    from monitor_everything.git_utils import get_git_root
+    from monitor_everything.paths import CheckScope
+    from monitor_everything.snapshot import read_index
+    import sys
+    
+    root = get_git_root()
+    index = read_index(root) if root else None
+    if index is None:
+        click.echo("Error: Not a git repository")
+        sys.exit(1)
+    
+    # Every tracked file the security check would look at
+    config = load_config()
+    files = CheckScope(config.get("paths", {})).partition(["security"], sorted(index))["security"]
+    findings = scan_files(root, files,
+                          entropy_threshold=config.get("settings.security.entropy_threshold"),
+                          workers=workers)
+    write_baseline(root / BASELINE_NAME, findings)
+    
+    click.echo(f"✓ Recorded {len(findings)} finding(s) from {len(files)} file(s) in {BASELINE_NAME}")
+    if findings:
+        click.echo(f"  Commit {BASELINE_NAME} to share it")
+
 @cli.command(name="install-hook")
 def install_hook_cmd():
     """Install pre-commit git hook"""
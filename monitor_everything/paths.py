@@ -0,0 +1,156 @@
+# Per-check path scoping from the "paths" config section. All include,
+# exclude and directory override patterns are compiled into one regular
+# expression; matching a path once tells which of them match (as a bitmask),
+# and each check's decision is a couple of mask tests.
+#
+# Patterns follow .gitignore conventions: one without a slash (a trailing
+# one aside) matches at any depth, one with a slash is relative to the repository
+# root, a trailing slash or "/**" matches everything below a directory and
+# "**" spans any number of directories.
+import re
+from typing import Dict, List, Optional
+
+def glob_to_regex(pattern: str) -> str:
+    pattern = pattern.strip()
+    # The slash test ignores a trailing slash: "migrations/" matches at any depth
+    if "/" not in pattern.rstrip("/"):
+        pattern = "**/" + pattern
+    if pattern.endswith("/"):
+        pattern += "**"
+    pattern = pattern.lstrip("/")
+    
+    out = []
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif c == "*":
+            out.append("[^/]*")
+            i += 1
+        elif c == "?":
+            out.append("[^/]")
+            i += 1
+        elif c == "[":
+            end = pattern.find("]", i + 2)
+            if end == -1:
+                out.append(re.escape(c))
+                i += 1
+                continue
+            body = pattern[i + 1:end]
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            out.append(f"[{body.replace(chr(92), chr(92) * 2)}]")
+            i = end + 1
+        else:
+            out.append(re.escape(c))
+            i += 1
+    return "".join(out)
+
+class PathMatcher:
+    # One bit per distinct pattern, in the order first seen
+    def __init__(self, patterns: List[str]):
+        self.bits: Dict[str, int] = {}
+        for pattern in patterns:
+            if pattern not in self.bits:
+                self.bits[pattern] = 1 << len(self.bits)
+        
+        # Each pattern is an optional lookahead with an empty group: the
+        # group is set after the match exactly when the pattern matches
+        alternatives = "".join(f"(?:(?={glob_to_regex(p)}$)())?" for p in self.bits)
+        self._regex = re.compile(alternatives)
+    
+    def mask(self, *patterns: str) -> int:
+        result = 0
+        for pattern in patterns:
+            result |= self.bits[pattern]
+        return result
+    
+    def match(self, path: str) -> int:
+        if not self.bits:
+            return 0
+        groups = self._regex.match(path.replace("\\", "/")).groups()
+        result = 0
+        for i, group in enumerate(groups):
+            if group is not None:
+                result |= 1 << i
+        return result
+
+class CheckScope:
+    # Which staged files each check gets, from the "paths" config section:
+    #   "exclude": patterns no check sees,
+    #   "checks": {check_type: {"include": [...], "exclude": [...]}},
+    #   "overrides": {directory: {check_type: true/false}} turn a check on
+    #   or off below a directory, the deepest one winning; include and
+    #   exclude still apply where a check is on.
+    def __init__(self, paths: Optional[Dict] = None):
+        paths = paths or {}
+        self.exclude = list(paths.get("exclude", []))
+        self.checks = paths.get("checks", {})
+        # Override directories are relative to the repository root
+        self.overrides = {
+            "/" + directory.strip("/") + "/": enabled
+            for directory, enabled in paths.get("overrides", {}).items()
+        }
+        # Deepest directory first
+        self._override_order = sorted(self.overrides, key=lambda d: d.count("/"), reverse=True)
+        
+        patterns = list(self.exclude)
+        for scope in self.checks.values():
+            patterns += scope.get("include", []) + scope.get("exclude", [])
+        patterns += self._override_order
+        self.matcher = PathMatcher(patterns)
+    
+    def enabled_below(self, check_type: str) -> bool:
+        # Whether some directory override turns the check on
+        return any(enabled.get(check_type) for enabled in self.overrides.values())
+    
+    def partition(self, check_types: List[str], files: List[str],
+                  enabled: Optional[Dict[str, bool]] = None) -> Dict[str, List[str]]:
+        # check_type -> the files it gets, each file matched once. `enabled`
+        # is whether each check is on outside of any override (default: on).
+        enabled = enabled or {}
+        if not self.matcher.bits:
+            return {
+                check_type: list(files) if enabled.get(check_type, True) else []
+                for check_type in check_types
+            }
+        
+        m = self.matcher
+        global_exclude = m.mask(*self.exclude)
+        rules = []
+        for check_type in check_types:
+            scope = self.checks.get(check_type, {})
+            include = scope.get("include", [])
+            overrides = [
+                (m.mask(directory), self.overrides[directory][check_type])
+                for directory in self._override_order
+                if check_type in self.overrides[directory]
+            ]
+            rules.append((check_type, enabled.get(check_type, True), m.mask(*include) if include else None,
+                          m.mask(*scope.get("exclude", [])), overrides))
+        
+        result = {check_type: [] for check_type in check_types}
+        for path in files:
+            matched = m.match(path)
+            if matched & global_exclude:
+                continue
+            for check_type, default, include, exclude, overrides in rules:
+                if self._applies(matched, default, include, exclude, overrides):
+                    result[check_type].append(path)
+        return result
+    
+    def _applies(self, matched: int, enabled: bool, include: Optional[int], exclude: int, overrides) -> bool:
+        for bit, override in overrides:
+            if matched & bit:
+                enabled = override
+                break
+        if not enabled:
+            return False
+        if include is not None and not matched & include:
+            return False
+        return not matched & exclude
@@ -0,0 +1,78 @@
+# Entry point shared by `me check` and the installed pre-commit hook. It only
+# imports what running the checks needs (no CLI group), so the hook can call
+# main() directly instead of starting a second interpreter for `me check`.
+import sys
+
+def run_check(state=None, output_format: str = "text", output=None) -> int:
+    # With a json or sarif `output_format`, the report goes to `output` (a
+    # path, or stdout for None/"-") and nothing prompts. The behaviors decide
+    # the exit code as for text output, with prompts answered "abort".
+    import click
+    from monitor_everything.git_utils import get_repo_state
+    
+    # Keep stdout clean when the report itself goes there
+    quiet = output_format != "text" and output in (None, "-")
+    
+    state = state or get_repo_state()
+    if state is None:
+        click.echo("Error: Not a git repository", err=quiet)
+        return 1
+    
+    from monitor_everything.config import Config, ConfigError
+    from monitor_everything.runner import CheckRunner
+    from monitor_everything.prompt import display_results, prompt_user_action
+    
+    try:
+        config = Config(root=state.root)
+    except ConfigError as e:
+        click.echo(f"Error: {e}", err=quiet)
+        return 1
+    runner = CheckRunner(config)
+    
+    click.echo("Running checks...", err=quiet)
+    results = collect_results(runner, state)
+    
+    if output_format != "text":
+        from monitor_everything.report import write_report
+        
+        if quiet:
+            write_report(results, output_format, sys.stdout, state.root)
+        else:
+            with open(output, 'w', encoding='utf-8') as f:
+                write_report(results, output_format, f, state.root)
+            display_results(results)
+        return 1 if runner.should_block(results, can_prompt=False) else 0
+    
+    display_results(results)
+    
+    if runner.should_block(results):
+        return 1
+    
+    has_issues = any(c['result'].failed for c in results['checks'])
+    if has_issues:
+        try:
+            if not prompt_user_action(results):
+                return 1
+        except click.exceptions.Abort:
+            # No terminal to answer the prompt (e.g. stdin is /dev/null in hooks)
+            click.echo("\nCommit aborted")
+            return 1
+    
+    click.echo("\n✓ All checks passed!")
+    return 0
+
+def collect_results(runner, state):
+    # Hand the run to `me daemon` when one is serving this repository
+    if runner.config.get("daemon.enabled", True):
+        from monitor_everything.daemon import run_checks
+        
+        results = run_checks(state, runner.config.data, runner.config.get("daemon.timeout", 900))
+        if results is not None:
+            return results
+    return runner.run_all_checks(state)
+
+def main() -> int:
+    return run_check()
+
+if __name__ == "__main__":
+    sys.exit(main())
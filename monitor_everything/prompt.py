@@ -17,33 +17,42 @@ def display_results(results):
     has_issues = False
     for check in results['checks']:
         if check['result'] == CheckResult.PASS:
-            click.echo(f"✓ {check['name']}: {click.style(check['message'], fg='green')}")
+            click.echo(f"✓ {check['name']}: {click.style(check['message'], fg='green')}{_duration(check)}")
         elif check['result'] == CheckResult.WARN:
-            click.echo(f"⚠ {check['name']}: {click.style(check['message'], fg='yellow')}")
+            click.echo(f"⚠ {check['name']}: {click.style(check['message'], fg='yellow')}{_duration(check)}")
             if check['details']:
                 for detail in check['details'][:5]:
                     click.echo(f"  {detail}")
-        elif check['result'] == CheckResult.FAIL:
+        elif check['result'].failed:
             has_issues = True
-            click.echo(f"✗ {check['name']}: {click.style(check['message'], fg='red')}")
+            click.echo(f"✗ {check['name']}: {click.style(check['message'], fg='red')}{_duration(check)}")
             if check['details']:
                 for detail in check['details'][:5]:
                     click.echo(f"  {detail}")
                 if len(check['details']) > 5:
                     click.echo(f"  ... and {len(check['details']) - 5} more")
+        elif check['result'] == CheckResult.SKIP:
+            click.echo(f"- {check['name']}: {click.style(check['message'], fg='bright_black')}{_duration(check)}")
     
     click.echo("=" * 60)
     return has_issues
 
+def _duration(check):
+    stats = check.get('stats')
+    if not stats:
+        return ""
+    return click.style(f" ({stats['wall']:.2f}s)", dim=True)
+
 def prompt_user_action(results):
     has_blocking = False
     has_interactive = False
     
     for check in results['checks']:
-        if check['result'] == CheckResult.FAIL:
+        if check['result'].failed:
             if check['behavior'] == 'block':
                 has_blocking = True
-            elif check['behavior'] == 'interactive':
+            elif check['behavior'] in ('interactive', 'fix'):
+                # "fix" gets here when fixing left issues behind
                 has_interactive = True
     
     if has_blocking:
@@ -64,7 +73,7 @@ def prompt_user_action(results):
             return False
         elif choice == 'details':
             for check in results['checks']:
-                if check['result'] == CheckResult.FAIL and check['details']:
+                if check['result'].failed and check['details']:
                     click.echo(f"\n{check['name']}:")
                     for detail in check['details']:
                         click.echo(f"  {detail}")
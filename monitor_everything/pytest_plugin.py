@@ -0,0 +1,216 @@
+# pytest plugin used by PytestCheck. It is copied next to the report as
+# me_pytest_report.py and loaded with `-p me_pytest_report`, so it runs in the
+# project's interpreter and may only use pytest and the standard library.
+#
+# Writes one JSON line per failed test or collection error to --me-report,
+# and prints a "FAILED <nodeid>" line as soon as a test fails so the check
+# can react before the run ends. With --me-durations, tests that failed last
+# time run first, then modules listed in --me-related (those affected by the
+# change), then the rest slowest first; the file is updated with this run's
+# durations and failures. --me-budget stops the run after that many seconds
+# and reports the tests that did not run.
+import json
+import os
+import time
+
+DURATIONS_VERSION = 1
+
+def pytest_addoption(parser):
+    parser.addoption("--me-report", default=None, help="Write failures as JSON lines to this file")
+    parser.addoption("--me-durations", default=None, help="Order tests by, and record, test durations and failures")
+    parser.addoption("--me-related", default=None, help="File listing test modules to run before the others")
+    parser.addoption("--me-budget", default=None, type=float, help="Stop starting tests after this many seconds")
+
+def pytest_configure(config):
+    # Under pytest-xdist, workers collect and order tests while the
+    # controller receives every report
+    is_worker = hasattr(config, "workerinput")
+    path = config.getoption("me_report")
+    writer = None
+    if path and not is_worker:
+        terminal = config.pluginmanager.get_plugin("terminalreporter")
+        writer = ReportWriter(path, str(config.rootpath), terminal)
+        config.pluginmanager.register(writer, "me-report-writer")
+    
+    durations_path = config.getoption("me_durations")
+    if durations_path:
+        related = _read_lines(config.getoption("me_related"))
+        config.pluginmanager.register(RunOrder(durations_path, related, record=not is_worker), "me-durations")
+    
+    budget = config.getoption("me_budget")
+    if budget and not is_worker:
+        config.pluginmanager.register(TimeBudget(budget, writer), "me-budget")
+
+def _read_lines(path):
+    if not path:
+        return set()
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return {line.strip() for line in f if line.strip()}
+    except OSError:
+        return set()
+
+def load_store(path):
+    # {"tests": nodeid -> seconds (setup, call and teardown together),
+    #  "failed": nodeids that failed the last time they ran}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        data = None
+    if not isinstance(data, dict) or data.get("version") != DURATIONS_VERSION:
+        return {"tests": {}, "failed": []}
+    return {"tests": data.get("tests", {}), "failed": data.get("failed", [])}
+
+def load_durations(path):
+    return load_store(path)["tests"]
+
+def save_store(path, durations, failed):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": DURATIONS_VERSION, "tests": durations, "failed": sorted(failed)}, f)
+    os.replace(tmp_path, path)
+
+class ReportWriter:
+    def __init__(self, path, rootdir, terminal=None):
+        self.file = open(path, "w", encoding="utf-8")
+        self.rootdir = rootdir
+        self.terminal = terminal
+    
+    def pytest_runtest_logreport(self, report):
+        if not report.failed:
+            return
+        path, line, test = report.location
+        self._write({
+            "path": path,
+            "line": line,
+            "test": test,
+            "outcome": "failed" if report.when == "call" else "error",
+            "message": _crash_message(report)
+        })
+        self._announce("FAILED" if report.when == "call" else "ERROR", report.nodeid)
+    
+    def pytest_collectreport(self, report):
+        if not report.failed:
+            return
+        self._write({
+            "path": report.nodeid.split("::")[0],
+            "line": None,
+            "test": "collection",
+            "outcome": "error",
+            "message": _crash_message(report)
+        })
+        self._announce("ERROR", report.nodeid)
+    
+    def pytest_unconfigure(self, config):
+        self.file.close()
+    
+    def _write(self, record):
+        record["rootdir"] = self.rootdir
+        self.file.write(json.dumps(record) + "\n")
+        self.file.flush()
+    
+    def write_not_run(self, nodeids, budget):
+        self.file.write(json.dumps({"not_run": nodeids, "budget": budget}) + "\n")
+        self.file.flush()
+    
+    def _announce(self, outcome, nodeid):
+        if self.terminal is not None:
+            self.terminal.write_line(f"{outcome} {nodeid}")
+
+class RunOrder:
+    def __init__(self, path, related=(), record=True):
+        self.path = path
+        self.record = record
+        store = load_store(path)
+        self.durations = store["tests"]
+        self.failed = set(store["failed"])
+        self.related = set(related)
+        self.measured = {}
+        self.failed_now = set()
+    
+    def pytest_collection_modifyitems(self, session, config, items):
+        # Failed tests are pulled forward one by one; otherwise whole modules
+        # move, so module and class fixtures are still set up once. Modules
+        # without recorded durations (new ones) go first within their group.
+        totals = {}
+        unknown = set()
+        for item in items:
+            module = item.nodeid.split("::")[0]
+            duration = self.durations.get(item.nodeid)
+            if duration is None:
+                unknown.add(module)
+            else:
+                totals[module] = totals.get(module, 0.0) + duration
+        
+        first_seen = {}
+        for i, item in enumerate(items):
+            first_seen.setdefault(item.nodeid.split("::")[0], i)
+        
+        def key(item):
+            module = item.nodeid.split("::")[0]
+            if item.nodeid in self.failed:
+                group = 0
+            elif module in self.related:
+                group = 1
+            else:
+                group = 2
+            return (group, module not in unknown, -totals.get(module, 0.0), first_seen[module])
+        
+        items.sort(key=key)
+    
+    def pytest_runtest_logreport(self, report):
+        if self.record:
+            self.measured[report.nodeid] = self.measured.get(report.nodeid, 0.0) + report.duration
+            if report.failed:
+                self.failed_now.add(report.nodeid)
+    
+    def pytest_sessionfinish(self, session):
+        if not self.record or not self.measured:
+            return
+        durations = dict(self.durations)
+        durations.update({nodeid: round(seconds, 4) for nodeid, seconds in self.measured.items()})
+        # Tests that did not run this time keep their last outcome
+        failed = (self.failed - self.measured.keys()) | self.failed_now
+        try:
+            save_store(self.path, durations, failed)
+        except OSError:
+            pass
+
+class TimeBudget:
+    # Stops the session once `budget` seconds have passed; the test running
+    # then still finishes. The tests left out are written to the report.
+    def __init__(self, budget, writer=None):
+        self.budget = budget
+        self.writer = writer
+        self.session = None
+        self.start = None
+        self.pending = []
+        self.done = set()
+    
+    def pytest_sessionstart(self, session):
+        self.session = session
+        self.start = time.monotonic()
+    
+    def pytest_collection_finish(self, session):
+        self.pending = [item.nodeid for item in session.items]
+    
+    def pytest_runtest_logfinish(self, nodeid, location):
+        self.done.add(nodeid)
+        if len(self.done) >= len(self.pending):
+            return
+        if time.monotonic() - self.start > self.budget and self.session is not None:
+            self.session.shouldstop = f"time budget of {self.budget:g}s used up"
+    
+    def pytest_sessionfinish(self, session):
+        not_run = [nodeid for nodeid in self.pending if nodeid not in self.done]
+        if not_run and self.writer is not None:
+            self.writer.write_not_run(not_run, self.budget)
+
+def _crash_message(report):
+    crash = getattr(report.longrepr, "reprcrash", None)
+    if crash is not None and crash.message:
+        return crash.message.splitlines()[0]
+    lines = [l for l in str(report.longrepr).splitlines() if l.strip()]
+    return lines[-1].strip() if lines else ""
@@ -0,0 +1,110 @@
+# Machine-readable reports of a check run for CI: the full results dict as
+# JSON, or SARIF 2.1.0 for code scanning annotations. Both are written to the
+# stream piece by piece, one diagnostic at a time, so large runs are never
+# held in memory as a single string.
+import json
+from pathlib import Path
+from typing import Dict, IO, Iterable
+
+REPORT_FORMATS = ("text", "json", "sarif")
+
+JSON_REPORT_VERSION = 1
+
+SARIF_VERSION = "2.1.0"
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+
+SARIF_LEVELS = {"error": "error", "warning": "warning", "note": "note"}
+
+def _dumps(value) -> str:
+    return json.dumps(value, default=str, ensure_ascii=False)
+
+def _write_array(stream: IO[str], items: Iterable):
+    stream.write("[")
+    for i, item in enumerate(items):
+        if i:
+            stream.write(", ")
+        stream.write(_dumps(item))
+    stream.write("]")
+
+def write_json(results: Dict, stream: IO[str]):
+    from monitor_everything.main import __version__
+    
+    stream.write("{")
+    stream.write(f'"version": {JSON_REPORT_VERSION}, "me_version": {_dumps(__version__)}, ')
+    stream.write(f'"branch": {_dumps(results["branch"])}, "is_protected": {_dumps(results["is_protected"])}, ')
+    stream.write('"files": ')
+    _write_array(stream, results["files"])
+    stream.write(', "checks": [')
+    for i, check in enumerate(results["checks"]):
+        if i:
+            stream.write(", ")
+        fields = {key: value for key, value in check.items() if key != "diagnostics"}
+        fields["result"] = check["result"].value
+        # The object is closed by hand so diagnostics can follow one by one
+        stream.write(_dumps(fields)[:-1])
+        stream.write(', "diagnostics": ')
+        _write_array(stream, (d.to_dict() for d in check.get("diagnostics", [])))
+        stream.write("}")
+    stream.write("]}\n")
+
+def write_sarif(results: Dict, stream: IO[str], root=None):
+    # One SARIF run per check, with that check as the tool. A failure without
+    # diagnostics (tool crash, config error) becomes a result without location.
+    from monitor_everything.main import __version__
+    
+    stream.write(f'{{"$schema": {_dumps(SARIF_SCHEMA)}, "version": {_dumps(SARIF_VERSION)}, "runs": [')
+    for i, check in enumerate(results["checks"]):
+        if i:
+            stream.write(", ")
+        diagnostics = check.get("diagnostics", [])
+        rules = sorted({d.code or check["type"] for d in diagnostics})
+        run = {
+            "tool": {"driver": {
+                "name": check["name"],
+                "version": __version__,
+                "rules": [{"id": rule} for rule in rules]
+            }},
+            "automationDetails": {"id": f"me/{check['type']}/"},
+            "properties": {
+                "result": check["result"].value,
+                "message": check["message"],
+                "behavior": check.get("behavior"),
+                "stats": check.get("stats")
+            }
+        }
+        if root:
+            run["originalUriBaseIds"] = {"SRCROOT": {"uri": Path(root).resolve().as_uri() + "/"}}
+        stream.write(_dumps(run)[:-1])
+        stream.write(', "results": ')
+        
+        findings = (_sarif_result(check, d) for d in diagnostics)
+        if not diagnostics and check["result"].value in ("fail", "timeout"):
+            findings = [{"ruleId": check["type"], "level": "error", "message": {"text": check["message"]}}]
+        _write_array(stream, findings)
+        stream.write("}")
+    stream.write("]}\n")
+
+def _sarif_result(check: Dict, diagnostic) -> Dict:
+    region = {}
+    if diagnostic.line is not None:
+        region["startLine"] = diagnostic.line
+        if diagnostic.column is not None:
+            region["startColumn"] = diagnostic.column
+    
+    location = {"artifactLocation": {"uri": diagnostic.path, "uriBaseId": "SRCROOT"}}
+    if region:
+        location["region"] = region
+    return {
+        "ruleId": diagnostic.code or check["type"],
+        "level": SARIF_LEVELS.get(diagnostic.severity, "error"),
+        "message": {"text": diagnostic.message or check["message"]},
+        "locations": [{"physicalLocation": location}]
+    }
+
+def write_report(results: Dict, output_format: str, stream: IO[str], root=None):
+    if output_format == "json":
+        write_json(results, stream)
+    elif output_format == "sarif":
+        write_sarif(results, stream, root)
+    else:
+        raise ValueError(f"Unknown report format: {output_format}")
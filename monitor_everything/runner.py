@@ -1,15 +1,35 @@
+import functools
+import threading
+import time
 from monitor_everything.config import Config
-from monitor_everything.checks import registry, CheckResult
-from monitor_everything.git_utils import get_staged_files, is_protected_branch, get_current_branch
-from typing import List, Dict
+from monitor_everything.checks import registry, CheckLoadError, CheckResult, CheckOutput, UnavailableCheck
+from monitor_everything.cache import ResultCache, run_cached
+from monitor_everything.executor import CheckCancelled, LimitExceeded, rss_kb
+from monitor_everything.history import append_run
+from monitor_everything.paths import CheckScope
+from monitor_everything.git_utils import RepoState, get_repo_state, is_protected_branch
+from typing import List, Dict, Optional, Set, Tuple
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows
+    resource = None
+
+# Resource limits of each check, when the config leaves them out
+LIMIT_DEFAULTS = {"timeout": 600, "cpu_seconds": None, "memory_mb": None}
 
 class CheckRunner:
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, tools=None):
         self.config = config
+        # Warm tool runners when running inside `me daemon` (see daemon.WarmTools)
+        self.tools = tools
     
-    def run_all_checks(self) -> Dict:
-        files = get_staged_files()
-        branch = get_current_branch()
+    def run_all_checks(self, state: Optional[RepoState] = None) -> Dict:
+        # One snapshot of the repository is shared by every check
+        state = state or get_repo_state()
+        files = state.files if state else []
+        branch = state.branch if state else None
         is_protected = is_protected_branch(branch, self.config.get("protected_branches", []))
         
         results = {
@@ -20,37 +40,324 @@ class CheckRunner:
         }
         
         enabled_checks = self.config.get("checks", {})
+        scope = CheckScope(self.config.get("paths", {}))
         
+        checks = []
         for check_type, enabled in enabled_checks.items():
-            if not enabled:
+            # A check that is off may still be on below some directory
+            if not enabled and not scope.enabled_below(check_type):
                 continue
             
-            check_class = registry.get(check_type)
+            # Only checks that are on get imported
+            try:
+                check_class = registry.get(check_type)
+            except CheckLoadError as e:
+                checks.append((check_type, UnavailableCheck(check_type, str(e))))
+                continue
             if not check_class:
                 continue
             
-            check = check_class()
-            result = check.run(files)
-            
+            checks.append((check_type, check_class()))
+        
+        # Each check's share of the staged files, from the "paths" section
+        scoped = scope.partition([check_type for check_type, _ in checks], files,
+                                 {check_type: bool(enabled_checks[check_type]) for check_type, _ in checks})
+        checks = [(t, check) for t, check in checks if enabled_checks[t] or scoped[t]]
+        check_files = [scoped[check_type] for check_type, _ in checks]
+        
+        git_dir = state.common_dir if state else None
+        # Held until the checks (and any fixes) are done
+        snapshot_lease = self._snapshot(state, checks)
+        snapshot = snapshot_lease.open() if snapshot_lease else None
+        root = snapshot or (state.root if state else None)
+        context = {
+            "repo": state,
+            "root": root,
+            "worktree": state.root if state else None,
+            "snapshot": snapshot,
+            "git_dir": git_dir,
+            "branch": branch,
+            "is_protected": is_protected,
+            "tools": self.tools
+        }
+        for check_type, check in checks:
+            check.settings = dict(self.config.get(f"settings.{check_type}", {}))
+            check.context = context
+            check.limits = self._limits(check_type)
+        
+        behaviors = []
+        for check_type, check in checks:
             behavior = self.config.get(f"behavior.{check_type}", "interactive")
             if is_protected:
                 if behavior == "warn":
                     behavior = "interactive"
-            
+            check.behavior = behavior
+            behaviors.append(behavior)
+        
+        # With fail_fast, a failing "block" check stops the others: the
+        # commit is refused whatever they report.
+        stop_on = set()
+        if self.config.get("execution.fail_fast", False):
+            stop_on = {i for i, behavior in enumerate(behaviors) if behavior == "block"}
+        
+        cache = self._open_cache(git_dir)
+        blobs = state.blobs if state else {}
+        head = state.head if state else None
+        
+        try:
+            outputs = self._execute(checks, check_files, cache, blobs, root, stop_on, head)
+            outputs = self._apply_fixes(checks, outputs, behaviors, state,
+                                        snapshot_lease if snapshot else None)
+        finally:
+            if snapshot_lease is not None:
+                snapshot_lease.close()
+        
+        if cache is not None:
+            try:
+                cache.save()
+            except OSError:
+                pass
+        
+        for (check_type, check), (result, stats), behavior in zip(checks, outputs, behaviors):
             results["checks"].append({
                 "name": check.name,
                 "type": check_type,
                 "result": result.result,
                 "message": result.message,
                 "details": result.details,
-                "behavior": behavior
+                "diagnostics": result.diagnostics,
+                "behavior": behavior,
+                "stats": stats
             })
         
+        if git_dir and self.config.get("history.enabled", True):
+            try:
+                append_run(git_dir / "me" / "history.jsonl", results,
+                           max_entries=self.config.get("history.max_entries", 1000))
+            except OSError:
+                pass
+        
         return results
     
-    def should_block(self, results: Dict) -> bool:
+    def _execute(self, checks: List[Tuple], check_files: List[List[str]], cache=None,
+                 blobs: Dict = None, root=None, stop_on: Set[int] = frozenset(),
+                 head: Optional[str] = None) -> List[Tuple[CheckOutput, Dict]]:
+        # (output, stats) pairs are returned in the same order as `checks`,
+        # whichever finishes first; check_files[i] are the files checks[i]
+        # gets. When a check whose index is in `stop_on` fails, the others
+        # are cancelled and reported as skipped. A check still running after
+        # its timeout has its tool stopped and reports TIMEOUT.
+        blobs = blobs or {}
+        failed = []
+        timed_out = set()
+        
+        def cancel_others(failing_check):
+            failed.append(failing_check.name)
+            for _, check in checks:
+                if check is not failing_check:
+                    check.cancel.set()
+        
+        for i, (check_type, check) in enumerate(checks):
+            check.cancel = threading.Event()
+            if i in stop_on:
+                check.on_failure = functools.partial(cancel_others, check)
+        
+        def run_check(i, check_type, check):
+            if check.cancel.is_set():
+                return CheckOutput(CheckResult.SKIP, f"Skipped, {failed[0]} failed")
+            try:
+                output = run_cached(cache, check_type, check, check_files[i], blobs, root, head)
+            except LimitExceeded as e:
+                output = CheckOutput(CheckResult.TIMEOUT, str(e))
+            except CheckCancelled:
+                if i not in timed_out:
+                    return CheckOutput(CheckResult.SKIP, f"Cancelled, {failed[0]} failed")
+                output = CheckOutput(CheckResult.TIMEOUT, f"Timed out after {check.limits['timeout']:g}s")
+            if i in stop_on and output.result.failed:
+                cancel_others(check)
+            return output
+        
+        def expire(i, check):
+            timed_out.add(i)
+            check.cancel.set()
+        
+        def run(i, check_type, check):
+            start = time.perf_counter()
+            start_cpu = time.thread_time()
+            timer = None
+            if check.limits.get("timeout"):
+                # Checks running in-process only stop at their next tool run
+                timer = threading.Timer(check.limits["timeout"], expire, (i, check))
+                timer.daemon = True
+                timer.start()
+            try:
+                output = run_check(i, check_type, check)
+            finally:
+                if timer is not None:
+                    timer.cancel()
+            return output, self._stats(check, check_files[i], time.perf_counter() - start,
+                                       time.thread_time() - start_cpu)
+        
+        workers = self._worker_count(len(checks))
+        if workers <= 1:
+            return [run(i, check_type, check) for i, (check_type, check) in enumerate(checks)]
+        
+        # Imported here: concurrent.futures pulls in logging, which the
+        # sequential path (and hook start-up) should not pay for
+        from concurrent.futures import ThreadPoolExecutor
+        
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(run, i, check_type, check) for i, (check_type, check) in enumerate(checks)]
+            try:
+                return [future.result() for future in futures]
+            except BaseException:
+                # Ctrl-C: the pool waits for its threads on the way out, so
+                # stop their tools first
+                for future in futures:
+                    future.cancel()
+                for _, check in checks:
+                    check.cancel.set()
+                raise
+    
+    def _apply_fixes(self, checks: List[Tuple], outputs: List[Tuple[CheckOutput, Dict]],
+                     behaviors: List[str], state: Optional[RepoState],
+                     snapshot=None) -> List[Tuple[CheckOutput, Dict]]:
+        # "fix" behavior: a failing check with a fixer rewrites the files it
+        # flagged, the changes are restaged and only those files are checked
+        # again. Files with unstaged changes are left alone, since restaging
+        # them would commit those changes too.
+        targets = [
+            i for i, ((_, check), (output, _), behavior) in enumerate(zip(checks, outputs, behaviors))
+            if behavior == "fix" and output.result == CheckResult.FAIL and check.fix_command
+        ]
+        if not targets or state is None:
+            return outputs
+        
+        from monitor_everything.git_utils import get_unstaged_files, stage_files
+        
+        # Only the flagged files have their work tree copies looked at
+        flagged = {i: {d.path for d in outputs[i][0].diagnostics} for i in targets}
+        candidates = sorted({e.path for e in state.staged if e.status != "D"} & set().union(*flagged.values()))
+        unstaged = get_unstaged_files(candidates, cwd=state.root)
+        if unstaged is None:
+            return outputs
+        fully_staged = [f for f in candidates if f not in unstaged]
+        
+        fixed = {}
+        for i in targets:
+            check = checks[i][1]
+            check.cancel = threading.Event()
+            start = time.perf_counter()
+            try:
+                fixed[i] = check.fix([f for f in fully_staged if f in flagged[i]])
+            except CheckCancelled:
+                fixed[i] = []
+            outputs[i][1]["wall"] = round(outputs[i][1]["wall"] + time.perf_counter() - start, 4)
+        
+        changed = sorted({f for files in fixed.values() for f in files})
+        if not changed or not stage_files(changed, cwd=state.root):
+            return outputs
+        
+        # The re-check must see the restaged content
+        if snapshot is not None:
+            snapshot.refresh()
+        
+        outputs = list(outputs)
+        for i in targets:
+            if fixed[i]:
+                outputs[i] = (self._recheck(checks[i][1], outputs[i][0], fixed[i]), outputs[i][1])
+        return outputs
+    
+    def _recheck(self, check, output: CheckOutput, fixed: List[str]) -> CheckOutput:
+        try:
+            rerun = check.run(fixed)
+        except LimitExceeded as e:
+            return CheckOutput(CheckResult.TIMEOUT, str(e))
+        fixed_set = set(fixed)
+        remaining = [d for d in output.diagnostics if d.path not in fixed_set] + list(rerun.diagnostics)
+        if rerun.result != CheckResult.FAIL and not remaining:
+            return CheckOutput(
+                result=CheckResult.PASS,
+                message=f"Fixed and restaged {len(fixed)} file(s)",
+                details=[f"Fixed: {path}" for path in fixed]
+            )
+        if rerun.result == CheckResult.FAIL and not rerun.diagnostics:
+            # Tool error on the re-check; its own output explains it
+            return rerun
+        return CheckOutput(
+            result=CheckResult.FAIL,
+            message=f"{output.message} (fixed and restaged {len(fixed)} file(s))",
+            diagnostics=remaining
+        )
+    
+    def _stats(self, check, files: List[str], wall: float, thread_cpu: float) -> Dict:
+        # CPU time covers the check's own thread plus the tools it ran; peak
+        # RSS is the largest tool process, or this process for in-process checks.
+        max_rss = check.tool_usage["max_rss"]
+        if not max_rss and resource is not None:
+            max_rss = rss_kb(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+        
+        return {
+            "wall": round(wall, 4),
+            "cpu": round(thread_cpu + check.tool_usage["cpu"], 4),
+            "files": sum(1 for f in files if check.applies_to(f)),
+            "cache": check.cache_result,
+            "max_rss": max_rss or None
+        }
+    
+    def _snapshot(self, state: Optional[RepoState], checks: List[Tuple]):
+        # Checks that look at files run in a copy of the index, so unstaged
+        # edits don't change their results. Returned unopened.
+        if state is None or not state.staged or not self.config.get("execution.snapshot", True):
+            return None
+        if all(check_type == "branch_awareness" for check_type, _ in checks):
+            return None
+        
+        from monitor_everything.snapshot import Snapshot, scratch_base
+        
+        return Snapshot(state.root, state.git_dir, scratch_base(self.config.get("execution.snapshot_dir")))
+    
+    def _open_cache(self, git_dir):
+        if not self.config.get("cache.enabled", False):
+            return None
+        
+        if not git_dir:
+            return None
+        
+        max_entries = self.config.get("cache.max_entries", 5000)
+        return ResultCache(git_dir / "me" / "cache.json", max_entries=max_entries)
+    
+    def _limits(self, check_type: str) -> Dict:
+        # execution.<limit>, unless the check's settings set their own
+        settings = self.config.get(f"settings.{check_type}", {})
+        limits = {}
+        for key, default in LIMIT_DEFAULTS.items():
+            value = settings.get(key, self.config.get(f"execution.{key}", default))
+            try:
+                value = float(value) if value is not None else None
+            except (TypeError, ValueError):
+                value = default
+            limits[key] = value if value and value > 0 else None
+        return limits
+    
+    def _worker_count(self, check_count: int) -> int:
+        if not self.config.get("execution.parallel", False):
+            return 1
+        
+        max_workers = self.config.get("execution.max_workers", 4)
+        try:
+            max_workers = int(max_workers)
+        except (TypeError, ValueError):
+            max_workers = 4
+        
+        return max(1, min(max_workers, check_count))
+    
+    def should_block(self, results: Dict, can_prompt: bool = True) -> bool:
+        # Without a prompt (json/sarif reports) the checks that would ask
+        # block too, as the prompt defaults to aborting; "warn" never blocks
+        blocking = ("block",) if can_prompt else ("block", "interactive", "fix")
         for check in results["checks"]:
-            if check["result"] == CheckResult.FAIL:
-                if check["behavior"] == "block":
+            if check["result"].failed:
+                if check["behavior"] in blocking:
                     return True
         return False
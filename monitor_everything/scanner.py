@@ -0,0 +1,197 @@
+import math
+import re
+import string
+from collections import Counter
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Tuple
+
+KEYWORD_PATTERNS = [
+    (r'(?i)(api[_-]?key|apikey)\s*[:=]\s*["\']?([a-zA-Z0-9_\-]{20,})', "API Key"),
+    (r'(?i)(secret[_-]?key|secretkey)\s*[:=]\s*["\']?([a-zA-Z0-9_\-]{20,})', "Secret Key"),
+    (r'(?i)(password)\s*[:=]\s*["\']([^"\']{8,})', "Password"),
+    (r'(?i)(token)\s*[:=]\s*["\']?([a-zA-Z0-9_\-]{20,})', "Token"),
+    (r'(?i)(aws[_-]?access[_-]?key[_-]?id)\s*[:=]\s*["\']?([A-Z0-9]{20})', "AWS Access Key"),
+    (r'(?i)(aws[_-]?secret[_-]?access[_-]?key)\s*[:=]\s*["\']?([a-zA-Z0-9/+=]{40})', "AWS Secret Key"),
+]
+
+# Credentials recognizable by their own format: (literal prefixes, pattern,
+# rule). The patterns are case sensitive; the prefixes feed the prefilter.
+PROVIDER_TOKENS = [
+    (("AKIA", "ASIA"), r'(?<![A-Z0-9])(?:AKIA|ASIA)[0-9A-Z]{16}(?![A-Z0-9])', "AWS Access Key"),
+    (("ghp_", "gho_", "ghu_", "ghs_", "ghr_"), r'gh[pousr]_[A-Za-z0-9]{36,}', "GitHub Token"),
+    (("github_pat_",), r'github_pat_[A-Za-z0-9_]{60,}', "GitHub Token"),
+    (("glpat-",), r'glpat-[A-Za-z0-9_\-]{20,}', "GitLab Token"),
+    (("xoxb-", "xoxa-", "xoxp-", "xoxr-", "xoxs-"), r'xox[baprs]-[A-Za-z0-9\-]{10,}', "Slack Token"),
+    (("sk_live_", "rk_live_"), r'[sr]k_live_[A-Za-z0-9]{20,}', "Stripe Key"),
+    (("AIza",), r'AIza[0-9A-Za-z_\-]{35}', "Google API Key"),
+    (("SG.",), r'SG\.[A-Za-z0-9_\-]{22}\.[A-Za-z0-9_\-]{43}', "SendGrid Key"),
+    (("npm_",), r'npm_[A-Za-z0-9]{36}', "npm Token"),
+    (("-----BEGIN",), r'-----BEGIN (?:RSA |DSA |EC |OPENSSH |PGP |ENCRYPTED )?PRIVATE KEY(?: BLOCK)?-----', "Private Key"),
+]
+
+SECRET_PATTERNS = KEYWORD_PATTERNS + [(pattern, rule) for _, pattern, rule in PROVIDER_TOKENS]
+
+# Every match of a default pattern starts with one of these literals (case
+# insensitive), so the regex only has to be tried where they occur.
+SECRET_PREFIXES = ("api", "secret", "password", "token", "aws") + tuple(
+    prefix for prefixes, _, _ in PROVIDER_TOKENS for prefix in prefixes
+)
+
+# A finding on a line containing this (in any comment syntax) is ignored
+ALLOW_MARKER = "me:allow-secret"
+
+ENTROPY_RULE = "High Entropy String"
+# Runs of base64/URL-safe characters long enough to be a credential. A
+# string of n characters has at most log2(n) bits per character, so shorter
+# runs could never reach a useful threshold (4.32 bits for 20 characters).
+ENTROPY_MIN_LENGTH = 32
+ENTROPY_CANDIDATE = re.compile(r'[A-Za-z0-9+/_\-]{%d,}={0,2}' % ENTROPY_MIN_LENGTH)
+# Lockfile checksums are random by design: subresource integrity hashes
+# (package-lock.json, yarn.lock, pnpm-lock.yaml) start the token itself,
+# the others (go.sum "h1:", poetry.lock / Pipfile.lock "sha256:") precede it
+ENTROPY_IGNORED = re.compile(r'sha(?:1|256|384|512)-')
+CHECKSUM_PREFIXES = ("h1:", "md5:", "sha1:", "sha256:", "sha384:", "sha512:")
+
+_LEADING_FLAGS = re.compile(r'^\(\?([aiLmsux]+)\)')
+# Length-preserving, unlike str.lower() on some non-ASCII text
+_ASCII_FOLD = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+@dataclass
+class Finding:
+    rule: str
+    line: int
+    start: int
+    end: int
+    match: str
+
+class LineIndex:
+    # Maps character offsets to 1-based line numbers. Matches arrive in
+    # increasing offset order, so newlines are counted once, incrementally,
+    # and a file without findings never pays for the index at all.
+    def __init__(self, content: str):
+        self.content = content
+        self._offset = 0
+        self._line = 1
+    
+    def line_of(self, offset: int) -> int:
+        if offset < self._offset:
+            self._offset = 0
+            self._line = 1
+        self._line += self.content.count("\n", self._offset, offset)
+        self._offset = offset
+        return self._line
+
+def shannon_entropy(text: str) -> float:
+    # Bits per character
+    length = len(text)
+    return -sum(count / length * math.log2(count / length) for count in Counter(text).values())
+
+class SecretScanner:
+    def __init__(self, patterns: List[Tuple[str, str]] = None, prefixes: Tuple[str, ...] = None,
+                 entropy_threshold: Optional[float] = None):
+        if patterns is None:
+            patterns = SECRET_PATTERNS
+        if prefixes is None and list(patterns) == SECRET_PATTERNS:
+            prefixes = SECRET_PREFIXES
+        self.prefixes = tuple(prefix.lower() for prefix in prefixes or ())
+        self.rules = [secret_type for _, secret_type in patterns]
+        # Tokens at or above this many bits per character are reported even
+        # without a pattern match (None: off)
+        self.entropy_threshold = entropy_threshold
+        
+        # One alternation with a named group per rule; leading inline flags
+        # such as (?i) are turned into scoped groups so each rule keeps its own.
+        alternatives = []
+        for i, (pattern, _) in enumerate(patterns):
+            flags = _LEADING_FLAGS.match(pattern)
+            if flags:
+                pattern = f"(?{flags.group(1)}:{pattern[flags.end():]})"
+            alternatives.append(f"(?P<r{i}>{pattern})")
+        self.regex = re.compile("|".join(alternatives))
+        self.prefix_regex = _prefix_regex(self.prefixes)
+    
+    def scan(self, content: str) -> Iterator[Finding]:
+        spans = [
+            (match.start(), match.end(), self.rules[int(match.lastgroup[1:])], match.group())
+            for match in self._matches(content)
+        ]
+        if self.entropy_threshold:
+            spans = sorted(spans + list(self._random_tokens(content, spans)))
+        
+        lines = LineIndex(content)
+        check_allowed = ALLOW_MARKER in content
+        for start, end, rule, text in spans:
+            if check_allowed and _allowed(content, start, end):
+                continue
+            yield Finding(
+                rule=rule,
+                line=lines.line_of(start),
+                start=start,
+                end=end,
+                match=text
+            )
+    
+    def _random_tokens(self, content: str, spans) -> Iterator[Tuple[int, int, str, str]]:
+        # One pass over the candidate runs; those overlapping a pattern
+        # match are already reported. `spans` are sorted and disjoint.
+        i = 0
+        for candidate in ENTROPY_CANDIDATE.finditer(content):
+            start, end = candidate.span()
+            while i < len(spans) and spans[i][1] <= start:
+                i += 1
+            if i < len(spans) and spans[i][0] < end:
+                continue
+            token = candidate.group()
+            if content.endswith(CHECKSUM_PREFIXES, 0, start):
+                continue
+            if _looks_random(token) and shannon_entropy(token) >= self.entropy_threshold:
+                yield start, end, ENTROPY_RULE, token
+    
+    def _matches(self, content: str) -> Iterator[re.Match]:
+        if not self.prefixes:
+            yield from self.regex.finditer(content)
+            return
+        
+        # Locate prefixes in a case-folded copy and anchor the combined regex
+        # there. Offsets are visited in increasing order, so this yields the
+        # same leftmost matches as finditer.
+        folded = content.translate(_ASCII_FOLD)
+        match_at = self.regex.match
+        last_end = 0
+        for candidate in self.prefix_regex.finditer(folded):
+            pos = candidate.start()
+            if pos < last_end:
+                continue
+            match = match_at(content, pos)
+            if match is not None:
+                yield match
+                last_end = max(match.end(), pos + 1)
+
+def _looks_random(token: str) -> bool:
+    # Identifiers, paths and words rarely mix digits with both cases
+    return (any(c.isdigit() for c in token) and any(c.islower() for c in token)
+            and any(c.isupper() for c in token) and not ENTROPY_IGNORED.match(token))
+
+def _allowed(content: str, start: int, end: int) -> bool:
+    line_start = content.rfind("\n", 0, start) + 1
+    line_end = content.find("\n", end)
+    return ALLOW_MARKER in content[line_start:line_end if line_end != -1 else len(content)]
+
+def _prefix_regex(prefixes):
+    if not prefixes:
+        return None
+    # Consume only the first character so overlapping prefixes are all found
+    # ("secretoken" has candidates at "secret" and "token").
+    first = "".join(sorted({re.escape(p[0]) for p in prefixes}))
+    rest = "|".join(sorted({re.escape(p[1:]) for p in prefixes}))
+    return re.compile(f"[{first}](?={rest})")
+
+_scanners = {}
+
+def get_scanner(patterns: List[Tuple[str, str]] = None, entropy_threshold: Optional[float] = None) -> SecretScanner:
+    # Compiling the combined pattern is the expensive part; do it once per rule set
+    key = (tuple(SECRET_PATTERNS if patterns is None else patterns), entropy_threshold)
+    scanner = _scanners.get(key)
+    if scanner is None:
+        scanner = _scanners[key] = SecretScanner(list(key[0]), entropy_threshold=entropy_threshold)
+    return scanner
\ No newline at end of file
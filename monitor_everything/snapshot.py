@@ -0,0 +1,216 @@
+# The staged snapshot: a scratch copy of the index that checks run in, so
+# unstaged edits never leak into their results. One directory per worktree
+# is kept between runs (on tmpfs when there is one) and updated
+# incrementally: a manifest of the blob written at each path lets each run
+# rewrite only the paths whose staged blob changed.
+import hashlib
+import json
+import os
+import shutil
+import stat
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    # Not available on Windows
+    fcntl = None
+
+MANIFEST_NAME = ".me-snapshot.json"
+LOCK_NAME = ".me-snapshot.lock"
+MANIFEST_VERSION = 1
+
+# Gitlinks (submodules) have no blob to write
+GITLINK_MODE = "160000"
+
+# Where scratch directories go when the config doesn't say
+TMPFS_DIR = "/dev/shm"
+
+def scratch_base(configured=None) -> Path:
+    if configured:
+        return Path(configured).expanduser()
+    if os.path.isdir(TMPFS_DIR) and os.access(TMPFS_DIR, os.W_OK | os.X_OK):
+        return Path(TMPFS_DIR)
+    return Path(tempfile.gettempdir())
+
+def snapshot_dir(git_dir: Path, base: Path) -> Path:
+    # Keyed by the worktree's own git dir, since each worktree has its own
+    # index, inside a directory private to the user (see private_dir)
+    digest = hashlib.sha1(str(git_dir).encode("utf-8")).hexdigest()[:12]
+    return base / f"me-snapshot-{_uid()}" / digest
+
+def private_dir(path: Path):
+    # Creates `path` for this user only, or checks that an existing one is
+    # theirs. Scratch bases are usually world-writable (/dev/shm, /tmp), so
+    # another user could have created it first, e.g. with a forged manifest
+    # and a planted conftest.py for the checks to run. Raises OSError.
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or (hasattr(os, "getuid") and info.st_uid != os.getuid()):
+        raise PermissionError(f"{path} is not a directory owned by the current user")
+    if stat.S_IMODE(info.st_mode) & 0o077:
+        os.chmod(path, 0o700)
+
+def _uid() -> str:
+    return str(os.getuid()) if hasattr(os, "getuid") else "user"
+
+def read_index(root: Path) -> Optional[Dict[str, Tuple[str, str]]]:
+    # path -> (mode, sha) for every entry of the index, taking "ours" for
+    # unmerged paths like the checks' file list does
+    try:
+        result = subprocess.run(["git", "ls-files", "-s", "-z"],
+                                cwd=root, capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    
+    index = {}
+    for record in result.stdout.split("\0"):
+        if not record:
+            continue
+        meta, path = record.split("\t", 1)
+        mode, sha, stage = meta.split()
+        if stage in ("0", "2") and mode != GITLINK_MODE:
+            index[path] = (mode, sha)
+    return index
+
+class Snapshot:
+    # A worktree's snapshot, brought up to date with its index when opened
+    # and locked until closed. A run keeps it open for as long as its checks
+    # read the files, so a concurrent run (a hook and `me check` at once)
+    # waits instead of rewriting them underneath.
+    def __init__(self, root: Path, git_dir: Path, base: Optional[Path] = None):
+        self.root = Path(root)
+        self.base = base or scratch_base()
+        self.path = snapshot_dir(git_dir, self.base)
+        self._lock = None
+    
+    def open(self) -> Optional[Path]:
+        # The snapshot directory, or None when it cannot be written (checks
+        # then run in the worktree)
+        try:
+            self.base.mkdir(parents=True, exist_ok=True)
+            private_dir(self.path.parent)
+            private_dir(self.path)
+            self._lock = _lock(self.path)
+        except OSError:
+            return None
+        if not self.refresh():
+            self.close()
+            return None
+        
+        _prune_stale(self.path)
+        return self.path.resolve()
+    
+    def refresh(self) -> bool:
+        # Updates the open snapshot, e.g. after fixed files were restaged
+        index = read_index(self.root)
+        if index is None:
+            return False
+        try:
+            _update(self.root, self.path, index)
+        except (OSError, subprocess.CalledProcessError, ValueError):
+            shutil.rmtree(self.path, ignore_errors=True)
+            return False
+        return True
+    
+    def close(self):
+        if self._lock is not None:
+            self._lock.close()
+            self._lock = None
+    
+    def __enter__(self) -> Optional[Path]:
+        return self.open()
+    
+    def __exit__(self, *exc):
+        self.close()
+
+def _update(root: Path, target: Path, index: Dict[str, Tuple[str, str]]):
+    manifest_path = target / MANIFEST_NAME
+    previous = _load_manifest(manifest_path)
+    
+    for path in previous.keys() - index.keys():
+        _remove(target, path)
+    changed = [path for path, entry in index.items() if previous.get(path) != list(entry)]
+    
+    if changed:
+        # A path can turn from a file into a directory (or back) between runs
+        for path in changed:
+            if previous.get(path) is None:
+                _clear_parents(target, path)
+        # Drop the manifest first: an interrupted update then starts over
+        if manifest_path.exists():
+            manifest_path.unlink()
+        subprocess.run(["git", "checkout-index", "--force", f"--prefix={target}{os.sep}", "--stdin", "-z"],
+                       cwd=root, input="".join(f"{path}\0" for path in changed),
+                       capture_output=True, text=True, check=True)
+    
+    if changed or previous.keys() != index.keys() or not manifest_path.exists():
+        tmp_path = target / f"{MANIFEST_NAME}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({"version": MANIFEST_VERSION, "root": str(root), "entries": index}, f)
+        os.replace(tmp_path, manifest_path)
+
+def _load_manifest(path: Path) -> Dict:
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+        return {}
+    return data.get("entries", {})
+
+def _remove(target: Path, path: str):
+    full_path = target / path
+    try:
+        if full_path.is_dir() and not full_path.is_symlink():
+            shutil.rmtree(full_path)
+        else:
+            full_path.unlink()
+    except FileNotFoundError:
+        pass
+
+def _clear_parents(target: Path, path: str):
+    # Any non-directory where the new path needs a directory, and any
+    # directory where it needs a file
+    parent = target
+    for part in Path(path).parts[:-1]:
+        parent = parent / part
+        if parent.is_symlink() or parent.is_file():
+            parent.unlink()
+    full_path = target / path
+    if full_path.is_dir() and not full_path.is_symlink():
+        shutil.rmtree(full_path)
+
+def _lock(target: Path):
+    # The open lock file; the lock is held until it is closed
+    lock_file = open(target / LOCK_NAME, 'a')
+    if fcntl is not None:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        except OSError:
+            lock_file.close()
+            raise
+    return lock_file
+
+def _prune_stale(keep: Path):
+    # Snapshots of worktrees or clones that no longer exist
+    try:
+        candidates = [p for p in keep.parent.iterdir() if p != keep]
+    except OSError:
+        return
+    for candidate in candidates:
+        manifest = candidate / MANIFEST_NAME
+        try:
+            with open(manifest, 'r') as f:
+                root = json.load(f).get("root")
+        except (OSError, ValueError, AttributeError):
+            continue
+        if root and not os.path.isdir(root):
+            shutil.rmtree(candidate, ignore_errors=True)
@@ -0,0 +1,8 @@
+import pytest
+
+@pytest.fixture(autouse=True)
+def isolated_config(tmp_path_factory, monkeypatch):
+    # Keep tests away from ~/.merc and ~/.cache/monitor-everything
+    home = tmp_path_factory.mktemp("home")
+    monkeypatch.setattr("monitor_everything.config.GLOBAL_CONFIG_PATH", home / ".merc")
+    monkeypatch.setattr("monitor_everything.config.CONFIG_CACHE_DIR", home / ".cache" / "monitor-everything")
@@ -0,0 +1,78 @@
+import subprocess
+from click.testing import CliRunner
+from monitor_everything.baseline import fingerprint, load_baseline, scan_files, write_baseline
+from monitor_everything.checks import CheckResult, SecurityCheck
+from monitor_everything.main import cli
+
+SECRET = 'api_key = "abcdefghijklmnopqrstuvwxyz"\n'
+
+def test_fingerprint_ignores_quotes_and_spacing():
+    assert fingerprint("a.py", "API Key", 'api_key = "abcdefghijklmnopqrstuvwxyz"') == \
+        fingerprint("a.py", "API Key", "api_key='abcdefghijklmnopqrstuvwxyz'")
+    assert fingerprint("a.py", "API Key", "api_key=abc") != fingerprint("b.py", "API Key", "api_key=abc")
+    assert fingerprint("a.py", "API Key", "api_key=abc") != fingerprint("a.py", "Token", "api_key=abc")
+
+def test_write_and_load_baseline(tmp_path):
+    path = tmp_path / ".me-baseline"
+    write_baseline(path, [
+        {"fingerprint": "b" * 40, "path": "z.py", "line": 1, "rule": "Token"},
+        {"fingerprint": "a" * 40, "path": "a.py", "line": 3, "rule": "API Key"}
+    ])
+    
+    assert load_baseline(path) == {"a" * 40, "b" * 40}
+    assert path.read_text().index("a.py") < path.read_text().index("z.py")
+    assert load_baseline(tmp_path / "missing") == set()
+    path.write_text("not json")
+    assert load_baseline(path) == set()
+
+def test_scan_files_in_parallel_matches_serial(tmp_path):
+    files = []
+    for i in range(150):
+        name = f"f{i}.py"
+        (tmp_path / name).write_text(SECRET if i % 7 == 0 else "x = 1\n")
+        files.append(name)
+    
+    serial = scan_files(tmp_path, files, workers=1)
+    
+    assert len(serial) == 22
+    assert scan_files(tmp_path, files, workers=2) == serial
+
+def test_security_check_skips_baselined_findings(tmp_path):
+    (tmp_path / "a.py").write_text("x = 1\n" + SECRET)
+    (tmp_path / "b.py").write_text(SECRET)
+    check = SecurityCheck()
+    check.context = {"root": tmp_path}
+    
+    assert len(check.run(["a.py", "b.py"]).diagnostics) == 2
+    
+    write_baseline(tmp_path / ".me-baseline", scan_files(tmp_path, ["a.py"]))
+    result = check.run(["a.py", "b.py"])
+    assert [d.path for d in result.diagnostics] == ["b.py"]
+    
+    # Moving the secret keeps it suppressed, changing it does not
+    (tmp_path / "a.py").write_text(SECRET + "\n\nx = 1\n")
+    (tmp_path / "b.py").write_text("x = 1\n")
+    assert check.run(["a.py", "b.py"]).result == CheckResult.PASS
+    (tmp_path / "a.py").write_text(SECRET.replace("abc", "xyz"))
+    assert check.run(["a.py"]).result == CheckResult.FAIL
+
+def test_baseline_update_command(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr("monitor_everything.config.LOCAL_CONFIG_PATH", tmp_path / ".merc")
+    monkeypatch.setattr("monitor_everything.config.GLOBAL_CONFIG_PATH", tmp_path / "global" / ".merc")
+    monkeypatch.setattr("monitor_everything.config.CONFIG_CACHE_DIR", tmp_path / "cache")
+    subprocess.run(["git", "init"], cwd=tmp_path, capture_output=True)
+    (tmp_path / "vendor").mkdir()
+    (tmp_path / "settings.py").write_text(SECRET)
+    (tmp_path / "vendor" / "lib.py").write_text(SECRET)
+    (tmp_path / "untracked.py").write_text(SECRET)
+    subprocess.run(["git", "add", "settings.py", "vendor"], cwd=tmp_path, capture_output=True)
+    (tmp_path / ".merc").write_text('{"paths": {"exclude": ["vendor/"]}}')
+    
+    result = CliRunner().invoke(cli, ["baseline", "update"])
+    
+    assert result.exit_code == 0, result.output
+    assert "Recorded 1 finding(s) from 1 file(s)" in result.output
+    assert load_baseline(tmp_path / ".me-baseline") == {
+        fingerprint("settings.py", "API Key", SECRET.strip())
+    }
@@ -0,0 +1,118 @@
+from monitor_everything.cache import ResultCache, run_cached
+from monitor_everything.checks import Check, CheckOutput, CheckResult
+
+class CountingCheck(Check):
+    cacheable = True
+    
+    def __init__(self, failing=()):
+        super().__init__("Counting")
+        self.failing = failing
+        self.calls = []
+    
+    def run(self, files):
+        self.calls.append(list(files))
+        details = [f"{f}:1: bad" for f in files if f in self.failing]
+        if details:
+            return CheckOutput(CheckResult.FAIL, "Issues found", details)
+        return CheckOutput(CheckResult.PASS, "No issues found")
+
+def test_result_cache_persists(tmp_path):
+    path = tmp_path / "me" / "cache.json"
+    cache = ResultCache(path)
+    cache.put("key", {"r": "pass"})
+    cache.save()
+    
+    assert path.exists()
+    assert ResultCache(path).get("key")["r"] == "pass"
+
+def test_result_cache_evicts_oldest(tmp_path):
+    cache = ResultCache(tmp_path / "cache.json", max_entries=2)
+    for key in ["a", "b", "c"]:
+        cache.put(key, {"r": "pass"})
+    cache.get("a")
+    cache.save()
+    
+    reloaded = ResultCache(tmp_path / "cache.json")
+    assert len(reloaded) == 2
+    assert reloaded.get("a") is not None
+    assert reloaded.get("b") is None
+
+def test_run_cached_only_runs_missing_files(tmp_path):
+    cache = ResultCache(tmp_path / "cache.json")
+    blobs = {"a.py": "1" * 40, "b.py": "2" * 40}
+    
+    check = CountingCheck()
+    run_cached(cache, "counting", check, ["a.py"], blobs, tmp_path)
+    output = run_cached(cache, "counting", check, ["a.py", "b.py"], blobs, tmp_path)
+    
+    assert check.calls == [["a.py"], ["b.py"]]
+    assert output.result == CheckResult.PASS
+
+def test_run_cached_replays_failures(tmp_path):
+    cache = ResultCache(tmp_path / "cache.json")
+    blobs = {"a.py": "1" * 40, "b.py": "2" * 40}
+    
+    check = CountingCheck(failing=("b.py",))
+    run_cached(cache, "counting", check, ["a.py", "b.py"], blobs, tmp_path)
+    output = run_cached(cache, "counting", check, ["a.py", "b.py"], blobs, tmp_path)
+    
+    assert len(check.calls) == 1
+    assert output.result == CheckResult.FAIL
+    assert output.details == ["b.py:1: bad"]
+
+def test_run_cached_new_blob_is_a_miss(tmp_path):
+    cache = ResultCache(tmp_path / "cache.json")
+    check = CountingCheck()
+    
+    run_cached(cache, "counting", check, ["a.py"], {"a.py": "1" * 40}, tmp_path)
+    run_cached(cache, "counting", check, ["a.py"], {"a.py": "3" * 40}, tmp_path)
+    
+    assert check.calls == [["a.py"], ["a.py"]]
+
+def test_run_cached_commit_scope(tmp_path):
+    cache = ResultCache(tmp_path / "cache.json")
+    blobs = {"a.py": "1" * 40, "b.py": "2" * 40}
+    
+    check = CountingCheck()
+    check.cache_scope = "commit"
+    run_cached(cache, "counting", check, ["a.py", "b.py"], blobs, tmp_path)
+    run_cached(cache, "counting", check, ["a.py", "b.py"], blobs, tmp_path)
+    run_cached(cache, "counting", check, ["a.py"], blobs, tmp_path)
+    
+    assert check.calls == [["a.py", "b.py"], ["a.py"]]
+
+def test_run_cached_commit_scope_keys_on_the_tree(tmp_path):
+    cache = ResultCache(tmp_path / "cache.json")
+    check = CountingCheck()
+    check.cache_scope = "commit"
+    
+    run_cached(cache, "counting", check, ["a.py"], {"a.py": "1" * 40}, tmp_path, "a" * 40)
+    run_cached(cache, "counting", check, ["a.py"], {"a.py": "1" * 40}, tmp_path, "a" * 40)
+    # Another HEAD, or another staged file beside a.py, is another tree
+    run_cached(cache, "counting", check, ["a.py"], {"a.py": "1" * 40}, tmp_path, "b" * 40)
+    run_cached(cache, "counting", check, ["a.py"], {"a.py": "1" * 40, "c.txt": "2" * 40}, tmp_path, "b" * 40)
+    
+    assert check.calls == [["a.py"]] * 3
+
+def test_run_cached_replays_diagnostics(tmp_path):
+    from monitor_everything.diagnostics import Diagnostic
+    
+    class DiagnosticCheck(CountingCheck):
+        def run(self, files):
+            self.calls.append(list(files))
+            diagnostics = [Diagnostic(f, 1, 1, "X1", message="bad") for f in files if f in self.failing]
+            if diagnostics:
+                return CheckOutput(CheckResult.FAIL, "Issues found", diagnostics=diagnostics)
+            return CheckOutput(CheckResult.PASS, "No issues found")
+    
+    cache = ResultCache(tmp_path / "cache.json")
+    blobs = {"a.py": "1" * 40, "b.py": "2" * 40}
+    
+    check = DiagnosticCheck(failing=("b.py",))
+    first = run_cached(cache, "diagnostic", check, ["a.py", "b.py"], blobs, tmp_path)
+    cache.save()
+    second = run_cached(ResultCache(tmp_path / "cache.json"), "diagnostic", check, ["a.py", "b.py"], blobs, tmp_path)
+    
+    assert len(check.calls) == 1
+    assert second.diagnostics == first.diagnostics == [Diagnostic("b.py", 1, 1, "X1", message="bad")]
+    assert second.details == ["b.py:1:1: bad [X1]"]
@@ -46,3 +46,63 @@ def test_check_command_with_staged_files(tmp_path, monkeypatch):
     
     assert "Running checks" in result.output
     assert "feature/test" in result.output
+
+def _repo_with_secret(tmp_path, monkeypatch):
+    import json
+    
+    monkeypatch.chdir(tmp_path)
+    subprocess.run(["git", "init"], cwd=tmp_path, capture_output=True)
+    subprocess.run(["git", "checkout", "-b", "feature/test"], cwd=tmp_path, capture_output=True)
+    (tmp_path / "settings.py").write_text('API_KEY = "sk_live_1234567890abcdefghij"\n')
+    subprocess.run(["git", "add", "settings.py"], cwd=tmp_path, capture_output=True)
+    
+    (tmp_path / ".merc").write_text(json.dumps({"checks": {"security": True}, "daemon": {"enabled": False}}))
+    monkeypatch.setattr("monitor_everything.config.LOCAL_CONFIG_PATH", tmp_path / ".merc")
+    monkeypatch.setattr("monitor_everything.config.GLOBAL_CONFIG_PATH", tmp_path / "global" / ".merc")
+
+def test_check_command_json_report(tmp_path, monkeypatch):
+    import json
+    
+    _repo_with_secret(tmp_path, monkeypatch)
+    
+    runner = CliRunner()
+    result = runner.invoke(cli, ['check', '--format', 'json'])
+    
+    assert result.exit_code == 1
+    report = json.loads(result.stdout)
+    assert report["branch"] == "feature/test"
+    security = next(c for c in report["checks"] if c["type"] == "security")
+    assert security["result"] == "fail"
+    assert security["stats"]["wall"] >= 0
+    assert security["diagnostics"][0]["path"] == "settings.py"
+    assert security["diagnostics"][0]["line"] == 1
+
+def test_check_command_sarif_report(tmp_path, monkeypatch):
+    import json
+    
+    _repo_with_secret(tmp_path, monkeypatch)
+    
+    runner = CliRunner()
+    result = runner.invoke(cli, ['check', '--format', 'sarif', '--output', 'report.sarif'])
+    
+    assert result.exit_code == 1
+    report = json.loads((tmp_path / "report.sarif").read_text())
+    assert report["version"] == "2.1.0"
+    security = next(r for r in report["runs"] if r["automationDetails"]["id"] == "me/security/")
+    location = security["results"][0]["locations"][0]["physicalLocation"]
+    assert location["artifactLocation"]["uri"] == "settings.py"
+    assert location["region"]["startLine"] == 1
+
+def test_check_command_report_exit_code_follows_behavior(tmp_path, monkeypatch):
+    import json
+    
+    _repo_with_secret(tmp_path, monkeypatch)
+    (tmp_path / ".merc").write_text(json.dumps({
+        "checks": {"security": True},
+        "behavior": {"security": "warn"},
+        "daemon": {"enabled": False}
+    }))
+    
+    for output_format in ("text", "json"):
+        result = CliRunner().invoke(cli, ['check', '--format', output_format])
+        assert result.exit_code == 0, result.output
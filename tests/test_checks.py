@@ -1,6 +1,8 @@
 import subprocess
+import pytest
 from monitor_everything.checks import (
     Check,
+    CheckLoadError,
     CheckResult,
     CheckOutput,
     CheckRegistry,
@@ -81,6 +83,55 @@ def test_registry_has_all_checks():
     assert "type_checking" in registry.list_available()
     assert "tests" in registry.list_available()
 
+def test_check_registry_imports_lazy_checks_on_first_use():
+    import sys
+    reg = CheckRegistry()
+    reg.register("branch", "monitor_everything.checks:BranchAwarenessCheck")
+    reg.register("broken", "monitor_everything.no_such_module:Check")
+    
+    assert reg.list_available() == ["branch", "broken"]
+    assert reg.get("branch") is BranchAwarenessCheck
+    assert reg.get("missing") is None
+    with pytest.raises(CheckLoadError, match="'broken'"):
+        reg.get("broken")
+    assert "monitor_everything.no_such_module" not in sys.modules
+
+def test_check_registry_discovers_entry_points_only_when_needed(monkeypatch):
+    import importlib.metadata
+    
+    calls = []
+    
+    def entry_points(group):
+        calls.append(group)
+        return [
+            importlib.metadata.EntryPoint("shell", "monitor_everything.checks:BranchAwarenessCheck", group),
+            importlib.metadata.EntryPoint("builtin", "monitor_everything.no_such_module:Check", group)
+        ]
+    
+    monkeypatch.setattr(importlib.metadata, "entry_points", entry_points)
+    reg = CheckRegistry("test.checks")
+    reg.register("builtin", Check)
+    
+    assert reg.get("builtin") is Check
+    assert calls == []
+    assert reg.get("shell") is BranchAwarenessCheck
+    assert reg.get("builtin") is Check
+    assert reg.list_available() == ["builtin", "shell"]
+    assert calls == ["test.checks"]
+
+def test_check_registry_register_waits_for_discovery():
+    import threading
+    
+    reg = CheckRegistry()
+    registered = threading.Thread(target=reg.register, args=("late", Check))
+    with reg._lock:
+        # As if another thread were discovering plugins
+        registered.start()
+        registered.join(0.2)
+        assert registered.is_alive()
+    registered.join(5)
+    assert reg.get("late") is Check
+
 def test_pytest_check_runs():
     from monitor_everything.checks import PytestCheck
     import shutil
@@ -131,3 +182,217 @@ def test_security_check_large_file(tmp_path):
     
     assert result.result == CheckResult.FAIL
     assert "Large file" in result.details[0]
+
+def test_pytest_check_impact_selection_skips_unaffected(tmp_path):
+    from monitor_everything.checks import PytestCheck
+    from monitor_everything.impact import select_tests
+    import shutil
+    
+    if not shutil.which("pytest"):
+        return
+    
+    subprocess.run(["git", "init"], cwd=tmp_path, capture_output=True)
+    (tmp_path / "util.py").write_text("X = 1\n")
+    (tmp_path / "test_other.py").write_text("def test_other():\n    pass\n")
+    subprocess.run(["git", "add", "."], cwd=tmp_path, capture_output=True)
+    select_tests(tmp_path, tmp_path / ".git", [])
+    
+    check = PytestCheck()
+    check.settings = {"selection": "impact"}
+    check.context = {"root": tmp_path, "git_dir": tmp_path / ".git", "is_protected": False}
+    result = check.run(["util.py"])
+    
+    assert result.result == CheckResult.PASS
+    assert "No tests affected" in result.message
+
+def test_pytest_check_reports_failing_tests(tmp_path):
+    from monitor_everything.checks import PytestCheck
+    import shutil
+    
+    if not shutil.which("pytest"):
+        return
+    
+    (tmp_path / "test_sample.py").write_text("def test_ok():\n    pass\n\ndef test_bad():\n    assert 1 == 2\n")
+    
+    check = PytestCheck()
+    check.context = {"root": tmp_path}
+    result = check.run(["test_sample.py"])
+    
+    assert result.result == CheckResult.FAIL
+    assert [(d.path, d.line, d.code) for d in result.diagnostics] == [("test_sample.py", 4, "failed")]
+    assert result.diagnostics[0].message == "test_bad: assert 1 == 2"
+
+def test_security_check_staged_mode_scans_added_lines(tmp_path, monkeypatch):
+    from monitor_everything.checks import SecurityCheck
+    
+    monkeypatch.chdir(tmp_path)
+    subprocess.run(["git", "init"], cwd=tmp_path, capture_output=True)
+    subprocess.run(["git", "config", "user.email", "test@test.com"], cwd=tmp_path, capture_output=True)
+    subprocess.run(["git", "config", "user.name", "Test"], cwd=tmp_path, capture_output=True)
+    
+    test_file = tmp_path / "config.py"
+    test_file.write_text('OLD_TOKEN = "abcdefghijklmnopqrstuvwxyz"\nx = 1\n')
+    subprocess.run(["git", "add", "config.py"], cwd=tmp_path, capture_output=True)
+    subprocess.run(["git", "commit", "-m", "init"], cwd=tmp_path, capture_output=True)
+    
+    test_file.write_text('OLD_TOKEN = "abcdefghijklmnopqrstuvwxyz"\nx = 1\nAPI_KEY = "sk_live_1234567890abcdefghij"\n')
+    subprocess.run(["git", "add", "config.py"], cwd=tmp_path, capture_output=True)
+    test_file.write_text('PASSWORD = "not-staged-yet"\n')
+    
+    check = SecurityCheck()
+    check.settings = {"mode": "staged"}
+    result = check.run(["config.py"])
+    
+    assert result.result == CheckResult.FAIL
+    assert result.details == ["config.py:3: Possible API Key detected"]
+    assert not check.cacheable
+
+def test_ruff_check_splits_long_file_lists(tmp_path, monkeypatch):
+    import shutil
+    import pytest
+    from monitor_everything.checks import RuffCheck
+    
+    if not shutil.which("ruff"):
+        pytest.skip("ruff not installed")
+    
+    files = []
+    for i in range(20):
+        name = f"module_{i:02d}.py"
+        (tmp_path / name).write_text("import os\n" if i % 5 == 0 else "x = 1\n")
+        files.append(name)
+    
+    # Room for a handful of paths per command line
+    monkeypatch.setattr("monitor_everything.checks.argv_budget", lambda: 250)
+    check = RuffCheck()
+    check.context = {"root": tmp_path}
+    output = check.run(files)
+    
+    assert output.result == CheckResult.FAIL
+    flagged = sorted({check.detail_file(d) for d in output.details if "F401" in d})
+    assert flagged == ["module_00.py", "module_05.py", "module_10.py", "module_15.py"]
+
+def test_mypy_check_uses_repository_cache(tmp_path, monkeypatch):
+    import subprocess
+    from monitor_everything.checks import MypyCheck
+    
+    monkeypatch.setattr("shutil.which", lambda name: f"/usr/bin/{name}")
+    commands = []
+    
+    def run_batched(command, files, failure_line=None, cwd=None):
+        commands.append(command + files)
+        return subprocess.CompletedProcess(command + files, 0, "", "")
+    
+    check = MypyCheck()
+    check.settings = {"follow_imports": "silent"}
+    check.context = {"root": tmp_path, "git_dir": tmp_path / ".git"}
+    monkeypatch.setattr(check, "run_batched", run_batched)
+    
+    assert check.run(["a.py"]).result == CheckResult.PASS
+    assert commands == [[
+        "mypy", "-O", "json",
+        "--cache-dir", str(tmp_path / ".git" / "me" / "mypy_cache"),
+        "--follow-imports=silent",
+        "a.py"
+    ]]
+
+def test_pytest_check_records_durations_and_orders_modules(tmp_path):
+    import json
+    import shutil
+    from monitor_everything.checks import PytestCheck
+    
+    if not shutil.which("pytest"):
+        return
+    
+    (tmp_path / "test_fast.py").write_text("def test_fast():\n    pass\n")
+    (tmp_path / "test_slow.py").write_text("import time\n\ndef test_slow():\n    time.sleep(0.05)\n")
+    
+    check = PytestCheck()
+    check.settings = {"workers": 0}
+    check.context = {"root": tmp_path, "git_dir": tmp_path / "git"}
+    assert check.run([]).result == CheckResult.PASS
+    
+    durations = json.loads((tmp_path / "git" / "me" / "test_durations.json").read_text())["tests"]
+    assert durations["test_slow.py::test_slow"] > durations["test_fast.py::test_fast"]
+    
+    from monitor_everything.pytest_plugin import RunOrder
+    
+    class Item:
+        def __init__(self, nodeid):
+            self.nodeid = nodeid
+    
+    items = [Item("test_fast.py::test_fast"), Item("test_new.py::test_new"), Item("test_slow.py::test_slow")]
+    RunOrder(str(tmp_path / "git" / "me" / "test_durations.json")).pytest_collection_modifyitems(None, None, items)
+    assert [item.nodeid for item in items] == [
+        "test_new.py::test_new", "test_slow.py::test_slow", "test_fast.py::test_fast"
+    ]
+
+def test_pytest_check_run_options(tmp_path, monkeypatch):
+    import json
+    from monitor_everything.checks import PytestCheck
+    
+    monkeypatch.setattr("monitor_everything.checks.pytest_has_plugin", lambda module: True)
+    durations_path = tmp_path / "me" / "test_durations.json"
+    durations_path.parent.mkdir()
+    durations_path.write_text(json.dumps({"version": 1, "tests": {
+        "test_a.py::test_1": 3.0, "test_a.py::test_2": 3.0, "test_b.py::test_1": 0.1
+    }}))
+    
+    check = PytestCheck()
+    check.settings = {"workers": 8, "min_parallel_seconds": 2.0}
+    check.context = {"git_dir": tmp_path}
+    check.behavior = "block"
+    
+    options = check._run_options(None, [], str(tmp_path))
+    assert options[0] == f"--me-durations={durations_path}"
+    assert options[1:] == ["-n", "3", "-x"]
+    
+    # Too little work to pay for worker start-up
+    check.behavior = "interactive"
+    options = check._run_options(["test_b.py"], [], str(tmp_path))
+    assert "-n" not in options
+    assert (tmp_path / "related.txt").read_text() == "test_b.py\n"
+
+def test_pytest_check_runs_failed_tests_first_within_budget(tmp_path):
+    import shutil
+    from monitor_everything.checks import PytestCheck
+    
+    if not shutil.which("pytest"):
+        return
+    
+    (tmp_path / "test_a.py").write_text("import time\n\ndef test_slow():\n    time.sleep(0.3)\n")
+    (tmp_path / "test_b.py").write_text("FAIL = True\n\ndef test_flaky():\n    assert not FAIL\n")
+    
+    check = PytestCheck()
+    check.settings = {"workers": 0}
+    check.context = {"root": tmp_path, "git_dir": tmp_path / "git"}
+    assert check.run([]).result == CheckResult.FAIL
+    
+    # test_b failed last time, so it runs first and the budget cuts test_a
+    (tmp_path / "test_b.py").write_text("FAIL = False\n\ndef test_flaky():\n    assert not FAIL\n")
+    check.settings = {"workers": 0, "time_budget": 0.001}
+    output = check.run([])
+    
+    assert output.result == CheckResult.WARN
+    assert output.details == ["Not run: test_a.py::test_slow"]
+
+def test_pytest_has_plugin_notices_installs(tmp_path, monkeypatch):
+    import os
+    import sys
+    import venv
+    from monitor_everything.checks import pytest_has_plugin
+    
+    if sys.platform == "win32":
+        pytest.skip("venv layout differs on Windows")
+    venv.create(tmp_path / "venv", symlinks=True)
+    bin_dir = tmp_path / "venv" / "bin"
+    script = bin_dir / "pytest"
+    script.write_text(f"#!{bin_dir / 'python'}\n")
+    script.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    
+    assert not pytest_has_plugin("me_fake_plugin")
+    site_packages = next((tmp_path / "venv" / "lib").glob("python*/site-packages"))
+    (site_packages / "me_fake_plugin.py").write_text("")
+    assert pytest_has_plugin("me_fake_plugin")
+    (site_packages / "me_fake_plugin.py").unlink()
+    assert not pytest_has_plugin("me_fake_plugin")
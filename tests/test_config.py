@@ -46,3 +46,81 @@ def test_config_merge(tmp_path, monkeypatch):
     config = Config()
     assert config.get("checks.linting") == True
     assert config.get("checks.formatting") == True
+
+def test_config_set_does_not_touch_defaults():
+    config = Config()
+    config.set("settings.tests.selection", "impact")
+    config.data["checks"]["linting"] = True
+    
+    assert DEFAULT_CONFIG["settings"]["tests"]["selection"] == "full"
+    assert DEFAULT_CONFIG["checks"]["linting"] == False
+    assert Config().get("settings.tests.selection") == "full"
+
+def test_config_found_from_subdirectory(tmp_path, monkeypatch):
+    import subprocess
+    
+    monkeypatch.setattr("monitor_everything.config.GLOBAL_CONFIG_PATH", tmp_path / "global" / ".merc")
+    monkeypatch.setattr("monitor_everything.config.CONFIG_CACHE_DIR", tmp_path / "cache")
+    subprocess.run(["git", "init"], cwd=tmp_path, capture_output=True)
+    (tmp_path / ".merc").write_text(json.dumps({"checks": {"security": True}}))
+    (tmp_path / "src" / "pkg").mkdir(parents=True)
+    monkeypatch.chdir(tmp_path / "src" / "pkg")
+    
+    assert Config().get("checks.security") == True
+
+def test_config_compiled_cache_follows_changes(tmp_path, monkeypatch):
+    local_path = tmp_path / ".merc"
+    monkeypatch.setattr("monitor_everything.config.LOCAL_CONFIG_PATH", local_path)
+    monkeypatch.setattr("monitor_everything.config.GLOBAL_CONFIG_PATH", tmp_path / "global" / ".merc")
+    monkeypatch.setattr("monitor_everything.config.CONFIG_CACHE_DIR", tmp_path / "cache")
+    
+    local_path.write_text(json.dumps({"execution": {"max_workers": 2}}))
+    assert Config().get("execution.max_workers") == 2
+    assert len(list((tmp_path / "cache").glob("config-*.json"))) == 1
+    
+    local_path.write_text(json.dumps({"execution": {"max_workers": 16}}))
+    assert Config().get("execution.max_workers") == 16
+
+def test_config_validation(tmp_path, monkeypatch):
+    import pytest
+    from monitor_everything.config import ConfigError
+    
+    local_path = tmp_path / ".merc"
+    monkeypatch.setattr("monitor_everything.config.LOCAL_CONFIG_PATH", local_path)
+    monkeypatch.setattr("monitor_everything.config.GLOBAL_CONFIG_PATH", tmp_path / "global" / ".merc")
+    monkeypatch.setattr("monitor_everything.config.CONFIG_CACHE_DIR", tmp_path / "cache")
+    
+    local_path.write_text(json.dumps({"behavior": {"tests": "sometimes"}, "execution": {"max_workers": "4"}}))
+    with pytest.raises(ConfigError) as error:
+        Config()
+    assert "behavior.tests must be one of" in str(error.value)
+    assert "execution.max_workers must be a positive integer" in str(error.value)
+    
+    # Unvalidated loading still works, so `me config set` can repair it
+    assert Config(validate_config=False).get("execution.max_workers") == "4"
+
+def test_validate_checks_limits_of_every_check():
+    import pytest
+    from monitor_everything.config import ConfigError, validate
+    
+    validate({"settings": {"tests": {"timeout": 120}, "custom": {"memory_mb": 512, "other": "x"}}})
+    with pytest.raises(ConfigError) as error:
+        validate({"settings": {"custom": {"cpu_seconds": -1}, "tests": {"timeout": "1m"}}})
+    assert "settings.custom.cpu_seconds must be a number of seconds or null" in str(error.value)
+    assert "settings.tests.timeout must be a number of seconds or null" in str(error.value)
+    
+    with pytest.raises(ConfigError) as error:
+        validate({"settings": {"tests": 5}})
+    assert str(error.value).count("settings.tests must be an object") == 1
+
+def test_compiled_config_cache_is_bounded(tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setattr("monitor_everything.config.CONFIG_CACHE_DIR", cache_dir)
+    monkeypatch.setattr("monitor_everything.config.CONFIG_CACHE_MAX_ENTRIES", 3)
+    
+    for i in range(5):
+        repo = tmp_path / f"repo{i}"
+        repo.mkdir()
+        Config(root=repo)
+    
+    assert len(list(cache_dir.glob("config-*.json"))) == 3
@@ -78,3 +78,17 @@ def test_config_remove_protected_not_found(tmp_path, monkeypatch):
     
     assert result.exit_code == 1
     assert "not in protected branches" in result.output
+
+def test_config_set_rejects_invalid_value(tmp_path, monkeypatch):
+    monkeypatch.setattr("monitor_everything.config.LOCAL_CONFIG_PATH", tmp_path / ".merc")
+    monkeypatch.setattr("monitor_everything.config.GLOBAL_CONFIG_PATH", tmp_path / "global" / ".merc")
+    
+    runner = CliRunner()
+    result = runner.invoke(cli, ['config', 'set', 'execution.max_workers', 'many'])
+    assert result.exit_code == 1
+    assert "execution.max_workers must be a positive integer" in result.output
+    
+    result = runner.invoke(cli, ['config', 'set', 'execution.max_workers', '8'])
+    assert result.exit_code == 0
+    with open(tmp_path / ".merc") as f:
+        assert json.load(f)["execution"]["max_workers"] == 8
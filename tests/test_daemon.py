@@ -0,0 +1,172 @@
+import json
+import socket
+import subprocess
+import threading
+from monitor_everything.checks import CheckResult
+from monitor_everything.config import Config
+from monitor_everything.daemon import CheckDaemon, WarmTools, _is_ours, run_checks, ping, socket_path
+from monitor_everything.git_utils import get_repo_state
+
+def make_repo(tmp_path):
+    subprocess.run(["git", "init"], cwd=tmp_path, capture_output=True)
+    subprocess.run(["git", "checkout", "-b", "feature/daemon"], cwd=tmp_path, capture_output=True)
+    (tmp_path / "app.py").write_text("token = 'abcdefghijklmnopqrstuvwxyz'\n")
+    subprocess.run(["git", "add", "app.py"], cwd=tmp_path, capture_output=True)
+    return get_repo_state(tmp_path)
+
+def start_daemon(state):
+    daemon = CheckDaemon(state.common_dir, idle_timeout=0)
+    thread = threading.Thread(target=daemon.serve, daemon=True)
+    thread.start()
+    for _ in range(200):
+        if ping(state.common_dir):
+            break
+        thread.join(0.01)
+    return daemon, thread
+
+def test_socket_path_falls_back_for_long_paths(tmp_path):
+    assert socket_path(tmp_path) == tmp_path / "me" / "daemon.sock"
+    
+    deep = tmp_path / ("x" * 120)
+    path = socket_path(deep)
+    assert len(str(path)) < 108
+    assert path.parent.name.startswith("me-daemon-")
+
+def test_run_checks_without_daemon(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    state = make_repo(tmp_path)
+    
+    assert ping(state.common_dir) is None
+    assert run_checks(state, Config().data) is None
+
+def test_daemon_runs_checks(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    state = make_repo(tmp_path)
+    config_data = dict(Config().data)
+    config_data["checks"] = dict(config_data["checks"], security=True)
+    
+    daemon, thread = start_daemon(state)
+    try:
+        results = run_checks(state, config_data)
+    finally:
+        daemon.stop()
+        thread.join(5)
+    
+    assert results["branch"] == "feature/daemon"
+    assert results["files"] == ["app.py"]
+    by_type = {c["type"]: c for c in results["checks"]}
+    assert by_type["security"]["result"] == CheckResult.FAIL
+    assert by_type["security"]["details"] == ["app.py:1: Possible Token detected"]
+    assert by_type["branch_awareness"]["result"] == CheckResult.PASS
+    
+    assert not thread.is_alive()
+    assert not socket_path(state.common_dir).exists()
+
+def test_daemon_socket_is_private(tmp_path, monkeypatch):
+    import os
+    import stat
+    
+    monkeypatch.chdir(tmp_path)
+    state = make_repo(tmp_path)
+    path = socket_path(state.common_dir)
+    
+    daemon, thread = start_daemon(state)
+    try:
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+        assert stat.S_IMODE(os.stat(path.parent).st_mode) == 0o700
+    finally:
+        daemon.stop()
+        thread.join(5)
+    
+    # Whatever else sits at the path is not asked to run checks
+    path.write_text("")
+    assert ping(state.common_dir) is None
+    if os.getuid() == 0:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as impostor:
+            path.unlink()
+            impostor.bind(str(path))
+            impostor.listen(1)
+            assert _is_ours(path)
+            os.chown(path, 12345, 12345)
+            assert not _is_ours(path)
+
+def test_daemon_refuses_other_versions(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    state = make_repo(tmp_path)
+    
+    daemon, thread = start_daemon(state)
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(str(socket_path(state.common_dir)))
+            message = {"op": "check", "version": "0.0.0/0", "root": str(tmp_path), "config": {}}
+            sock.sendall(json.dumps(message).encode() + b"\n")
+            response = json.loads(sock.makefile("rb").readline())
+    finally:
+        daemon.stop()
+        thread.join(5)
+    
+    assert response["ok"] == False
+    assert "version" in response["error"]
+
+def test_warm_pytest_runs_in_fresh_child(tmp_path):
+    (tmp_path / "test_sample.py").write_text("def test_ok():\n    assert True\n")
+    
+    tools = WarmTools(tmp_path / ".git")
+    result = tools.pytest(["-v", "test_sample.py"], cwd=tmp_path)
+    
+    assert result.returncode == 0
+    assert "1 passed" in result.stdout
+
+def test_daemon_checks_the_clients_index(tmp_path, monkeypatch):
+    import os
+    from monitor_everything.daemon import _version
+    
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("GIT_INDEX_FILE", raising=False)
+    state = make_repo(tmp_path)
+    (tmp_path / "clean.py").write_text("x = 1\n")
+    # What `git commit -a` does: the hook sees a temporary index
+    index = str(tmp_path / ".git" / "next-index")
+    env = dict(os.environ, GIT_INDEX_FILE=index)
+    subprocess.run(["git", "add", "clean.py"], cwd=tmp_path, env=env, capture_output=True)
+    config_data = dict(Config().data)
+    config_data["checks"] = {"security": True}
+    
+    daemon = CheckDaemon(state.common_dir, idle_timeout=0)
+    response = daemon._dispatch({"op": "check", "version": _version(), "root": str(tmp_path),
+                                 "config": config_data, "env": {"GIT_INDEX_FILE": index}})
+    
+    assert response["results"]["files"] == ["clean.py"]
+    assert "GIT_INDEX_FILE" not in os.environ
+
+def test_run_checks_gives_up_on_a_silent_daemon(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    state = make_repo(tmp_path)
+    path = socket_path(state.common_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+        server.bind(str(path))
+        server.listen(1)
+        assert run_checks(state, Config().data, timeout=0.2) is None
+
+def test_warm_mypy_stops_when_the_check_is_cancelled(tmp_path):
+    import shutil
+    import pytest
+    from monitor_everything.checks import MypyCheck
+    from monitor_everything.executor import CheckCancelled
+    
+    if not shutil.which("dmypy"):
+        pytest.skip("dmypy not installed")
+    (tmp_path / "a.py").write_text("x: int = 1\n")
+    tools = WarmTools(tmp_path / ".git")
+    check = MypyCheck()
+    check.context = {"root": tmp_path, "tools": tools}
+    check.cancel = threading.Event()
+    check.cancel.set()
+    
+    try:
+        with pytest.raises(CheckCancelled):
+            check.run(["a.py"])
+    finally:
+        tools.close()
@@ -0,0 +1,81 @@
+import json
+from monitor_everything.diagnostics import (
+    Diagnostic,
+    parse_black,
+    parse_mypy,
+    parse_pytest_report,
+    parse_ruff
+)
+
+def test_diagnostic_str():
+    assert str(Diagnostic("a.py", 3, 5, "F401", message="`os` imported but unused")) == \
+        "a.py:3:5: `os` imported but unused [F401]"
+    assert str(Diagnostic("a.py", 3, severity="note", message="See docs")) == "a.py:3: note: See docs"
+    assert str(Diagnostic("big.bin", message="Large file")) == "big.bin: Large file"
+
+def test_diagnostic_round_trips():
+    diagnostic = Diagnostic("a.py", 1, 2, "E1", "warning", "msg")
+    assert Diagnostic.from_dict(diagnostic.to_dict()) == diagnostic
+    assert Diagnostic.from_tuple(json.loads(json.dumps(diagnostic.to_tuple()))) == diagnostic
+    assert "code" not in Diagnostic("a.py").to_dict()
+
+def test_parse_ruff(tmp_path):
+    record = {
+        "filename": str(tmp_path / "pkg" / "a.py"),
+        "location": {"row": 1, "column": 8},
+        "code": "F401",
+        "message": "`os` imported but unused"
+    }
+    text = json.dumps(record) + "\nwarning: something else\n"
+    
+    diagnostics, other = parse_ruff(text, tmp_path)
+    
+    assert diagnostics == [Diagnostic("pkg/a.py", 1, 8, "F401", "error", "`os` imported but unused")]
+    assert other == ["warning: something else"]
+
+def test_parse_mypy():
+    record = {
+        "file": "a.py",
+        "line": 2,
+        "column": 4,
+        "message": "Incompatible types",
+        "hint": "Consider using Sequence",
+        "code": "assignment",
+        "severity": "error"
+    }
+    
+    diagnostics, other = parse_mypy(json.dumps(record) + "\nFound 1 error in 1 file\n")
+    
+    assert diagnostics[0] == Diagnostic("a.py", 2, 5, "assignment", "error", "Incompatible types")
+    assert diagnostics[1].severity == "note"
+    assert diagnostics[1].message == "Consider using Sequence"
+    assert other == ["Found 1 error in 1 file"]
+
+def test_parse_black():
+    text = (
+        "would reformat a.py\n"
+        "error: cannot format b.py: Cannot parse: 1:4: def (\n"
+        "Oh no! 💥 💔 💥\n"
+    )
+    
+    diagnostics, other = parse_black(text)
+    
+    assert [(d.path, d.code) for d in diagnostics] == [("a.py", "format"), ("b.py", "parse-error")]
+    assert diagnostics[1].message == "Cannot parse: 1:4: def ("
+    assert len(other) == 1
+
+def test_parse_pytest_report(tmp_path):
+    record = {
+        "path": "tests/test_a.py",
+        "line": 9,
+        "test": "tests/test_a.py::test_one",
+        "outcome": "failed",
+        "message": "assert 1 == 2",
+        "rootdir": str(tmp_path)
+    }
+    
+    diagnostics = parse_pytest_report(json.dumps(record) + "\n", tmp_path)
+    
+    assert diagnostics == [Diagnostic(
+        "tests/test_a.py", 10, None, "failed", "error", "tests/test_a.py::test_one: assert 1 == 2"
+    )]
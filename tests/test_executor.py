@@ -0,0 +1,111 @@
+import os
+import sys
+import threading
+import time
+import pytest
+from monitor_everything.executor import CheckCancelled, run_streaming
+
+def test_run_streaming_reports_lines(tmp_path):
+    seen = []
+    script = "import sys; print('one'); print('two', file=sys.stderr); print('three'); sys.exit(3)"
+    
+    result = run_streaming([sys.executable, "-c", script], cwd=tmp_path, on_line=seen.append)
+    
+    assert result.returncode == 3
+    assert result.stdout == "one\nthree\n"
+    assert result.stderr == "two\n"
+    assert sorted(seen) == ["one", "three", "two"]
+
+def test_run_streaming_cancel_stops_tool():
+    cancel = threading.Event()
+    threading.Timer(0.2, cancel.set).start()
+    
+    start = time.monotonic()
+    with pytest.raises(CheckCancelled):
+        run_streaming([sys.executable, "-c", "import time; time.sleep(30)"], cancel=cancel)
+    assert time.monotonic() - start < 10
+
+def test_run_streaming_stops_tool_on_keyboard_interrupt(tmp_path):
+    started = tmp_path / "started"
+    
+    class Interrupt:
+        # Ctrl-C arriving while the tool runs
+        def is_set(self):
+            if started.exists() and started.read_text():
+                raise KeyboardInterrupt
+            return False
+        
+        def wait(self, timeout):
+            time.sleep(timeout)
+    
+    script = f"import os, pathlib, time; pathlib.Path({str(started)!r}).write_text(str(os.getpid())); time.sleep(30)"
+    start = time.monotonic()
+    with pytest.raises(KeyboardInterrupt):
+        run_streaming([sys.executable, "-c", script], cancel=Interrupt())
+    assert time.monotonic() - start < 10
+    # The tool was stopped and reaped
+    with pytest.raises(ProcessLookupError):
+        os.kill(int(started.read_text()), 0)
+
+@pytest.mark.skipif(sys.platform == "win32", reason="rlimits are POSIX only")
+def test_run_streaming_applies_memory_limit():
+    script = "import resource; print(resource.getrlimit(resource.RLIMIT_AS)[0])"
+    
+    result = run_streaming([sys.executable, "-c", script], limits={"memory_mb": 512})
+    
+    assert int(result.stdout) == 512 * 1024 * 1024
+
+@pytest.mark.skipif(sys.platform == "win32", reason="rlimits are POSIX only")
+def test_run_streaming_limits_keep_tool_errors():
+    from monitor_everything.executor import LimitExceeded
+    
+    with pytest.raises(FileNotFoundError):
+        run_streaming(["me-no-such-tool"], limits={"cpu_seconds": 5})
+    
+    # The shim execs the tool: its exit status and signals are the tool's own
+    result = run_streaming([sys.executable, "-c", "import sys; sys.exit(3)"], limits={"cpu_seconds": 5})
+    assert result.returncode == 3
+    with pytest.raises(LimitExceeded):
+        run_streaming([sys.executable, "-c", "while True: pass"], limits={"cpu_seconds": 1})
+
+def test_chunk_arguments_respects_budget():
+    from monitor_everything.executor import chunk_arguments, _arg_size
+    
+    files = [f"pkg/module_{i:04d}.py" for i in range(1000)]
+    budget = 2000
+    chunks = chunk_arguments(["ruff", "check"], files, budget)
+    
+    assert len(chunks) > 1
+    assert [f for chunk in chunks for f in chunk] == files
+    for chunk in chunks:
+        assert sum(_arg_size(arg) for arg in ["ruff", "check"] + chunk) <= budget
+    
+    assert chunk_arguments(["ruff"], ["a.py"], budget) == [["a.py"]]
+    assert chunk_arguments(["ruff"], [], budget) == []
+
+def test_merge_results_prefers_errors_over_issues():
+    import subprocess
+    from monitor_everything.executor import merge_results
+    
+    results = [
+        subprocess.CompletedProcess(["t"], 1, "a.py:1: bad\nFound 1 error\n", ""),
+        subprocess.CompletedProcess(["t"], 0, "", ""),
+        subprocess.CompletedProcess(["t"], 1, "b.py:2: bad\nFound 1 error\n", "")
+    ]
+    merged = merge_results(["t"], results)
+    assert merged.returncode == 1
+    assert merged.stdout == "a.py:1: bad\nFound 1 error\nb.py:2: bad\n"
+    
+    results.append(subprocess.CompletedProcess(["t"], 2, "", "crash\n"))
+    assert merge_results(["t"], results).returncode == 2
+
+def test_merge_results_keeps_repeats_within_a_chunk():
+    import subprocess
+    from monitor_everything.executor import merge_results
+    
+    # Two identical diagnostics from one run, then a shared one again
+    results = [
+        subprocess.CompletedProcess(["t"], 1, "a.py:1: bad\na.py:1: bad\nshared.py:3: bad\n", ""),
+        subprocess.CompletedProcess(["t"], 1, "shared.py:3: bad\nb.py:2: bad\n", "")
+    ]
+    assert merge_results(["t"], results).stdout == "a.py:1: bad\na.py:1: bad\nshared.py:3: bad\nb.py:2: bad\n"
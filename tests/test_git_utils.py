@@ -52,3 +52,115 @@ def test_get_git_root(tmp_path, monkeypatch):
     
     root = get_git_root()
     assert root == tmp_path
+
+def test_iter_staged_hunks(tmp_path, monkeypatch):
+    from monitor_everything.git_utils import iter_staged_hunks
+    
+    monkeypatch.chdir(tmp_path)
+    subprocess.run(["git", "init"], cwd=tmp_path, capture_output=True)
+    subprocess.run(["git", "config", "user.email", "test@test.com"], cwd=tmp_path, capture_output=True)
+    subprocess.run(["git", "config", "user.name", "Test"], cwd=tmp_path, capture_output=True)
+    
+    test_file = tmp_path / "app.py"
+    test_file.write_text("a = 1\nb = 2\nc = 3\n")
+    subprocess.run(["git", "add", "app.py"], cwd=tmp_path, capture_output=True)
+    subprocess.run(["git", "commit", "-m", "init"], cwd=tmp_path, capture_output=True)
+    
+    test_file.write_text("a = 1\nb = 20\nc = 3\nd = 4\n")
+    subprocess.run(["git", "add", "app.py"], cwd=tmp_path, capture_output=True)
+    test_file.write_text("unstaged = True\n")
+    
+    hunks = list(iter_staged_hunks())
+    assert hunks == [("app.py", 2, ["b = 20"]), ("app.py", 4, ["d = 4"])]
+
+def test_iter_staged_hunks_paths(tmp_path, monkeypatch):
+    from monitor_everything.git_utils import iter_staged_hunks
+    
+    monkeypatch.chdir(tmp_path)
+    subprocess.run(["git", "init"], cwd=tmp_path, capture_output=True)
+    names = ["a b.py", "t\tb.py", 'q"uote.py', "ü.py", "other.py"]
+    for name in names:
+        (tmp_path / name).write_text(f"# {name}\n")
+    # The staged bytes are scanned, not what a textconv driver makes of them
+    (tmp_path / ".gitattributes").write_text("*.py diff=hide\n")
+    subprocess.run(["git", "config", "diff.hide.textconv", "echo"], cwd=tmp_path, capture_output=True)
+    subprocess.run(["git", "add", "."], cwd=tmp_path, capture_output=True)
+    
+    hunks = list(iter_staged_hunks(names[:4]))
+    assert sorted(hunks) == sorted((name, 1, [f"# {name}"]) for name in names[:4])
+    assert list(iter_staged_hunks([])) == []
+
+def test_get_staged_sizes(tmp_path, monkeypatch):
+    from monitor_everything.git_utils import get_staged_sizes
+    
+    monkeypatch.chdir(tmp_path)
+    subprocess.run(["git", "init"], cwd=tmp_path, capture_output=True)
+    
+    (tmp_path / "data.bin").write_bytes(b"x" * 1234)
+    subprocess.run(["git", "add", "data.bin"], cwd=tmp_path, capture_output=True)
+    
+    assert get_staged_sizes(["data.bin", "missing.txt"]) == {"data.bin": 1234}
+
+def test_get_repo_state(tmp_path, monkeypatch):
+    from monitor_everything.git_utils import get_repo_state, get_unstaged_files
+    
+    monkeypatch.chdir(tmp_path)
+    subprocess.run(["git", "init"], cwd=tmp_path, capture_output=True)
+    subprocess.run(["git", "config", "user.email", "test@test.com"], cwd=tmp_path, capture_output=True)
+    subprocess.run(["git", "config", "user.name", "Test"], cwd=tmp_path, capture_output=True)
+    subprocess.run(["git", "checkout", "-b", "main"], cwd=tmp_path, capture_output=True)
+    
+    (tmp_path / "old.txt").write_text("old")
+    (tmp_path / "keep.txt").write_text("keep")
+    subprocess.run(["git", "add", "."], cwd=tmp_path, capture_output=True)
+    subprocess.run(["git", "commit", "-m", "init"], cwd=tmp_path, capture_output=True)
+    
+    (tmp_path / "new.py").write_text("x = 1\n")
+    (tmp_path / "keep.txt").write_text("changed")
+    subprocess.run(["git", "add", "new.py", "keep.txt"], cwd=tmp_path, capture_output=True)
+    subprocess.run(["git", "rm", "-q", "old.txt"], cwd=tmp_path, capture_output=True)
+    (tmp_path / "keep.txt").write_text("changed again")
+    
+    subdir = tmp_path / "subdir"
+    subdir.mkdir()
+    monkeypatch.chdir(subdir)
+    
+    state = get_repo_state()
+    head = subprocess.run(["git", "rev-parse", "HEAD"], cwd=tmp_path,
+                          capture_output=True, text=True).stdout.strip()
+    new_sha = subprocess.run(["git", "rev-parse", ":new.py"], cwd=tmp_path,
+                             capture_output=True, text=True).stdout.strip()
+    
+    assert state.root == tmp_path
+    assert state.common_dir == tmp_path / ".git"
+    assert state.branch == "main"
+    assert state.head == head
+    assert state.files == ["keep.txt", "new.py", "old.txt"]
+    
+    entries = {entry.path: entry for entry in state.staged}
+    assert entries["new.py"].status == "A"
+    assert entries["new.py"].mode == "100644"
+    assert entries["new.py"].sha == new_sha
+    assert entries["keep.txt"].status == "M"
+    assert entries["old.txt"].status == "D"
+    assert get_unstaged_files(["keep.txt", "new.py"], cwd=tmp_path) == {"keep.txt"}
+
+def test_get_repo_state_unborn_branch(tmp_path, monkeypatch):
+    from monitor_everything.git_utils import get_repo_state
+    
+    monkeypatch.chdir(tmp_path)
+    assert get_repo_state() is None
+    
+    subprocess.run(["git", "init"], cwd=tmp_path, capture_output=True)
+    subprocess.run(["git", "checkout", "-b", "feature/x"], cwd=tmp_path, capture_output=True)
+    
+    state = get_repo_state()
+    assert state.branch == "feature/x"
+    assert state.head is None
+    assert state.files == []
+    
+    (tmp_path / "a.py").write_text("x = 1\n")
+    subprocess.run(["git", "add", "a.py"], cwd=tmp_path, capture_output=True)
+    state = get_repo_state()
+    assert [(e.path, e.status) for e in state.staged] == [("a.py", "A")]
+    assert state.staged[0].sha != "0" * 40
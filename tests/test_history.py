@@ -0,0 +1,64 @@
+from monitor_everything.checks import CheckResult
+from monitor_everything.history import append_run, load_runs, percentile, summarize
+
+def make_results(wall, cache="miss", result=CheckResult.PASS):
+    return {
+        "branch": "main",
+        "files": ["a.py"],
+        "checks": [{
+            "type": "linting",
+            "result": result,
+            "stats": {"wall": wall, "cpu": wall / 2, "files": 1, "cache": cache, "max_rss": 2048}
+        }]
+    }
+
+def test_append_and_load_runs(tmp_path):
+    path = tmp_path / "me" / "history.jsonl"
+    append_run(path, make_results(0.5))
+    append_run(path, make_results(1.5, result=CheckResult.FAIL))
+    
+    runs = load_runs(path)
+    assert len(runs) == 2
+    assert runs[1]["checks"]["linting"]["wall"] == 1.5
+    assert runs[1]["checks"]["linting"]["result"] == "fail"
+    assert load_runs(path, limit=1) == runs[1:]
+
+def test_append_run_trims_log(tmp_path):
+    path = tmp_path / "history.jsonl"
+    for i in range(100):
+        append_run(path, make_results(float(i)), max_entries=2)
+    
+    runs = load_runs(path)
+    assert 2 <= len(runs) < 20
+    assert runs[-1]["checks"]["linting"]["wall"] == 99.0
+
+def test_load_runs_skips_torn_lines(tmp_path):
+    path = tmp_path / "history.jsonl"
+    append_run(path, make_results(0.5))
+    with open(path, "a") as f:
+        f.write('{"t": 1, "checks"')
+    
+    assert len(load_runs(path)) == 1
+    assert load_runs(tmp_path / "missing.jsonl") == []
+
+def test_percentile():
+    values = [float(v) for v in range(1, 11)]
+    assert percentile(values, 50) == 5.0
+    assert percentile(values, 90) == 9.0
+    assert percentile(values, 99) == 10.0
+    assert percentile([3.0], 50) == 3.0
+
+def test_summarize():
+    runs = [
+        {"checks": {"linting": {"wall": 1.0, "cpu": 0.5, "cache": "hit", "max_rss": 100, "result": "pass"}}},
+        {"checks": {"linting": {"wall": 3.0, "cpu": 1.5, "cache": "miss", "max_rss": 300, "result": "fail"}}},
+        {"checks": {"tests": {"wall": 9.0, "cpu": 8.0, "cache": None, "max_rss": None, "result": "pass"}}}
+    ]
+    
+    summary = summarize(runs)
+    assert summary["linting"]["runs"] == 2
+    assert summary["linting"]["max"] == 3.0
+    assert summary["linting"]["hit_rate"] == 0.5
+    assert summary["linting"]["max_rss"] == 300
+    assert summary["linting"]["failures"] == 1
+    assert summary["tests"]["hit_rate"] is None
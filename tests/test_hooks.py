@@ -117,3 +117,25 @@ def test_uninstall_alias_not_found(tmp_path, monkeypatch):
     success, message = uninstall_alias(global_alias=False)
     assert success == False
     assert "No 'gc' alias found" in message
+
+def test_install_hook_runs_checks_in_process(tmp_path, monkeypatch):
+    import os
+    import sys
+    
+    monkeypatch.chdir(tmp_path)
+    subprocess.run(["git", "init"], cwd=tmp_path, capture_output=True)
+    subprocess.run(["git", "checkout", "-b", "feature/hook"], cwd=tmp_path, capture_output=True)
+    
+    install_hook()
+    hook_path = tmp_path / ".git" / "hooks" / "pre-commit"
+    content = hook_path.read_text()
+    assert content.startswith(f"#!{sys.executable}")
+    assert "monitor_everything.precommit" in content
+    
+    package_root = Path(__file__).resolve().parent.parent
+    env = dict(os.environ, PYTHONPATH=str(package_root), HOME=str(tmp_path))
+    result = subprocess.run([str(hook_path)], cwd=tmp_path, env=env,
+                            capture_output=True, text=True)
+    
+    assert result.returncode == 0
+    assert "feature/hook" in result.stdout
@@ -0,0 +1,79 @@
+import subprocess
+from monitor_everything.impact import ImportMap, module_name, parse_imports, select_tests
+
+def make_project(tmp_path):
+    subprocess.run(["git", "init"], cwd=tmp_path, capture_output=True)
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "tests").mkdir()
+    (tmp_path / "pkg" / "__init__.py").write_text("")
+    (tmp_path / "pkg" / "a.py").write_text("VALUE = 1\n")
+    (tmp_path / "pkg" / "b.py").write_text("from .a import VALUE\n")
+    (tmp_path / "pkg" / "c.py").write_text("X = 2\n")
+    (tmp_path / "tests" / "test_b.py").write_text("def test_b():\n    from pkg.b import VALUE\n")
+    (tmp_path / "tests" / "test_c.py").write_text("import pkg.c\n")
+    subprocess.run(["git", "add", "."], cwd=tmp_path, capture_output=True)
+
+def test_module_name():
+    packages = {"pkg", "pkg/sub"}
+    assert module_name("pkg/mod.py", packages) == "pkg.mod"
+    assert module_name("pkg/sub/__init__.py", packages) == "pkg.sub"
+    assert module_name("tests/test_x.py", packages) == "test_x"
+    assert module_name("setup.py", packages) == "setup"
+
+def test_parse_imports_resolves_relative():
+    source = b"import os\nfrom . import a\nfrom ..util import helper\n"
+    imports = parse_imports(source, "pkg.sub.mod", is_package=False)
+    
+    assert "os" in imports
+    assert "pkg.sub.a" in imports
+    assert "pkg.util.helper" in imports
+
+def test_import_map_affected_tests(tmp_path):
+    make_project(tmp_path)
+    
+    import_map = ImportMap(tmp_path / "map.json")
+    assert import_map.update(tmp_path)
+    
+    assert import_map.affected_tests(["pkg/a.py"]) == ["tests/test_b.py"]
+    assert import_map.affected_tests(["pkg/c.py"]) == ["tests/test_c.py"]
+    assert import_map.affected_tests(["tests/test_c.py"]) == ["tests/test_c.py"]
+
+def test_import_map_parent_packages_are_imported(tmp_path):
+    make_project(tmp_path)
+    
+    import_map = ImportMap(tmp_path / "map.json")
+    assert import_map.update(tmp_path)
+    
+    # Both tests import a pkg submodule, which runs pkg/__init__.py first
+    assert parse_imports(b"import pkg.sub.mod\n", "x", False) == ["pkg", "pkg.sub", "pkg.sub.mod"]
+    assert import_map.affected_tests(["pkg/__init__.py"]) == ["tests/test_b.py", "tests/test_c.py"]
+
+def test_import_map_full_suite_triggers(tmp_path):
+    make_project(tmp_path)
+    
+    import_map = ImportMap(tmp_path / "map.json")
+    import_map.update(tmp_path)
+    
+    assert import_map.affected_tests(["tests/conftest.py"]) is None
+    assert import_map.affected_tests(["pkg/unknown.py"]) is None
+    # Fixtures and config files are read by tests without importing them
+    assert import_map.affected_tests(["pkg/a.py", "tests/data/expected.json"]) is None
+    assert import_map.affected_tests(["pyproject.toml"]) is None
+
+def test_select_tests_falls_back_until_map_exists(tmp_path):
+    make_project(tmp_path)
+    git_dir = tmp_path / ".git"
+    
+    assert select_tests(tmp_path, git_dir, ["pkg/a.py"]) is None
+    assert (git_dir / "me" / "import_map.json").exists()
+    assert select_tests(tmp_path, git_dir, ["pkg/a.py"]) == ["tests/test_b.py"]
+
+def test_select_tests_picks_up_staged_changes(tmp_path):
+    make_project(tmp_path)
+    git_dir = tmp_path / ".git"
+    select_tests(tmp_path, git_dir, [])
+    
+    (tmp_path / "pkg" / "c.py").write_text("from pkg.a import VALUE\n")
+    subprocess.run(["git", "add", "pkg/c.py"], cwd=tmp_path, capture_output=True)
+    
+    assert select_tests(tmp_path, git_dir, ["pkg/a.py"]) == ["tests/test_b.py", "tests/test_c.py"]
@@ -0,0 +1,103 @@
+import re
+import subprocess
+from monitor_everything.config import Config
+from monitor_everything.paths import CheckScope, PathMatcher, glob_to_regex
+from monitor_everything.runner import CheckRunner
+
+def _matches(pattern, path):
+    return re.fullmatch(glob_to_regex(pattern), path) is not None
+
+def test_glob_without_slash_matches_at_any_depth():
+    assert _matches("*.py", "a.py")
+    assert _matches("*.py", "pkg/sub/a.py")
+    assert not _matches("*.py", "a.pyc")
+
+def test_glob_with_slash_is_anchored_to_root():
+    assert _matches("docs/*.md", "docs/index.md")
+    assert not _matches("docs/*.md", "sub/docs/index.md")
+    assert not _matches("docs/*.md", "docs/api/index.md")
+    assert _matches("/setup.py", "setup.py")
+
+def test_glob_double_star_and_directories():
+    assert _matches("src/**/*.py", "src/a.py")
+    assert _matches("src/**/*.py", "src/pkg/sub/a.py")
+    assert _matches("vendor/", "vendor/lib/x.js")
+    assert _matches("build/**", "build/out/a.o")
+    assert not _matches("vendor/", "src/vendor.py")
+    assert _matches("migrations/", "app/migrations/0001.py")
+    assert _matches("migrations/", "migrations/0001.py")
+    assert not _matches("app/migrations/", "other/app/migrations/0001.py")
+    assert CheckScope({"exclude": ["migrations/"]}).partition(["linting"], ["app/migrations/0001.py"]) == {"linting": []}
+
+def test_glob_character_classes():
+    assert _matches("test_?.py", "test_a.py")
+    assert not _matches("test_?.py", "test_ab.py")
+    assert _matches("[!_]*.py", "a.py")
+    assert not _matches("[!_]*.py", "_a.py")
+
+def test_path_matcher_reports_every_matching_pattern():
+    matcher = PathMatcher(["*.py", "tests/", "*.md", "*.py"])
+    
+    assert matcher.bits == {"*.py": 1, "tests/": 2, "*.md": 4}
+    assert matcher.match("tests/test_a.py") == matcher.mask("*.py", "tests/")
+    assert matcher.match("README.md") == matcher.mask("*.md")
+    assert matcher.match("setup.cfg") == 0
+    assert PathMatcher([]).match("a.py") == 0
+
+def test_check_scope_without_paths_config_passes_files_through():
+    scope = CheckScope({})
+    
+    assert scope.partition(["linting", "tests"], ["a.py", "b.py"], {"tests": False}) == {
+        "linting": ["a.py", "b.py"],
+        "tests": []
+    }
+
+def test_check_scope_include_and_exclude():
+    scope = CheckScope({
+        "exclude": ["vendor/"],
+        "checks": {
+            "type_checking": {"include": ["src/"], "exclude": ["src/generated/"]},
+            "security": {"exclude": ["*_test.py"]}
+        }
+    })
+    files = ["src/a.py", "src/generated/pb.py", "vendor/x.py", "scripts/s_test.py"]
+    
+    result = scope.partition(["type_checking", "security", "linting"], files)
+    
+    assert result["type_checking"] == ["src/a.py"]
+    assert result["security"] == ["src/a.py", "src/generated/pb.py"]
+    assert result["linting"] == ["src/a.py", "src/generated/pb.py", "scripts/s_test.py"]
+
+def test_check_scope_deepest_override_wins():
+    scope = CheckScope({
+        "overrides": {
+            "legacy": {"type_checking": False},
+            "legacy/new/": {"type_checking": True},
+            "experiments/": {"tests": True}
+        }
+    })
+    files = ["app.py", "legacy/old.py", "legacy/new/mod.py", "experiments/e.py", "lib/legacy/x.py"]
+    
+    assert scope.enabled_below("tests")
+    assert not scope.enabled_below("linting")
+    result = scope.partition(["type_checking", "tests"], files, {"type_checking": True, "tests": False})
+    assert result["type_checking"] == ["app.py", "legacy/new/mod.py", "experiments/e.py", "lib/legacy/x.py"]
+    assert result["tests"] == ["experiments/e.py"]
+
+def test_check_runner_skips_checks_without_files_in_scope(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    subprocess.run(["git", "init"], cwd=tmp_path, capture_output=True)
+    subprocess.run(["git", "checkout", "-b", "feature/test"], cwd=tmp_path, capture_output=True)
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "conf.py").write_text("password = 'hunter2hunter2'\n")
+    subprocess.run(["git", "add", "."], cwd=tmp_path, capture_output=True)
+    
+    config = Config()
+    config.data["checks"] = {"branch_awareness": True, "security": False}
+    config.data["paths"] = {"overrides": {"src": {"security": True}}}
+    results = CheckRunner(config).run_all_checks()
+    assert [c["type"] for c in results["checks"]] == ["branch_awareness"]
+    
+    config.data["paths"] = {"overrides": {"docs": {"security": True}}}
+    results = CheckRunner(config).run_all_checks()
+    assert [c["type"] for c in results["checks"]] == ["branch_awareness", "security"]
@@ -76,3 +76,284 @@ def test_check_runner_should_block():
         ]
     }
     assert runner.should_block(results) == False
+
+def test_check_runner_parallel_keeps_configured_order(tmp_path, monkeypatch):
+    import time
+    from monitor_everything.checks import Check, CheckOutput, registry
+    
+    monkeypatch.chdir(tmp_path)
+    subprocess.run(["git", "init"], cwd=tmp_path, capture_output=True)
+    
+    def make_check(delay):
+        class SleepCheck(Check):
+            def __init__(self):
+                super().__init__(f"Sleep {delay}")
+            
+            def run(self, files):
+                time.sleep(delay)
+                return CheckOutput(CheckResult.PASS, "done")
+        return SleepCheck
+    
+    monkeypatch.setitem(registry._checks, "slow", make_check(0.3))
+    monkeypatch.setitem(registry._checks, "fast", make_check(0.0))
+    
+    config = Config()
+    config.data["checks"] = {"slow": True, "fast": True}
+    config.data["execution"] = {"parallel": True, "max_workers": 2}
+    
+    runner = CheckRunner(config)
+    results = runner.run_all_checks()
+    
+    assert [c["type"] for c in results["checks"]] == ["slow", "fast"]
+
+def test_check_runner_worker_count():
+    config = Config()
+    config.data["execution"] = {"parallel": False, "max_workers": 8}
+    assert CheckRunner(config)._worker_count(5) == 1
+    
+    config.data["execution"] = {"parallel": True, "max_workers": 8}
+    assert CheckRunner(config)._worker_count(5) == 5
+    
+    config.data["execution"] = {"parallel": True, "max_workers": 2}
+    assert CheckRunner(config)._worker_count(5) == 2
+
+def test_check_runner_from_subdirectory(tmp_path, monkeypatch):
+    subprocess.run(["git", "init"], cwd=tmp_path, capture_output=True)
+    
+    test_file = tmp_path / "config.py"
+    test_file.write_text('API_KEY = "sk_live_1234567890abcdefghij"')
+    subprocess.run(["git", "add", "config.py"], cwd=tmp_path, capture_output=True)
+    
+    subdir = tmp_path / "subdir"
+    subdir.mkdir()
+    monkeypatch.chdir(subdir)
+    
+    config = Config()
+    config.data["checks"] = {"security": True}
+    config.data["cache"] = {"enabled": False}
+    
+    results = CheckRunner(config).run_all_checks()
+    
+    assert results["files"] == ["config.py"]
+    assert results["checks"][0]["result"] == CheckResult.FAIL
+
+def test_check_runner_fail_fast_cancels_other_checks(tmp_path, monkeypatch):
+    import sys
+    import time
+    from monitor_everything.checks import Check, CheckOutput, registry
+    
+    monkeypatch.chdir(tmp_path)
+    subprocess.run(["git", "init"], cwd=tmp_path, capture_output=True)
+    
+    class FailingCheck(Check):
+        def __init__(self):
+            super().__init__("Failing")
+        
+        def run(self, files):
+            # Reports the failure on its first line, well before exiting
+            script = "import sys, time; print('error: bad', flush=True); time.sleep(1); sys.exit(1)"
+            self.stream([sys.executable, "-c", script], failure_line=lambda line: line.startswith("error:"))
+            return CheckOutput(CheckResult.FAIL, "failed")
+    
+    class SlowCheck(Check):
+        def __init__(self):
+            super().__init__("Slow")
+        
+        def run(self, files):
+            self.stream([sys.executable, "-c", "import time; time.sleep(30)"])
+            return CheckOutput(CheckResult.PASS, "done")
+    
+    monkeypatch.setitem(registry._checks, "failing", FailingCheck)
+    monkeypatch.setitem(registry._checks, "slow", SlowCheck)
+    
+    config = Config()
+    config.data["checks"] = {"slow": True, "failing": True}
+    config.data["behavior"] = {"failing": "block", "slow": "interactive"}
+    config.data["execution"] = {"parallel": True, "max_workers": 2, "fail_fast": True}
+    
+    start = time.monotonic()
+    results = CheckRunner(config).run_all_checks()
+    assert time.monotonic() - start < 10
+    
+    slow, failing = results["checks"]
+    assert failing["result"] == CheckResult.FAIL
+    assert slow["result"] == CheckResult.SKIP
+    assert "Failing failed" in slow["message"]
+
+def test_check_runner_records_stats_and_history(tmp_path, monkeypatch):
+    import json
+    
+    monkeypatch.chdir(tmp_path)
+    subprocess.run(["git", "init"], cwd=tmp_path, capture_output=True)
+    (tmp_path / "app.py").write_text("x = 1\n")
+    subprocess.run(["git", "add", "app.py"], cwd=tmp_path, capture_output=True)
+    
+    config = Config()
+    config.data["checks"] = {"security": True}
+    
+    results = CheckRunner(config).run_all_checks()
+    
+    stats = results["checks"][0]["stats"]
+    assert stats["wall"] >= 0
+    assert stats["files"] == 1
+    assert stats["cache"] == "miss"
+    
+    history = (tmp_path / ".git" / "me" / "history.jsonl").read_text().splitlines()
+    assert len(history) == 1
+    assert json.loads(history[0])["checks"]["security"]["result"] == "pass"
+
+def test_check_runner_fix_behavior_restages_fully_staged_files(tmp_path, monkeypatch):
+    import copy
+    import shutil
+    import pytest
+    from monitor_everything.config import DEFAULT_CONFIG
+    from monitor_everything.git_utils import get_repo_state
+    
+    if not shutil.which("black"):
+        pytest.skip("black not installed")
+    
+    monkeypatch.chdir(tmp_path)
+    subprocess.run(["git", "init"], cwd=tmp_path, capture_output=True)
+    subprocess.run(["git", "checkout", "-b", "feature/test"], cwd=tmp_path, capture_output=True)
+    (tmp_path / "clean.py").write_text("x=1\n")
+    (tmp_path / "partial.py").write_text("y=1\n")
+    subprocess.run(["git", "add", "."], cwd=tmp_path, capture_output=True)
+    # An unstaged edit: fixing this file would stage it
+    (tmp_path / "partial.py").write_text("y=2\n")
+    
+    data = copy.deepcopy(DEFAULT_CONFIG)
+    data["checks"] = {"formatting": True}
+    data["behavior"]["formatting"] = "fix"
+    data["cache"]["enabled"] = False
+    data["execution"]["snapshot_dir"] = str(tmp_path / "scratch")
+    
+    results = CheckRunner(Config.from_data(data)).run_all_checks(get_repo_state(tmp_path))
+    
+    formatting = results["checks"][0]
+    assert formatting["result"] == CheckResult.FAIL
+    assert [d.path for d in formatting["diagnostics"]] == ["partial.py"]
+    staged = subprocess.run(["git", "show", ":clean.py"], cwd=tmp_path, capture_output=True, text=True)
+    assert staged.stdout == "x = 1\n"
+    assert (tmp_path / "partial.py").read_text() == "y=2\n"
+
+def test_check_runner_reports_checks_that_fail_to_load(tmp_path, monkeypatch):
+    from monitor_everything.checks import registry
+    
+    monkeypatch.chdir(tmp_path)
+    subprocess.run(["git", "init"], cwd=tmp_path, capture_output=True)
+    subprocess.run(["git", "checkout", "-b", "feature/test"], cwd=tmp_path, capture_output=True)
+    monkeypatch.setitem(registry._checks, "plugin", "monitor_everything.no_such_module:Check")
+    monkeypatch.setitem(registry._checks, "disabled", "monitor_everything.no_such_module:Other")
+    
+    config = Config()
+    config.data["checks"] = {"plugin": True, "disabled": False}
+    config.data["behavior"]["plugin"] = "block"
+    runner = CheckRunner(config)
+    results = runner.run_all_checks()
+    
+    assert [c["type"] for c in results["checks"]] == ["plugin"]
+    assert results["checks"][0]["result"] == CheckResult.FAIL
+    assert "no_such_module" in results["checks"][0]["message"]
+    assert runner.should_block(results)
+
+def test_check_runner_times_out_hung_tools(tmp_path, monkeypatch):
+    import sys
+    import time
+    from monitor_everything.checks import Check, CheckOutput, registry
+    
+    monkeypatch.chdir(tmp_path)
+    subprocess.run(["git", "init"], cwd=tmp_path, capture_output=True)
+    
+    class HungCheck(Check):
+        def __init__(self):
+            super().__init__("Hung")
+        
+        def run(self, files):
+            self.stream([sys.executable, "-c", "import time; time.sleep(30)"])
+            return CheckOutput(CheckResult.PASS, "done")
+    
+    monkeypatch.setitem(registry._checks, "hung", HungCheck)
+    
+    config = Config()
+    config.data["checks"] = {"hung": True, "branch_awareness": True}
+    config.data["execution"]["timeout"] = 0.5
+    
+    for parallel in (False, True):
+        config.data["execution"]["parallel"] = parallel
+        start = time.monotonic()
+        results = CheckRunner(config).run_all_checks()
+        assert time.monotonic() - start < 10
+        
+        hung, branch = results["checks"]
+        assert hung["result"] == CheckResult.TIMEOUT
+        assert hung["message"] == "Timed out after 0.5s"
+        assert branch["result"] == CheckResult.PASS
+
+def test_check_runner_per_check_limits(tmp_path, monkeypatch):
+    import sys
+    from monitor_everything.checks import Check, CheckOutput, registry
+    
+    monkeypatch.chdir(tmp_path)
+    subprocess.run(["git", "init"], cwd=tmp_path, capture_output=True)
+    
+    class SpinningCheck(Check):
+        def __init__(self):
+            super().__init__("Spinning")
+        
+        def run(self, files):
+            self.stream([sys.executable, "-c", "while True: pass"])
+            return CheckOutput(CheckResult.PASS, "done")
+    
+    monkeypatch.setitem(registry._checks, "spinning", SpinningCheck)
+    
+    config = Config()
+    config.data["checks"] = {"spinning": True}
+    config.data["behavior"]["spinning"] = "block"
+    config.data["execution"]["cpu_seconds"] = 30
+    config.data["settings"]["spinning"] = {"cpu_seconds": 1}
+    runner = CheckRunner(config)
+    assert runner._limits("spinning") == {"timeout": 600, "cpu_seconds": 1, "memory_mb": None}
+    assert runner._limits("tests")["cpu_seconds"] == 30
+    
+    results = runner.run_all_checks()
+    
+    check = results["checks"][0]
+    assert check["result"] == CheckResult.TIMEOUT
+    assert check["message"].endswith("exceeded its CPU limit of 1s")
+    assert runner.should_block(results)
+
+def test_check_runner_type_checking_cache_sees_committed_changes(tmp_path, monkeypatch):
+    import copy
+    import shutil
+    import pytest
+    from monitor_everything.config import DEFAULT_CONFIG
+    
+    if not shutil.which("mypy"):
+        pytest.skip("mypy not installed")
+    
+    monkeypatch.chdir(tmp_path)
+    subprocess.run(["git", "init"], cwd=tmp_path, capture_output=True)
+    subprocess.run(["git", "config", "user.email", "test@test.com"], cwd=tmp_path, capture_output=True)
+    subprocess.run(["git", "config", "user.name", "Test"], cwd=tmp_path, capture_output=True)
+    subprocess.run(["git", "checkout", "-b", "feature/test"], cwd=tmp_path, capture_output=True)
+    (tmp_path / "b.py").write_text("def f() -> int:\n    return 1\n")
+    subprocess.run(["git", "add", "b.py"], cwd=tmp_path, capture_output=True)
+    subprocess.run(["git", "commit", "-m", "b"], cwd=tmp_path, capture_output=True)
+    (tmp_path / "a.py").write_text("from b import f\n\nx: int = f() + 1\n")
+    subprocess.run(["git", "add", "a.py"], cwd=tmp_path, capture_output=True)
+    
+    data = copy.deepcopy(DEFAULT_CONFIG)
+    data["checks"] = {"type_checking": True}
+    data["execution"]["snapshot_dir"] = str(tmp_path / "scratch")
+    
+    first = CheckRunner(Config.from_data(data)).run_all_checks()["checks"][0]
+    assert first["result"] == CheckResult.PASS, first["message"]
+    
+    # Committing b.py changes what a.py is checked against, though a.py
+    # itself stays staged with the same blob
+    (tmp_path / "b.py").write_text("def f() -> str:\n    return ''\n")
+    subprocess.run(["git", "commit", "-m", "str", "--", "b.py"], cwd=tmp_path, capture_output=True)
+    
+    second = CheckRunner(Config.from_data(data)).run_all_checks()["checks"][0]
+    assert second["stats"]["cache"] == "miss"
+    assert second["result"] == CheckResult.FAIL
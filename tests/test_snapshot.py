@@ -0,0 +1,119 @@
+import copy
+import subprocess
+from monitor_everything.config import Config, DEFAULT_CONFIG
+from monitor_everything.git_utils import get_repo_state
+from monitor_everything.runner import CheckRunner
+from monitor_everything.checks import CheckResult
+from monitor_everything.snapshot import Snapshot
+
+def _init_repo(path):
+    subprocess.run(["git", "init"], cwd=path, capture_output=True)
+    subprocess.run(["git", "checkout", "-b", "feature/test"], cwd=path, capture_output=True)
+
+def materialize(root, git_dir, base):
+    with Snapshot(root, git_dir, base) as snapshot:
+        return snapshot
+
+def test_materialize_writes_staged_content(tmp_path):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    _init_repo(repo)
+    (repo / "pkg").mkdir()
+    (repo / "pkg" / "a.py").write_text("staged = 1\n")
+    subprocess.run(["git", "add", "."], cwd=repo, capture_output=True)
+    (repo / "pkg" / "a.py").write_text("unstaged = 1\n")
+    (repo / "untracked.py").write_text("x = 1\n")
+    
+    snapshot = materialize(repo, repo / ".git", tmp_path / "scratch")
+    
+    assert (snapshot / "pkg" / "a.py").read_text() == "staged = 1\n"
+    assert not (snapshot / "untracked.py").exists()
+
+def test_materialize_updates_incrementally(tmp_path):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    _init_repo(repo)
+    for name in ("a.py", "b.py", "c.py"):
+        (repo / name).write_text(f"# {name}\n")
+    subprocess.run(["git", "add", "."], cwd=repo, capture_output=True)
+    snapshot = materialize(repo, repo / ".git", tmp_path / "scratch")
+    untouched = (snapshot / "a.py").stat().st_ino, (snapshot / "a.py").stat().st_mtime_ns
+    
+    (repo / "b.py").write_text("b = 2\n")
+    subprocess.run(["git", "add", "b.py"], cwd=repo, capture_output=True)
+    subprocess.run(["git", "rm", "--cached", "-q", "c.py"], cwd=repo, capture_output=True)
+    snapshot = materialize(repo, repo / ".git", tmp_path / "scratch")
+    
+    assert ((snapshot / "a.py").stat().st_ino, (snapshot / "a.py").stat().st_mtime_ns) == untouched
+    assert (snapshot / "b.py").read_text() == "b = 2\n"
+    assert not (snapshot / "c.py").exists()
+
+def test_snapshot_directory_is_private(tmp_path):
+    import os
+    import stat
+    
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    _init_repo(repo)
+    (repo / "a.py").write_text("a = 1\n")
+    subprocess.run(["git", "add", "."], cwd=repo, capture_output=True)
+    
+    snapshot = materialize(repo, repo / ".git", tmp_path / "scratch")
+    assert stat.S_IMODE(os.stat(snapshot).st_mode) == 0o700
+    assert stat.S_IMODE(os.stat(snapshot.parent).st_mode) == 0o700
+    
+    # A directory planted at the snapshot's path (here a symlink to one) is refused
+    planted = tmp_path / "planted"
+    planted.mkdir()
+    (tmp_path / "shared").mkdir()
+    os.symlink(planted, tmp_path / "shared" / snapshot.parent.name)
+    assert materialize(repo, repo / ".git", tmp_path / "shared") is None
+    assert list(planted.iterdir()) == []
+
+def test_snapshot_is_locked_while_open(tmp_path):
+    import threading
+    
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    _init_repo(repo)
+    (repo / "a.py").write_text("a = 1\n")
+    subprocess.run(["git", "add", "."], cwd=repo, capture_output=True)
+    first = Snapshot(repo, repo / ".git", tmp_path / "scratch")
+    first.open()
+    
+    # A second run waits until the first one's checks are done
+    (repo / "a.py").write_text("a = 2\n")
+    subprocess.run(["git", "add", "."], cwd=repo, capture_output=True)
+    second = threading.Thread(target=materialize, args=(repo, repo / ".git", tmp_path / "scratch"))
+    second.start()
+    second.join(0.5)
+    assert second.is_alive()
+    assert (first.path / "a.py").read_text() == "a = 1\n"
+    
+    first.close()
+    second.join(5)
+    assert not second.is_alive()
+    assert (first.path / "a.py").read_text() == "a = 2\n"
+
+def test_runner_ignores_unstaged_edits(tmp_path, monkeypatch):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    monkeypatch.chdir(repo)
+    _init_repo(repo)
+    (repo / "settings.py").write_text("DEBUG = False\n")
+    subprocess.run(["git", "add", "settings.py"], cwd=repo, capture_output=True)
+    (repo / "settings.py").write_text('API_KEY = "sk_live_1234567890abcdefghij"\n')
+    
+    data = copy.deepcopy(DEFAULT_CONFIG)
+    data["checks"]["security"] = True
+    data["cache"]["enabled"] = False
+    data["execution"]["snapshot_dir"] = str(tmp_path / "scratch")
+    
+    results = CheckRunner(Config.from_data(data)).run_all_checks(get_repo_state(repo))
+    security = next(c for c in results["checks"] if c["type"] == "security")
+    assert security["result"] == CheckResult.PASS
+    
+    data["execution"]["snapshot"] = False
+    results = CheckRunner(Config.from_data(data)).run_all_checks(get_repo_state(repo))
+    security = next(c for c in results["checks"] if c["type"] == "security")
+    assert security["result"] == CheckResult.FAIL